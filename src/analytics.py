@@ -0,0 +1,145 @@
+from misc import COMPONENT_TILE, TILE, EFFECT
+from board import Board
+from cards import Cards, ChanceCards, RiskCards
+from player import Player
+from policy import Policy
+from turn import ACTION, TILE_ACTIONS
+from rules import DEFAULT_RULES, Rules
+from rng import BlockRandom
+from collections import Counter
+from functools import lru_cache
+from typing import Sequence
+import numpy as np
+
+DICE = range(1, 7)
+DECKS: dict[ACTION, type[Cards]] = {
+    ACTION.CHANCE: ChanceCards,
+    ACTION.RISK: RiskCards,
+}
+
+class LandingStats:
+    """Exact long-run landing statistics of a single player on a board layout.
+
+    Attributes:
+        tiles (tuple[TILE, ...]): Layout the statistics were computed for.
+        resting (np.ndarray): Stationary distribution of the tile a player ends the turn on.
+        landings (np.ndarray): Expected number of landings on every tile per turn, counting follow-up landings
+            caused by cards and travelling.
+        probabilities (np.ndarray): Landings normalized to the share of all landings on every tile.
+        rent (np.ndarray): Expected rent paid per turn of an opponent for every owned component tile.
+    """
+    def __init__(self, tiles: tuple[TILE, ...], resting: np.ndarray, landings: np.ndarray, rules: Rules = DEFAULT_RULES) -> None:
+        self.tiles = tiles
+        self.resting = resting
+        self.landings = landings
+        self.probabilities = landings / landings.sum()
+        price = rules.prices()
+        prices = np.array([price.get(tile, 0) for tile in tiles], dtype=float)
+        self.rent = landings * prices
+
+    def rent_by_component(self) -> dict[COMPONENT_TILE, float]:
+        """Sums expected rent per turn of an opponent over all tiles of every component.
+
+        Returns:
+            dict[COMPONENT_TILE, float]: Expected rent of owning all tiles of the component.
+        """
+        rent: dict[COMPONENT_TILE, float] = {component: 0.0 for component in COMPONENT_TILE}
+        for tile, value in zip(self.tiles, self.rent):
+            if isinstance(tile, COMPONENT_TILE):
+                rent[tile] += float(value)
+        return rent
+
+def get_deck_probabilities(cards: type[Cards]) -> dict[EFFECT, float]:
+    """Returns the share of every effect in a full deck.
+
+    Args:
+        cards (type[Cards]): Class of the deck.
+
+    Returns:
+        dict[EFFECT, float]: Probability of drawing every effect.
+    """
+    deck = cards(BlockRandom(0)).create_deck()
+    return {effect: count / len(deck) for effect, count in Counter(deck).items()}
+
+def travel_distribution(policy: Policy, tiles: Sequence[TILE], samples: int = 1000, seed: int = 0) -> tuple[float, ...]:
+    """Estimates where the policy travels from the TRAVEL tile, asking it on a board with no owners yet.
+
+    Args:
+        policy (Policy): Policy to ask.
+        tiles (Sequence[TILE]): Layout of the board.
+        samples (int, optional): Number of questions asked. Defaults to 1000.
+        seed (int, optional): Seed of the board the policy may draw randomness from. Defaults to 0.
+
+    Returns:
+        tuple[float, ...]: Probability of travelling to every tile.
+    """
+    board = Board(rng=BlockRandom(seed), tiles=list(tiles))
+    player = Player(board, "P1", policy)
+    counts = Counter(policy.choose_travel(board, player) - 1 for _ in range(samples))
+    return tuple(counts[index] / samples for index in range(len(tiles)))
+
+def analyze(tiles: Sequence[TILE], travel: Sequence[float] | None = None, rules: Rules = DEFAULT_RULES) -> LandingStats:
+    """Computes landing statistics of a layout. Results are cached, so repeated queries are free.
+
+    Args:
+        tiles (Sequence[TILE]): Layout of the board, as created by Board.create_board.
+        travel (Sequence[float] | None, optional): Probability of travelling to every tile from the TRAVEL tile,
+            see travel_distribution. Defaults to uniform choice.
+        rules (Rules, optional): Rules of the game, moving players by cards and setting rents. Defaults to DEFAULT_RULES.
+
+    Returns:
+        LandingStats: Landing statistics of the layout.
+    """
+    return solve(tuple(tiles), tuple(travel) if travel is not None else None, rules)
+
+@lru_cache(maxsize=1024)
+def solve(tiles: tuple[TILE, ...], travel: tuple[float, ...] | None, rules: Rules = DEFAULT_RULES) -> LandingStats:
+    """Builds the transition matrix of the layout and solves for its stationary distribution.
+
+    A turn is modelled as a dice move followed by a chain of landings: every landing either ends the turn
+    on the tile, or moves the player again (MOVE/ADVANCE cards, TRAVEL). Cards are drawn with the frequencies
+    of a full deck. With D the dice moves, C the continuations of chains and S the probabilities of a chain
+    stopping on a tile, the expected landings of a turn are D(I - C)^-1 and the turn transition matrix
+    is D(I - C)^-1 S.
+
+    Args:
+        tiles (tuple[TILE, ...]): Layout of the board.
+        travel (tuple[float, ...] | None): Probability of travelling to every tile, uniform if None.
+        rules (Rules, optional): Rules of the game. Defaults to DEFAULT_RULES.
+
+    Returns:
+        LandingStats: Landing statistics of the layout.
+    """
+    size = len(tiles)
+    card_effects = rules.card_effects()
+    dice = np.zeros((size, size))
+    for position in range(size):
+        for roll in DICE:
+            dice[position, (position + roll) % size] += 1 / len(DICE)
+    travel_row = np.array(travel) if travel is not None else np.full(size, 1 / size)
+    chain = np.zeros((size, size))
+    stop = np.zeros(size)
+    for position, tile in enumerate(tiles):
+        action = TILE_ACTIONS[tile]
+        if action == ACTION.TRAVEL:
+            chain[position] = travel_row
+        elif action in DECKS:
+            for effect, probability in get_deck_probabilities(DECKS[action]).items():
+                card = card_effects[effect]
+                if card.steps:
+                    chain[position, (position + card.steps) % size] += probability
+                elif card.roll:
+                    chain[position] += probability * dice[position]
+                else:
+                    stop[position] += probability
+        else:
+            stop[position] = 1.0
+    landings_per_move = np.linalg.inv(np.eye(size) - chain)
+    landings_matrix = dice @ landings_per_move
+    transition = landings_matrix * stop
+    system = transition.T - np.eye(size)
+    system[-1] = 1.0
+    target = np.zeros(size)
+    target[-1] = 1.0
+    resting = np.linalg.solve(system, target)
+    return LandingStats(tiles, resting, resting @ landings_matrix, rules)
@@ -0,0 +1,322 @@
+from misc import (
+    SPECIAL_TILE,
+    COMPONENT_TILE,
+    GOOD_EFFECT,
+    NEUTRAL_EFFECT,
+    TILE_CODES,
+    EFFECT_CODES
+)
+from policy import Policy, GreedyPolicy, RandomPolicy
+from board import BOARD_SIZE
+from rules import DEFAULT_RULES, Rules
+from rng import MASK, CHANCE as CHANCE_STREAM, RISK as RISK_STREAM, DICE_BLOCK, DECK_BLOCK, generate, generate_dice
+from functools import partial
+from typing import Callable, Sequence
+import numpy as np
+
+N_COMPONENTS = len(COMPONENT_TILE)
+START = TILE_CODES.index(SPECIAL_TILE.START)
+CHANCE = TILE_CODES.index(SPECIAL_TILE.CHANCE)
+RISK = TILE_CODES.index(SPECIAL_TILE.RISK)
+TRAVEL = TILE_CODES.index(SPECIAL_TILE.TRAVEL)
+PART_BITS = np.array(
+    [1 << code if isinstance(tile, COMPONENT_TILE) and tile != COMPONENT_TILE.SERVICE else 0 for code, tile in enumerate(TILE_CODES)],
+    dtype=np.uint8
+)
+ALL_PARTS = int(np.bitwise_or.reduce(PART_BITS))
+
+MOVE = EFFECT_CODES.index(GOOD_EFFECT.MOVE)
+ADVANCE = EFFECT_CODES.index(GOOD_EFFECT.ADVANCE)
+CHANCE_DECK = np.array([EFFECT_CODES.index(effect) for effect in GOOD_EFFECT], dtype=np.int8)
+RISK_DECK = np.arange(len(EFFECT_CODES), dtype=np.int8)
+
+MAX_CHAIN = 64
+
+TRAVEL_GREEDY = 0
+TRAVEL_RANDOM = 1
+BATCH_POLICIES: dict[type[Policy], tuple[float, int]] = {
+    GreedyPolicy: (1.0, TRAVEL_GREEDY),
+    RandomPolicy: (0.5, TRAVEL_RANDOM),
+}
+
+def generate_dice_rows(keys: list[int], blocks: list[int]) -> np.ndarray:
+    """Generates a block of dice rolls of every given game, see rng.generate_dice.
+
+    Args:
+        keys (list[int]): Keys of the games.
+        blocks (list[int]): Number of the block of every game.
+
+    Returns:
+        np.ndarray: Dice rolls, one row per game.
+    """
+    return np.frombuffer(b"".join(map(generate_dice, keys, blocks)), dtype=np.int8).reshape(len(keys), DICE_BLOCK)
+
+def generate_permutation_rows(stream: int, size: int, keys: list[int], blocks: list[int]) -> np.ndarray:
+    """Generates a block of deck permutations of every given game, sorting the keys of all games at once.
+    Matches rng.generate_permutations, as both sorts keep ties in order.
+
+    Args:
+        stream (int): Number of the stream of the deck.
+        size (int): Number of cards in the deck.
+        keys (list[int]): Keys of the games.
+        blocks (list[int]): Number of the block of every game.
+
+    Returns:
+        np.ndarray: DECK_BLOCK permutations of range(size) one after another, one row per game.
+    """
+    words = np.frombuffer(
+        b"".join(generate(key, stream, block, 8 * size * DECK_BLOCK) for key, block in zip(keys, blocks)),
+        dtype=np.uint64
+    ).reshape(len(keys), DECK_BLOCK, size)
+    return np.argsort(words, axis=2, kind="stable").astype(np.int8).reshape(len(keys), DECK_BLOCK * size)
+
+class BatchStream:
+    """Random streams of many games served in lockstep, one row per game.
+
+    Every row holds the current block of the stream of a game, generated by the same functions as the streams
+    of the scalar engine, so a game draws exactly the values a Game seeded with its key draws.
+    Blocks are generated on first draw, and only for the games which ran out of values.
+    """
+    def __init__(self, keys: list[int], generate: Callable[[list[int], list[int]], np.ndarray], width: int) -> None:
+        self.keys = keys
+        self.generate = generate
+        self.values = np.zeros((len(keys), width), dtype=np.int8)
+        self.blocks = np.full(len(keys), -1, dtype=np.int64)
+        self.cursor = np.full(len(keys), width, dtype=np.int64)
+
+    def draw(self, games: np.ndarray) -> np.ndarray:
+        """Draws the next value of the stream of every given game.
+
+        Args:
+            games (np.ndarray): Indices of games.
+
+        Returns:
+            np.ndarray: Drawn values.
+        """
+        cursor = self.cursor[games]
+        spent = cursor == self.values.shape[1]
+        if spent.any():
+            refill = games[spent]
+            self.blocks[refill] += 1
+            self.values[refill] = self.generate([self.keys[game] for game in refill.tolist()], self.blocks[refill].tolist())
+            cursor[spent] = 0
+        self.cursor[games] = cursor + 1
+        return self.values[games, cursor]
+
+class BatchSimulator:
+    """Simulates many games of Gigapoly in lockstep using NumPy arrays.
+
+    Every piece of state is an array with a leading batch dimension, one row per game.
+    Each call to step plays one turn in all games which are still running, resolving dice, rent, purchases,
+    card effects and end game conditions as vectorized operations. Finished games are masked out.
+    Decisions follow the vectorized counterpart of the given policies, see BATCH_POLICIES.
+    Dice and card decks of game i draw from the streams of a Game seeded with seed + i, or with seeds[i]
+    if seeds are given, see BatchStream. Boards are random unless layouts are given.
+    Money, prices and cards follow the given rules, the same as a Game with these rules.
+    """
+    def __init__(
+        self,
+        n_games: int,
+        policies: list[Policy] | None = None,
+        seed: int | None = None,
+        size: int = BOARD_SIZE,
+        rules: Rules | None = None,
+        layouts: np.ndarray | None = None,
+        seeds: Sequence[int] | None = None
+    ) -> None:
+        if not policies:
+            policies = [GreedyPolicy(), GreedyPolicy()]
+        if len(policies) != 2:
+            raise ValueError("Batch simulator supports exactly two players")
+        for policy in policies:
+            if type(policy) not in BATCH_POLICIES:
+                raise ValueError(f"Policy {type(policy).__name__} has no vectorized counterpart")
+        if size < BOARD_SIZE:
+            raise ValueError(f"Board needs at least {BOARD_SIZE} tiles")
+        self.rng = np.random.default_rng(seed)
+        self.rules = rules if rules else DEFAULT_RULES
+        prices, card_effects = self.rules.prices(), self.rules.card_effects()
+        self.prices = np.array([prices.get(tile, 0) for tile in TILE_CODES], dtype=np.int64)
+        self.effect_money = np.array([card_effects[effect].money for effect in EFFECT_CODES], dtype=np.int64)
+        self.size = size
+        self.n_games = n_games
+        self.n_players = len(policies)
+        self.buy_probability = [BATCH_POLICIES[type(policy)][0] for policy in policies]
+        self.travel_mode = [BATCH_POLICIES[type(policy)][1] for policy in policies]
+        if layouts is not None and layouts.shape != (n_games, size):
+            raise ValueError(f"Layouts must hold {size} tile codes of each of {n_games} games")
+        if seeds is not None and len(seeds) != n_games:
+            raise ValueError(f"Seeds must hold a seed of each of {n_games} games")
+        self.tiles = layouts.astype(np.int8) if layouts is not None else self.create_boards(n_games)
+        self.owners = np.full((n_games, size), -1, dtype=np.int8)
+        self.positions = np.zeros((n_games, self.n_players), dtype=np.int16)
+        self.money = np.full((n_games, self.n_players), self.rules.start_money, dtype=np.int64)
+        self.parts = np.zeros((n_games, self.n_players), dtype=np.uint8)
+        first_key = seed if seed is not None else int(self.rng.integers(0, 1 << 63))
+        self.keys = [game_seed & MASK for game_seed in seeds] if seeds is not None else [(first_key + game) & MASK for game in range(n_games)]
+        self.dice = BatchStream(self.keys, generate_dice_rows, DICE_BLOCK)
+        self.chance_deck = BatchStream(self.keys, partial(generate_permutation_rows, CHANCE_STREAM, CHANCE_DECK.size), DECK_BLOCK * CHANCE_DECK.size)
+        self.risk_deck = BatchStream(self.keys, partial(generate_permutation_rows, RISK_STREAM, RISK_DECK.size), DECK_BLOCK * RISK_DECK.size)
+        self.alive = np.ones(n_games, dtype=bool)
+        self.winners = np.full(n_games, -1, dtype=np.int8)
+        self.lengths = np.zeros(n_games, dtype=np.int32)
+        self.turn = 0
+
+    def create_boards(self, n_games: int) -> np.ndarray:
+        """Creates randomly generated boards, same as Board.create_board does for a single game.
+
+        Args:
+            n_games (int): Number of boards to create.
+
+        Returns:
+            np.ndarray: Tile codes of every board, START tile first.
+        """
+        pool = [TILE_CODES.index(tile) for tile in list(SPECIAL_TILE) + list(COMPONENT_TILE) * 2]
+        pool.remove(START)
+        tiles = (pool * -(-(self.size - 1) // len(pool)))[:self.size - 1]
+        shuffled = self.rng.permuted(np.tile(np.array(tiles, dtype=np.int8), (n_games, 1)), axis=1)
+        return np.hstack([np.full((n_games, 1), START, dtype=np.int8), shuffled])
+
+    def move(self, games: np.ndarray, player: int, steps: np.ndarray | int) -> None:
+        """Moves the player by specified amount of steps in the given games, paying for passing the START tile.
+
+        Args:
+            games (np.ndarray): Indices of games.
+            player (int): Index of the player to move.
+            steps (np.ndarray | int): Amount of steps the player is taking.
+        """
+        passes, destination = np.divmod(self.positions[games, player] + steps, self.size)
+        self.money[games, player] += passes * self.rules.pass_start_money
+        self.positions[games, player] = destination
+
+    def draw(self, deck: BatchStream, cards: np.ndarray, games: np.ndarray) -> np.ndarray:
+        """Draws a card from the deck of every given game. Decks are reshuffled by moving on to the next permutation.
+
+        Args:
+            deck (BatchStream): Permutations of the deck of all games.
+            cards (np.ndarray): Cards of a full deck.
+            games (np.ndarray): Indices of games.
+
+        Returns:
+            np.ndarray: Drawn cards.
+        """
+        return cards[deck.draw(games)]
+
+    def choose_travel(self, games: np.ndarray, player: int) -> np.ndarray:
+        """Chooses destinations of the player travelling from the TRAVEL tile.
+
+        Args:
+            games (np.ndarray): Indices of games.
+            player (int): Index of the travelling player.
+
+        Returns:
+            np.ndarray: Positions to travel to.
+        """
+        if self.travel_mode[player] == TRAVEL_RANDOM:
+            return self.rng.integers(0, self.size, size=games.size)
+        tiles = self.tiles[games]
+        unowned = (self.owners[games] < 0) & (tiles < N_COMPONENTS)
+        missing = unowned & ((PART_BITS[tiles] & ~self.parts[games, player][:, None]) != 0)
+        return np.where(missing.any(axis=1), missing.argmax(axis=1), np.where(unowned.any(axis=1), unowned.argmax(axis=1), 0))
+
+    def handle_buying(self, games: np.ndarray, player: int) -> None:
+        """Resolves rent and purchases of players standing on component tiles.
+
+        Args:
+            games (np.ndarray): Indices of games where the player stands on a component tile.
+            player (int): Index of the current player.
+        """
+        positions = self.positions[games, player]
+        tiles = self.tiles[games, positions]
+        prices = self.prices[tiles]
+        owners = self.owners[games, positions]
+        rent = (owners >= 0) & (owners != player)
+        self.money[games[rent], player] -= prices[rent]
+        self.money[games[rent], owners[rent]] += prices[rent]
+        buy = (owners < 0) & (self.money[games, player] >= prices)
+        if self.buy_probability[player] < 1.0:
+            buy &= self.rng.random(games.size) < self.buy_probability[player]
+        self.owners[games[buy], positions[buy]] = player
+        self.money[games[buy], player] -= prices[buy]
+        self.parts[games[buy], player] |= PART_BITS[tiles[buy]]
+
+    def resolve(self, games: np.ndarray, player: int) -> np.ndarray:
+        """Resolves the tile the player landed on in every given game.
+
+        Args:
+            games (np.ndarray): Indices of games.
+            player (int): Index of the current player.
+
+        Returns:
+            np.ndarray: Indices of games where the player moved again and has to resolve another landing.
+        """
+        tiles = self.tiles[games, self.positions[games, player]]
+        self.handle_buying(games[tiles < N_COMPONENTS], player)
+        chance = games[tiles == CHANCE]
+        risk = games[tiles == RISK]
+        travel = games[tiles == TRAVEL]
+        drawing = np.concatenate([chance, risk])
+        effects = np.concatenate([
+            self.draw(self.chance_deck, CHANCE_DECK, chance),
+            self.draw(self.risk_deck, RISK_DECK, risk)
+        ])
+        self.money[drawing, player] += self.effect_money[effects]
+        advance = drawing[effects == ADVANCE]
+        self.move(advance, player, self.rules.advance_steps)
+        move = drawing[effects == MOVE]
+        self.move(move, player, self.dice.draw(move))
+        self.positions[travel, player] = self.choose_travel(travel, player)
+        return np.concatenate([advance, move, travel])
+
+    def check_end_game(self, games: np.ndarray) -> None:
+        """Checks wining and loosing conditions of every player in the given games, settling winners in order of players.
+
+        Args:
+            games (np.ndarray): Indices of games.
+        """
+        ended = np.zeros(games.size, dtype=bool)
+        for player in range(self.n_players):
+            bankrupt = self.money[games, player] <= 0
+            won = self.parts[games, player] == ALL_PARTS
+            first = ~ended & (bankrupt | won)
+            self.winners[games[first]] = np.where(bankrupt[first], 1 - player, player)
+            ended |= bankrupt | won
+        self.alive[games[ended]] = False
+
+    def step(self) -> None:
+        """Plays one turn in every game which is still running.
+        """
+        games = np.flatnonzero(self.alive)
+        if not games.size:
+            return
+        player = self.turn % self.n_players
+        self.move(games, player, self.dice.draw(games))
+        pending = games
+        for _ in range(MAX_CHAIN):
+            if not pending.size:
+                break
+            pending = self.resolve(pending, player)
+        self.turn += 1
+        self.lengths[games] = self.turn
+        self.check_end_game(games)
+
+    def run(self, max_turns: int = 1000) -> 'BatchSimulator':
+        """Plays all games until they end or the turn limit is reached. Games still running count as draws.
+
+        Args:
+            max_turns (int, optional): Maximum number of turns. Defaults to 1000.
+
+        Returns:
+            BatchSimulator: The simulator itself, holding the results.
+        """
+        while self.turn < max_turns and self.alive.any():
+            self.step()
+        return self
+
+    def wins(self) -> np.ndarray:
+        """Counts games won by every player.
+
+        Returns:
+            np.ndarray: Number of wins indexed by player.
+        """
+        return np.bincount(self.winners[self.winners >= 0], minlength=self.n_players)
@@ -0,0 +1,284 @@
+from misc import COMPONENT_TILE
+from game import Game
+from board import Board
+from player import Player
+from policy import Policy, GreedyPolicy
+from cards import RiskCards
+from rng import BlockRandom
+from contextlib import redirect_stdout
+from statistics import median, quantiles
+from typing import Callable, NamedTuple
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+
+REPEATS = 7
+MIN_TIME = 0.1
+THRESHOLD = 0.10
+BASELINE_VERSION = 1
+SEED = 0
+GAME_TURNS = 200
+MOVE_STEPS = (1, 6, 12, 40)
+
+class ScriptedPolicy(Policy):
+    """Policy replaying fixed sequences of answers, so benchmarked games take the same decisions on every run
+    without spending time on deciding.
+    """
+    def __init__(self, buys: tuple[bool, ...] = (True, True, False), travels: tuple[int, ...] = (1, 5, 9, 13)) -> None:
+        self.buys = buys
+        self.travels = travels
+        self.buy_count = 0
+        self.travel_count = 0
+
+    def decide_buy(self, board: 'Board', player: 'Player', tile: COMPONENT_TILE) -> bool:
+        self.buy_count += 1
+        return self.buys[self.buy_count % len(self.buys)]
+
+    def choose_travel(self, board: 'Board', player: 'Player') -> int:
+        self.travel_count += 1
+        return self.travels[self.travel_count % len(self.travels)]
+
+class Measurement(NamedTuple):
+    """Statistics of the time a benchmark takes per operation, in seconds.
+    Runs are timed with the garbage collector disabled, the median and the interquartile range are robust
+    to runs slowed down by the rest of the system.
+    """
+    name: str
+    median: float
+    iqr: float
+    best: float
+    runs: int
+    loops: int
+
+    def __str__(self) -> str:
+        return f"{self.name:<32} {format_time(self.median):>10} ± {format_time(self.iqr / 2):>9} | {1 / self.median:>12,.0f} ops/s"
+
+class Comparison(NamedTuple):
+    """Change of the median time of a benchmark against the baseline."""
+    name: str
+    baseline: float
+    current: float
+    change: float
+    regressed: bool
+
+    def __str__(self) -> str:
+        flag = "REGRESSION" if self.regressed else ""
+        return f"{self.name:<32} {format_time(self.baseline):>10} -> {format_time(self.current):>10} {self.change:>+8.1%} {flag}"
+
+def format_time(seconds: float) -> str:
+    """Formats a duration with the unit fitting its magnitude.
+
+    Args:
+        seconds (float): Duration in seconds.
+
+    Returns:
+        str: Formatted duration.
+    """
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.1f} ns"
+
+def measure(name: str, run: Callable[[int], None], repeats: int = REPEATS, min_time: float = MIN_TIME) -> Measurement:
+    """Times a benchmark, first calibrating the number of loops so a single run takes at least min_time.
+
+    Args:
+        name (str): Name of the benchmark.
+        run (Callable[[int], None]): Function performing the given number of operations.
+        repeats (int, optional): Number of timed runs. Defaults to REPEATS.
+        min_time (float, optional): Minimal duration of a run in seconds. Defaults to MIN_TIME.
+
+    Returns:
+        Measurement: Time per operation.
+    """
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        run(loops)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 10 if elapsed < min_time / 10 else 2
+    timings: list[float] = []
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            gc.collect()
+            start = time.perf_counter()
+            run(loops)
+            timings.append((time.perf_counter() - start) / loops)
+    finally:
+        if enabled:
+            gc.enable()
+    quartiles = quantiles(timings, n=4) if len(timings) > 1 else [timings[0]] * 3
+    return Measurement(name, median(timings), quartiles[2] - quartiles[0], min(timings), repeats, loops)
+
+def bench_move_player(steps: int) -> Callable[[int], None]:
+    """Moves a player by the given number of steps, past the jump table for more than MAX_JUMP steps."""
+    def run(loops: int) -> None:
+        game = Game([GreedyPolicy(), GreedyPolicy()], seed=SEED)
+        move_player, player = game.board.move_player, game.players[0]
+        for _ in range(loops):
+            move_player(player, steps)
+    return run
+
+def bench_move_player_to_position() -> Callable[[int], None]:
+    """Moves a player to every tile in turn."""
+    def run(loops: int) -> None:
+        game = Game([GreedyPolicy(), GreedyPolicy()], seed=SEED)
+        move_player_to_position, player, size = game.board.move_player_to_position, game.players[0], len(game.board.tiles)
+        for loop in range(loops):
+            move_player_to_position(player, loop % size + 1)
+    return run
+
+def bench_use_card() -> Callable[[int], None]:
+    """Draws cards from a risk deck, including the reshuffles of the emptied deck."""
+    def run(loops: int) -> None:
+        use_card = RiskCards(BlockRandom(SEED)).use_card
+        for _ in range(loops):
+            use_card()
+    return run
+
+def bench_display() -> Callable[[int], None]:
+    """Renders the board into a null sink, moving a pawn before every frame so it is never cached as a whole."""
+    def run(loops: int) -> None:
+        game = Game([GreedyPolicy(), GreedyPolicy()], seed=SEED)
+        board, player = game.board, game.players[0]
+        with open(os.devnull, "w") as sink, redirect_stdout(sink):
+            for _ in range(loops):
+                board.move_player(player, 1)
+                board.display()
+    return run
+
+def bench_check_end_game() -> Callable[[int], None]:
+    """Checks end game conditions of a player."""
+    def run(loops: int) -> None:
+        game = Game([GreedyPolicy(), GreedyPolicy()], seed=SEED)
+        check_end_game = game.players[0].check_end_game
+        for _ in range(loops):
+            check_end_game()
+    return run
+
+def bench_game() -> Callable[[int], None]:
+    """Plays headless games of up to GAME_TURNS turns with scripted decisions, one operation per game."""
+    def run(loops: int) -> None:
+        for seed in range(loops):
+            game = Game([ScriptedPolicy(), ScriptedPolicy()], max_turns=GAME_TURNS, seed=SEED + seed)
+            game.mainloop()
+    return run
+
+BENCHMARKS: dict[str, Callable[[], Callable[[int], None]]] = {
+    **{f"move_player[{steps}]": (lambda steps=steps: bench_move_player(steps)) for steps in MOVE_STEPS},
+    "move_player_to_position": bench_move_player_to_position,
+    "use_card": bench_use_card,
+    "display": bench_display,
+    "check_end_game": bench_check_end_game,
+    "game": bench_game,
+}
+
+def run_benchmarks(names: list[str] | None = None, repeats: int = REPEATS, min_time: float = MIN_TIME) -> list[Measurement]:
+    """Runs benchmarks one after another, printing every result as soon as it is measured.
+
+    Args:
+        names (list[str] | None, optional): Benchmarks to run. Defaults to all of BENCHMARKS.
+        repeats (int, optional): Number of timed runs of every benchmark. Defaults to REPEATS.
+        min_time (float, optional): Minimal duration of a run in seconds. Defaults to MIN_TIME.
+
+    Returns:
+        list[Measurement]: Results of every benchmark.
+    """
+    results: list[Measurement] = []
+    for name in names if names else BENCHMARKS:
+        result = measure(name, BENCHMARKS[name](), repeats, min_time)
+        print(result)
+        results.append(result)
+    return results
+
+def save_baseline(path: str, results: list[Measurement]) -> None:
+    """Saves results as a JSON baseline, along with the interpreter and machine they were measured on.
+
+    Args:
+        path (str): Path of the baseline.
+        results (list[Measurement]): Results to save.
+    """
+    data = {
+        "version": BASELINE_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "results": {result.name: result._asdict() for result in results},
+    }
+    with open(path, "w") as file:
+        json.dump(data, file, indent=2)
+
+def load_baseline(path: str) -> dict[str, Measurement]:
+    """Loads a JSON baseline saved by save_baseline.
+
+    Args:
+        path (str): Path of the baseline.
+
+    Raises:
+        ValueError: If the baseline was saved by another version of the format.
+
+    Returns:
+        dict[str, Measurement]: Results of the baseline by name.
+    """
+    with open(path) as file:
+        data = json.load(file)
+    if data.get("version") != BASELINE_VERSION:
+        raise ValueError(f"Unsupported baseline version: {data.get('version')}")
+    return {name: Measurement(**result) for name, result in data["results"].items()}
+
+def compare(results: list[Measurement], baseline: dict[str, Measurement], threshold: float = THRESHOLD) -> list[Comparison]:
+    """Compares results with a baseline. A benchmark regressed if its median is slower than the baseline
+    by more than the threshold and the change is larger than the noise of both measurements.
+
+    Args:
+        results (list[Measurement]): Current results.
+        baseline (dict[str, Measurement]): Results of the baseline by name. Benchmarks missing in it are skipped.
+        threshold (float, optional): Allowed relative slowdown. Defaults to THRESHOLD.
+
+    Returns:
+        list[Comparison]: Comparison of every benchmark found in the baseline.
+    """
+    comparisons: list[Comparison] = []
+    for result in results:
+        base = baseline.get(result.name)
+        if not base:
+            continue
+        change = result.median / base.median - 1
+        noise = (result.iqr + base.iqr) / 2
+        regressed = change > threshold and result.median - base.median > noise
+        comparisons.append(Comparison(result.name, base.median, result.median, change, regressed))
+    return comparisons
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measures hot paths of Gigapoly and compares them with a stored baseline.")
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run, all by default: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--repeats", type=int, default=REPEATS, help="number of timed runs of every benchmark")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME, help="minimal duration of a run in seconds")
+    parser.add_argument("--save", default=None, help="save results as a JSON baseline to this path")
+    parser.add_argument("--compare", default=None, help="compare results with the JSON baseline at this path")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="relative slowdown reported as a regression")
+    args = parser.parse_args()
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark: {name}")
+    results = run_benchmarks(args.names, args.repeats, args.min_time)
+    if args.save:
+        save_baseline(args.save, results)
+    if args.compare:
+        comparisons = compare(results, load_baseline(args.compare), args.threshold)
+        print()
+        for comparison in comparisons:
+            print(comparison)
+        if any(comparison.regressed for comparison in comparisons):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -2,31 +2,57 @@ from misc import (
     SPECIAL_TILE,
     COMPONENT_TILE,
     TILE,
-    GOOD_EFFECT,
-    BAD_EFFECT,
-    NEUTRAL_EFFECT,
-    clear_screen
+    EFFECT
 )
-from random import shuffle, randrange
+from rng import BlockRandom
+from functools import cache, cached_property
 from typing import cast, TYPE_CHECKING
 from cards import RiskCards, ChanceCards
+from view import View
+from turn import TurnResolver, ACTION
+from rules import DEFAULT_RULES, CardEffect, Rules
+from renderer import Renderer
+from state import GameState, Owners, decode_tiles, encode_tiles, get_positions
+from events import EventStream, Moved
+import sys
 
 if TYPE_CHECKING:
     from player import Player
+    from game import Game
+    from layouts import LayoutTable
+
+MAX_JUMP = 12
+BOARD_SIZE = 16
 
 class Node:
     """Represents a node in a circular graph structure for the game board.
 
-    Each Node contains a reference to a tile, an optional owner, a list of players currently on the node,
-    and links to the previous and next nodes, forming a circular doubly-linked list.
+    Each Node is a view of a single tile of the board. It exposes the tile, its owner and the players
+    currently standing on it, and links to the previous and next nodes, forming a circular doubly-linked list.
+    State of the tile is read from the board the node belongs to, so the view never goes out of sync.
     """
-    def __init__(self, tile: TILE) -> None:
+    def __init__(self, tile: TILE, board: 'Board | None' = None, index: int = 0) -> None:
         self.tile = tile
-        self.owner: 'Player' | None = None
-        self.current_players: list['Player'] = []
+        self.board = board
+        self.index = index
         self.prev: Node | None = None
         self.next: Node | None = None
 
+    @property
+    def owner(self) -> 'Player | None':
+        return self.board.owners[self.index] if self.board else None
+
+    @owner.setter
+    def owner(self, player: 'Player | None') -> None:
+        if self.board:
+            self.board.owners[self.index] = player
+
+    @property
+    def current_players(self) -> list['Player']:
+        if not self.board:
+            return []
+        return [player for player in self.board.players if player.position == self.index]
+
 class CircularGraph:
     """Represents the circular graph structure for the game board.
 
@@ -36,8 +62,8 @@ class CircularGraph:
     def __init__(self) -> None:
         self.head: Node | None = None
 
-    def add(self, tile: TILE) -> None:
-        new_node = Node(tile)
+    def add(self, tile: TILE, board: 'Board | None' = None, index: int = 0) -> Node:
+        new_node = Node(tile, board, index)
         if not self.head:
             self.head = new_node
             self.head.next = new_node
@@ -48,378 +74,206 @@ class CircularGraph:
             new_node.prev = tail
             new_node.next = self.head
             self.head.prev = new_node
+        return new_node
 
 class Board:
-    """Represents the circular graph structure for the game board.
+    """Represents the game board.
 
+    Tiles, their owners and the seats of players are kept in the compact arrays of a GameState, tiles and owners
+    are exposed as views over them, and players hold their position as an index, so every move is a lookup
+    in a precomputed jump table. Money, prices and card effects are read from the rules of the board.
     The Board class manages all actions taken by players,
     and creates visual representation of the current state of the board.
     """
-    def __init__(self) -> None:
-        self.board: CircularGraph = self.create_board()
-        self.chance_cards = ChanceCards()
-        self.risk_cards = RiskCards()
-
-    def create_board(self) -> CircularGraph:
-        """Creates randomly generated board.
-
-        Returns:
-            CircularGraph: Circular graph representing the board.
+    def __init__(
+        self,
+        view: View | None = None,
+        rng: BlockRandom | None = None,
+        size: int = BOARD_SIZE,
+        tiles: list[TILE] | None = None,
+        rules: Rules | None = None,
+        layouts: 'LayoutTable | None' = None
+    ) -> None:
+        if tiles:
+            size = len(tiles)
+        if size < BOARD_SIZE:
+            raise ValueError(f"Board needs at least {BOARD_SIZE} tiles")
+        self.rng: BlockRandom = rng if rng else BlockRandom()
+        self.rules: Rules = rules if rules else DEFAULT_RULES
+        self.layouts = layouts
+        self.prices: dict[TILE, int] = self.rules.prices()
+        self.card_effects: dict[EFFECT, CardEffect] = self.rules.card_effects()
+        self.state = GameState(encode_tiles(tiles if tiles else self.create_board(size)), self.rules.start_money)
+        self.owners = Owners(self)
+        self.seats: list['Player'] = []
+        self.jumps: tuple[tuple[tuple[int, int], ...], ...] = self.create_jumps(len(self.tiles))
+        self.chance_cards = ChanceCards(self.rng)
+        self.risk_cards = RiskCards(self.rng)
+        self.resolver = TurnResolver(self)
+        self.players: list['Player'] = []
+        self.view: View = view if view else View()
+        self.game: 'Game | None' = None
+        self.events = EventStream()
+
+    @property
+    def tiles(self) -> tuple[TILE, ...]:
+        """Tiles of the board in order, starting with the START tile. Shared by all boards with the same layout.
         """
-        tiles: list[TILE] = cast(list[TILE], list(SPECIAL_TILE) + list(COMPONENT_TILE) * 2)
-        tiles.remove(SPECIAL_TILE.START)
-        shuffle(tiles)
-        cg = CircularGraph()
-        cg.add(SPECIAL_TILE.START)
-        for tile in tiles:
-            cg.add(tile)
-        return cg
+        return decode_tiles(self.state.tiles)
 
-    def move_player(self, player: 'Player', steps: int) -> None:
-        """Moves player by specified amount of steps.
+    def add_seat(self, player: 'Player') -> None:
+        """Seats a new player, resetting their state.
 
         Args:
-            player (Player): Player to move.
-            steps (int): Amount of steps the player is taking.
+            player (Player): Player to seat.
         """
-        if not player.current_position:
-            return
-        if player in player.current_position.current_players:
-            player.current_position.current_players.remove(player)
-        new_position = player.current_position
-        for _ in range(steps):
-            if new_position.next:
-                new_position = new_position.next
-                if new_position == self.board.head:
-                    player.add_start_money()
-        new_position.current_players.append(player)
-        player.current_position = new_position
+        while len(self.seats) <= player.index:
+            self.seats.append(player)
+        self.seats[player.index] = player
+        self.state.add_player(player.index)
 
-    def move_player_to_position(self, player: 'Player', position_number: int) -> None:
-        """Moves player to specific position on board.
+    def create_board(self, size: int = BOARD_SIZE) -> list[TILE]:
+        """Creates randomly generated board. Boards larger than the standard one repeat the set of tiles
+        until all tiles after START are filled. Boards with a table of layouts draw one of its fair layouts instead.
 
         Args:
-            player (Player): Player to move.
-            position_number (int): Number on the tile to which player is being moved.
-        """
-        if position_number < 1 or position_number > 16:
-            return
-        if player.current_position and player in player.current_position.current_players:
-            player.current_position.current_players.remove(player)
-        current = self.board.head
-        if current and current.next:
-            for _ in range(position_number - 1):
-                current = current.next
-            current.current_players.append(player)
-        player.current_position = current
+            size (int, optional): Number of tiles on the board. Defaults to BOARD_SIZE.
 
-    def get_chance(self, player: 'Player', other_player: 'Player') -> None:
-        """Handles the effect of a Chance card for the player.
+        Raises:
+            ValueError: If the table of layouts holds layouts of another size.
 
-        Args:
-            player (Player): Player drawing the Chance card.
-            other_player (Player): Other player in the game.
+        Returns:
+            list[TILE]: Tiles of the board in order, starting with the START tile.
         """
-        effect = self.chance_cards.use_card()
-        match effect:
-            case GOOD_EFFECT.RAISE:
-                input("Claim 500$")
-                player.money += 500
-            case GOOD_EFFECT.BONUS:
-                input("Claim 400$")
-                player.money += 400
-            case GOOD_EFFECT.ADVANCE:
-                input("Move by 3 tiles")
-                self.move_player(player, 3)
-                clear_screen()
-                print(f"P1 money: {player.money} | P2 money: {other_player.money}")
-                print()
-                print(f"Current player: {player.name}")
-                self.display()
-                self.buy_part(player, player, other_player, player, None)
-            case GOOD_EFFECT.MOVE:
-                input("Roll the dice")
-                dice_roll = randrange(1, 7)
-                self.move_player(player, dice_roll)
-                clear_screen()
-                player.move(dice_roll)
-                print(f"P1 money: {player.money} | P2 money: {other_player.money}")
-                print(f"{player.name} rolled: {dice_roll}")
-                print(f"Current player: {player.name}")
-                self.display()
-                self.buy_part(player, player, other_player, player, dice_roll)
-            case _:
-                pass
-
-    def get_risk(self, player: 'Player', other_player: 'Player') -> None:
-        """Handles the effect of a Risk card for the player.
+        if self.layouts:
+            if self.layouts.size != size:
+                raise ValueError(f"Layouts have {self.layouts.size} tiles, not {size}")
+            return self.layouts.draw(self.rng)
+        pool: list[TILE] = cast(list[TILE], list(SPECIAL_TILE) + list(COMPONENT_TILE) * 2)
+        pool.remove(SPECIAL_TILE.START)
+        tiles = (pool * -(-(size - 1) // len(pool)))[:size - 1]
+        self.rng.shuffle(tiles)
+        return [SPECIAL_TILE.START] + tiles
 
-        Args:
-            player (Player): Player drawing the Risk card.
-            other_player (Player): Other player in the game.
-        """
-        effect = self.risk_cards.use_card()
-        match effect:
-            case GOOD_EFFECT.RAISE:
-                input("Claim 500$")
-                player.money += 500
-            case GOOD_EFFECT.BONUS:
-                input("Claim 400$")
-                player.money += 400
-            case GOOD_EFFECT.ADVANCE:
-                input("Move by 3 tiles")
-                clear_screen()
-                self.move_player(player, 3)
-                print(f"P1 money: {player.money} | P2 money: {other_player.money}")
-                print()
-                print(f"Current player: {player.name}")
-                self.display()
-                self.buy_part(player, player, other_player, player, None)
-            case GOOD_EFFECT.MOVE:
-                input("Roll the dice")
-                dice_roll = randrange(1, 7)
-                self.move_player(player, dice_roll)
-                clear_screen()
-                print(f"P1 money: {player.money} | P2 money: {other_player.money}")
-                print(f"{player.name} rolled: {dice_roll}")
-                print(f"Current player: {player.name}")
-                self.display()
-                self.buy_part(player, player, other_player, player, dice_roll)
-            case BAD_EFFECT.LOOSE:
-                input("You are loosing 300$ ")
-                player.money -= 300
-            case NEUTRAL_EFFECT.NOTHING:
-                input("Nothing ever happens")
-            case _:
-                pass
-
-    def handle_buying(self, player: 'Player', other_player: 'Player') -> None:
-        """Handles the logic for a player buying a component tile or paying rent to another player.
+    @staticmethod
+    @cache
+    def create_jumps(size: int) -> tuple[tuple[tuple[int, int], ...], ...]:
+        """Precomputes destinations of moves of up to MAX_JUMP steps from every position.
+        The table depends only on the size of the board, so it is shared by all boards of the same size.
 
         Args:
-            player (Player): Player taking the action.
-            other_player (Player): Other player in the game.
+            size (int): Number of tiles on the board.
+
+        Returns:
+            tuple[tuple[tuple[int, int], ...], ...]: Table indexed by position and steps holding the destination
+            and the number of times the START tile is passed on the way.
         """
-        if player.current_position and player.current_position.owner:
-                if player.current_position.owner == player:
-                    return
-                elif isinstance(player.current_position.tile, COMPONENT_TILE):
-                    player.money -= player.current_position.tile.value
-                    other_player.money += player.current_position.tile.value
-        elif player.current_position and isinstance(player.current_position.tile, COMPONENT_TILE) and player.money >= player.current_position.tile.value:
-            user_input = ""
-            while user_input not in {"yes", "no"}:
-                user_input = input("Are you willing to buy this part [yes | no]: ")
-                if user_input == "yes":
-                    player.current_position.owner = player
-                    player.money -= player.current_position.tile.value
-                    player.add_owned_part(player.current_position.tile)
-
-    def buy_part(self, player: 'Player', player_1, player_2, current_player, dice_roll) -> None:
-        """Handles the logic for a player attempting to buy a part or triggering special tile actions.
+        return tuple(
+            tuple(((position + steps) % size, (position + steps) // size) for steps in range(MAX_JUMP + 1))
+            for position in range(size)
+        )
 
-        Args:
-            player (Player): Player taking the action.
-            player_1 (Player): First player in the game.
-            player_2 (Player): Second player in the game.
-            current_player (Player): Player whose turn it currently is.
-            dice_roll (int | None): The value of the dice roll, if applicable.
+    @cached_property
+    def board(self) -> CircularGraph:
+        """Circular graph view of the board, created on first use.
+
+        Returns:
+            CircularGraph: Circular graph representing the board.
         """
-        if player.current_position and player.current_position.owner:
-            self.handle_buying(player, player_1 if player_1 != current_player else player_2)
-        self.handle_buying(player, player_2)
-        if player.current_position and isinstance(player.current_position.tile, SPECIAL_TILE):
-            user_input_: int = -1
-            match player.current_position.tile:
-                case SPECIAL_TILE.CHANCE:
-                    self.get_chance(player, player_1 if current_player != player_1 else player_2)
-                case SPECIAL_TILE.RISK:
-                    self.get_risk(player, player_1 if current_player != player_1 else player_2)
-                case SPECIAL_TILE.TRAVEL:
-                    while user_input_ < 1 or user_input_ > 16:
-                        try:
-                            user_input_ = int(input("Enter tile number u want to travel to [1 - 16]: "))
-                        except ValueError:
-                            user_input_ = 0
-                    self.move_player_to_position(player, user_input_)
-                    clear_screen()
-                    print(f"P1 money: {player_1.money} | P2 money: {player_2.money}")
-                    print(f"{current_player.name} rolled: {dice_roll}") if dice_roll else print()
-                    print(f"Current player: {current_player.name}")
-                    self.display()
-                    self.buy_part(player, player_2, player_2, current_player, dice_roll)
-                case _:
-                    pass
+        cg = CircularGraph()
+        for index, tile in enumerate(self.tiles):
+            cg.add(tile, self, index)
+        return cg
 
-    @staticmethod
-    def draw_separator(row_idx: int) -> None:
-        """Prints a separator line for a board display based on the given row index.
+    @cached_property
+    def nodes(self) -> list[Node]:
+        """Nodes of the circular graph view indexed by position.
 
-        Args:
-            row_idx (int): The index of the row for which the separator should be drawn.
+        Returns:
+            list[Node]: Nodes of the board in order.
         """
-        if row_idx == 0:
-            print("┌────────" + "┬────────" * 4 + "┐")
-        elif row_idx == 1:
-            print("├────────" + "┼────────" + "┴────────" * 2 + "┼────────" + "┤")
-        elif row_idx == 4:
-            print("├────────" + "┼────────" + "┬────────" * 2 + "┼────────" + "┤")
-        elif row_idx == 5:
-            print("└────────" + "┴────────" * 4 + "┘")
-        elif row_idx == 3:
-            print("├────────┤ " + " " * 9 + "c0pson" + " " * 9 + " ├────────┤")
-        else:
-            print("├────────┤ " + " " * 8 + "GIGAPOLY" + " " * 8 + " ├────────┤")
+        nodes: list[Node] = []
+        current = self.board.head
+        for _ in self.tiles:
+            if current:
+                nodes.append(current)
+                current = current.next
+        return nodes
 
-    @staticmethod
-    def get_position_number(row_idx: int, col_idx: int) -> int:
-        """Returns the board position number for a given row and column index.
+    def unowned_tiles(self, tile: TILE) -> list[int]:
+        """Returns positions of the unowned tiles of a component, read from the ownership index.
 
         Args:
-            row_idx (int): Row index on the board grid.
-            col_idx (int): Column index on the board grid.
+            tile (TILE): Component.
 
         Returns:
-            int: The position number on the board corresponding to the given indices.
+            list[int]: Positions of unowned tiles, in order.
         """
-        border_pos_map = {
-            (0, 0): 1,  (0, 1): 2,
-            (0, 2): 3,  (0, 3): 4,
-            (0, 4): 5,  (1, 4): 6,
-            (2, 4): 7,  (3, 4): 8,
-            (4, 4): 9,  (4, 3): 10,
-            (4, 2): 11, (4, 1): 12,
-            (4, 0): 13, (3, 0): 14,
-            (2, 0): 15, (1, 0): 16
-        }
-        return border_pos_map.get((row_idx, col_idx), 0)
+        return get_positions(self.state.unowned_tiles(tile))
 
-    @staticmethod
-    def get_owner_display(node: Node) -> str:
-        """Returns a string representation of the owner of a given node.
+    def remove_player(self, player: 'Player') -> None:
+        """Removes bankrupt player from the board, releasing all tiles they own.
 
         Args:
-            node (Node): Object representing a node on the board.
-
-        Returns:
-            str: The name of the owner if the node and its owner exist, otherwise '--'.
+            player (Player): Player to remove.
         """
-        if not node or not node.owner:
-            return "--"
-        return node.owner.name
+        if player in self.players:
+            self.players.remove(player)
+        self.state.release(player.index)
 
-    @staticmethod
-    def get_players_display(node: Node) -> str:
-        """Returns a formatted string displaying the names of the current players at a given node,
-        with color coding based on player name (yellow for names containing "1", green otherwise).
+    def move_player(self, player: 'Player', steps: int) -> None:
+        """Moves player by specified amount of steps.
 
         Args:
-            node (Node): Object representing a node on the board.
+            player (Player): Player to move.
+            steps (int): Amount of steps the player is taking.
+        """
+        start = player.position
+        if steps <= MAX_JUMP:
+            destination, passes = self.jumps[start][steps]
+        else:
+            passes, destination = divmod(start + steps, len(self.tiles))
+        for _ in range(passes):
+            player.add_start_money()
+        player.position = destination
+        if self.events:
+            self.events.emit(Moved(player, start, destination, passes))
 
-        Returns:
-            str: A formatted string of player names with ANSI color codes.
+    def move_player_to_position(self, player: 'Player', position_number: int) -> None:
+        """Moves player to specific position on board.
+
+        Args:
+            player (Player): Player to move.
+            position_number (int): Number on the tile to which player is being moved.
         """
-        if not node or not node.current_players:
-            return ""
-        player_names = [f"{"\033[33m" if "1" in player.name else "\033[32m"}{player.name}\033[0m" for player in node.current_players]
-        return " ".join(player_names) + "  " * (int(2 / len(player_names))) + " " * (int(2 / len(player_names)))
+        if position_number < 1 or position_number > len(self.tiles):
+            return
+        start = player.position
+        player.position = position_number - 1
+        if self.events:
+            self.events.emit(Moved(player, start, player.position, 0))
 
-    def draw_cell_lines(self, row: list[TILE], row_idx: int, temp_nodes: list[list[Node]]) -> None:
-        """Draws the content lines for each cell in a board row.
+    def buy_part(self, player: 'Player', dice_roll: int | None) -> None:
+        """Handles the logic for a player attempting to buy a part or triggering special tile actions,
+        including every follow-up landing, asking the policy of the player for decisions.
 
         Args:
-            row (list[TILE]): The row of tiles to draw.
-            row_idx (int): The index of the row.
-            temp_nodes (list[list[Node]]): Temporary node data for the board.
+            player (Player): Player taking the action.
+            dice_roll (int | None): The value of the dice roll, if applicable.
         """
-        for line in range(4):
-            if row_idx in {0, 4}:
-                out = ""
-                for col_idx, cell in enumerate(row):
-                    content = ""
-                    node = temp_nodes[row_idx][col_idx]
-                    pos_num = self.get_position_number(row_idx, col_idx)
-                    if line == 0:
-                        players_str = self.get_players_display(node)
-                        content = players_str.center(8)
-                    elif line == 1 and cell != 0:
-                        content = str(cell.name).center(8)
-                    elif line == 2:
-                        if node:
-                            owner_str = self.get_owner_display(node)
-                            content = owner_str.center(8)
-                        else:
-                            content = " " * 8
-                    elif line == 3:
-                        if pos_num > 0:
-                            content = f"{pos_num:<8}"
-                        else:
-                            content = " " * 8
-                    else:
-                        content = " " * 8
-                    out += "│" + content
-                out += "│"
-                print(out)
-            else:
-                left_cell = row[0]
-                right_cell = row[4]
-                left_node = temp_nodes[row_idx][0]
-                right_node = temp_nodes[row_idx][4]
-                left_content = ""
-                right_content = ""
-                left_pos = self.get_position_number(row_idx, 0)
-                right_pos = self.get_position_number(row_idx, 4)
-                if line == 0:
-                    left_players = self.get_players_display(left_node)
-                    right_players = self.get_players_display(right_node)
-                    left_content = left_players.center(8)
-                    right_content = right_players.center(8)
-                elif line == 1:
-                    if left_cell != 0:
-                        left_content = str(left_cell.name).center(8)
-                    else:
-                        left_content = " " * 8
-                    if right_cell != 0:
-                        right_content = str(right_cell.name).center(8)
-                    else:
-                        right_content = " " * 8
-                elif line == 2:
-                    left_owner = self.get_owner_display(left_node)
-                    right_owner = self.get_owner_display(right_node)
-                    left_content = left_owner.center(8)
-                    right_content = right_owner.center(8)
-                elif line == 3:
-                    if left_pos > 0:
-                        left_content = f"{left_pos:<8}"
-                    else:
-                        left_content = " " * 8
-                    if right_pos > 0:
-                        right_content = f"{right_pos:<8}"
-                    else:
-                        right_content = " " * 8
-                else:
-                    left_content = " " * 8
-                    right_content = " " * 8
-                print("│" + left_content + "│" + " " * 26 + "│" + right_content + "│")
+        self.resolver.push(ACTION.LAND, player, dice_roll)
+        self.resolver.run()
+
+    @cached_property
+    def renderer(self) -> Renderer:
+        """Renderer drawing this board to the terminal, created on first use.
+
+        Returns:
+            Renderer: Renderer of the board.
+        """
+        return Renderer(self)
 
     def display(self) -> None:
-        """Displays the current state of the board by mapping tiles and nodes to a 5x5 grid.
+        """Displays the current state of the board with a single write to the terminal.
         """
-        temp_board: list[list[TILE]] = cast(list[list[TILE]], [[0 for _ in range(5)] for _ in range(5)])
-        temp_nodes: list[list[Node]] = cast(list[list[Node]], [[None for _ in range(5)] for _ in range(5)])
-        border_positions: list[tuple[int, int]] = [
-            (0, 0), (0, 1), (0, 2), (0, 3),
-            (0, 4), (1, 4), (2, 4), (3, 4),
-            (4, 4), (4, 3), (4, 2), (4, 1),
-            (4, 0), (3, 0), (2, 0), (1, 0)
-        ]
-        current = self.board.head
-        for row, col in border_positions:
-            if current:
-                temp_board[row][col] = current.tile
-                temp_nodes[row][col] = current
-                current = current.next
-        for i, row_ in enumerate(temp_board):
-            self.draw_separator(i)
-            self.draw_cell_lines(row_, i, temp_nodes)
-        self.draw_separator(5)
+        sys.stdout.write(self.renderer.frame() + "\n")
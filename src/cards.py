@@ -1,6 +1,6 @@
 from misc import EFFECT, GOOD_EFFECT, BAD_EFFECT, NEUTRAL_EFFECT
+from rng import BlockRandom, DeckStream, CHANCE, RISK
 from abc import ABC, abstractmethod
-from random import shuffle
 from typing import TypeVar, Generic
 
 T = TypeVar("T", bound=EFFECT)
@@ -9,47 +9,68 @@ class Cards(ABC, Generic[T]):
     """
     Abstract base class representing a generic deck of cards.
     Provides a template for creating, shuffling, and using cards from a deck.
+
+    Cards of a full deck are kept in a fixed order, and every shuffle of the deck is a permutation drawn
+    from the stream of the deck, so drawing a card allocates nothing and a new deck costs a single slice.
     """
-    def __init__(self) -> None:
-        self.deck: list[T] = self.create_deck()
+    stream_number: int
+
+    def __init__(self, rng: BlockRandom | None = None) -> None:
+        self.rng: BlockRandom = rng if rng else BlockRandom()
+        self.cards: tuple[T, ...] = tuple(self.create_deck())
+        self.codes: dict[T, int] = {card: code for code, card in enumerate(self.cards)}
+        self.stream: DeckStream = self.rng.open(DeckStream(self.stream_number, len(self.cards)))
+        self.order: bytes = b""
+        self.position = 0
 
     @abstractmethod
     def create_deck(self) -> list[T]:
-        """Abstract method for creating shuffled deck of cards.
+        """Abstract method for creating a full deck of cards.
 
         Returns:
-            list[T]: Shuffled deck of cards.
+            list[T]: Cards of the deck, in fixed order.
         """
         pass
 
-    def shuffle_deck(self, deck: list[T]) -> list[T]:
-        """Shuffles the deck of cards.
+    @property
+    def deck(self) -> list[T]:
+        """Cards remaining in the deck, the first one is drawn first.
+        """
+        return [self.cards[code] for code in self.order[self.position:]]
 
-        Args:
-            deck (list[T]): Deck of cards
+    @deck.setter
+    def deck(self, cards: list[T]) -> None:
+        self.order = bytes(map(self.codes.__getitem__, cards))
+        self.position = 0
 
-        Returns:
-            list[T]: Shuffled deck of cards.
+    def shuffle(self) -> None:
+        """Shuffles the cards remaining in the deck.
         """
-        shuffle(deck)
-        return deck
+        deck = self.deck
+        self.rng.shuffle(deck)
+        self.deck = deck
 
     def use_card(self) -> T:
-        """Returns the card from the deck of cards if not empty. Creates a new one if empty and returns the card.
+        """Returns the card from the deck of cards if not empty. Shuffles a new one if empty and returns the card.
 
         Returns:
             T: Card.
         """
-        if not len(self.deck):
-            self.deck = self.create_deck()
-        return self.deck.pop()
+        position = self.position
+        if position == len(self.order):
+            self.order = self.stream.take(len(self.cards))
+            position = 0
+        self.position = position + 1
+        return self.cards[self.order[position]]
 
 class RiskCards(Cards[EFFECT]):
+    stream_number = RISK
+
     def create_deck(self) -> list[EFFECT]:
-        return self.shuffle_deck(
-            [e for e in GOOD_EFFECT] + [e for e in BAD_EFFECT] + [e for e in NEUTRAL_EFFECT]
-        )
+        return [e for e in GOOD_EFFECT] + [e for e in BAD_EFFECT] + [e for e in NEUTRAL_EFFECT]
 
 class ChanceCards(Cards[GOOD_EFFECT]):
+    stream_number = CHANCE
+
     def create_deck(self) -> list[GOOD_EFFECT]:
-        return self.shuffle_deck(list(GOOD_EFFECT))
+        return list(GOOD_EFFECT)
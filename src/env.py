@@ -0,0 +1,391 @@
+from game import Game
+from board import Board, BOARD_SIZE
+from player import Player
+from policy import Policy
+from misc import COMPONENT_TILE, TILE_CODES
+from rules import Rules
+from state import PARTS
+from turn import DECISION, Decision
+from tournament import POLICIES, create_policy
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any
+import argparse
+import os
+import time
+import numpy as np
+
+AGENT_DECISIONS = (DECISION.BUY, DECISION.TRAVEL)
+N_CODES = len(TILE_CODES)
+N_PARTS = len(PARTS)
+RESET = "reset"
+STEP = "step"
+CLOSE = "close"
+
+def observation_size(size: int, players: int) -> int:
+    """Returns the length of observations of games of the given size and number of players.
+
+    Args:
+        size (int): Number of tiles on the board.
+        players (int): Number of players.
+
+    Returns:
+        int: Number of values of an observation.
+    """
+    return size * (N_CODES + players + 1) + players * (size + N_PARTS + 2) + len(AGENT_DECISIONS)
+
+class AgentPolicy(Policy):
+    """Policy of the seat of an agent. Its decisions are answered by the actions given to GameEnv.step,
+    so it is never asked for them.
+    """
+    def decide_buy(self, board: Board, player: Player, tile: COMPONENT_TILE) -> bool:
+        raise RuntimeError("Decisions of the agent are taken by GameEnv.step")
+
+    def choose_travel(self, board: Board, player: Player) -> int:
+        raise RuntimeError("Decisions of the agent are taken by GameEnv.step")
+
+class GameEnv:
+    """Game seen by a learning agent seated among bots, played one decision of the agent at a time.
+
+    The turn resolver of the game is advanced until the agent has to buy or skip a tile it landed on,
+    or choose the tile to travel to from TRAVEL. Decisions of other players are answered by their policies
+    and acknowledgements are skipped. Actions are integers: any non-zero action buys a tile, and the
+    action of a travel is the position of the target tile, so the action space is the positions of the board.
+
+    Observations are vectors of float32, see observe, with players rotated so the agent always comes first.
+    The reward is 1 for a won game, -1 for a lost one and 0 otherwise, given when the game is over for the agent.
+    """
+    def __init__(
+        self,
+        size: int = BOARD_SIZE,
+        opponents: tuple[str, ...] = ("greedy",),
+        seat: int = 0,
+        max_turns: int = 1000,
+        rules: Rules | None = None
+    ) -> None:
+        self.size = size
+        self.opponents = opponents
+        self.players = len(opponents) + 1
+        if not 0 <= seat < self.players:
+            raise ValueError(f"Seat must be from 0 to {self.players - 1}")
+        self.seat = seat
+        self.max_turns = max_turns
+        self.rules = rules
+        self.rotation = [(seat + offset) % self.players for offset in range(self.players)]
+        self.owner_codes = np.array([0] + [(index - seat) % self.players + 1 for index in range(self.players)], dtype=np.intp)
+        self.tile_table = np.eye(N_CODES, dtype=np.float32)
+        self.owner_table = np.eye(self.players + 1, dtype=np.float32)
+        self.position_table = np.eye(size, dtype=np.float32)
+        self.part_table = np.array([[(mask >> bit) & 1 for bit in range(N_PARTS)] for mask in range(1 << N_PARTS)], dtype=np.float32)
+        self.game: Game | None = None
+        self.agent: Player | None = None
+        self.player: Player | None = None
+        self.decision: Decision | None = None
+
+    def reset(self, seed: int | None = None) -> None:
+        """Starts a new game and plays it until the first decision of the agent.
+
+        Args:
+            seed (int | None, optional): Seed of the game. Defaults to None.
+        """
+        seats = [seat for seat in range(self.players) if seat != self.seat]
+        policies: list[Policy] = [create_policy(name, seed, seat) for seat, name in zip(seats, self.opponents)]
+        policies.insert(self.seat, AgentPolicy())
+        self.game = Game(policies, max_turns=self.max_turns, seed=seed, size=self.size, rules=self.rules)
+        self.agent = self.game.players[self.seat]
+        self.player = None
+        self.advance()
+
+    def advance(self) -> bool:
+        """Plays the game until the agent has to decide or the game is over for the agent.
+
+        Returns:
+            bool: True if the game is over for the agent.
+        """
+        game = self.game
+        assert game
+        resolver = game.board.resolver
+        while True:
+            if not self.player:
+                self.player = game.start_turn()
+            while decision := resolver.advance():
+                if decision.player is self.agent and decision.kind in AGENT_DECISIONS:
+                    self.decision = decision
+                    return False
+                resolver.resolve(decision.player.policy.decide(game.board, decision))
+            game.end_turn(self.player)
+            self.player = None
+            if self.done:
+                self.decision = None
+                return True
+
+    def step(self, action: int) -> bool:
+        """Answers the pending decision of the agent and plays until its next decision.
+
+        Args:
+            action (int): Action of the agent.
+
+        Returns:
+            bool: True if the game is over for the agent.
+        """
+        assert self.game and self.decision
+        answer = bool(action) if self.decision.kind == DECISION.BUY else int(action) % self.size + 1
+        self.game.board.resolver.resolve(answer)
+        return self.advance()
+
+    @property
+    def done(self) -> bool:
+        """Whether the game is over for the agent, because it ended or the agent went bankrupt."""
+        assert self.game and self.agent
+        return not self.game.running or self.agent.is_bankrupt()
+
+    @property
+    def reward(self) -> float:
+        """Reward of the agent for the game, 0 until the game is over for the agent."""
+        if not self.done or not self.game or not self.agent:
+            return 0.0
+        if self.game.winner is self.agent:
+            return 1.0
+        return -1.0 if self.game.winner or self.agent.is_bankrupt() else 0.0
+
+    def observe(self, out: np.ndarray) -> None:
+        """Writes the observation of the agent.
+
+        The observation holds, in order: one-hot codes of tiles, one-hot owners of tiles (no owner first),
+        then for every player the one-hot position, money divided by start money (if any), bits of distinct parts and
+        whether the player is bankrupt, and finally which decision the agent is taking.
+
+        Args:
+            out (np.ndarray): Vector of observation_size values to write to.
+        """
+        assert self.game
+        state = self.game.board.state
+        size, players = self.size, self.players
+        offset = size * N_CODES
+        out[:offset] = self.tile_table[np.frombuffer(state.tiles, dtype=np.uint8)].ravel()
+        owners = self.owner_codes[np.frombuffer(state.owners, dtype=np.uint8)]
+        out[offset:offset + size * (players + 1)] = self.owner_table[owners].ravel()
+        offset += size * (players + 1)
+        out[offset:offset + players * size] = self.position_table[[state.positions[index] for index in self.rotation]].ravel()
+        offset += players * size
+        scale = state.start_money or 1
+        out[offset:offset + players] = [state.money[index] / scale for index in self.rotation]
+        offset += players
+        out[offset:offset + players * N_PARTS] = self.part_table[[state.parts[index] for index in self.rotation]].ravel()
+        offset += players * N_PARTS
+        out[offset:offset + players] = [state.resigned[index] for index in self.rotation]
+        offset += players
+        kind = self.decision.kind if self.decision else None
+        out[offset:] = [kind == decision for decision in AGENT_DECISIONS]
+
+def attach(names: dict[str, str], shapes: dict[str, tuple[tuple[int, ...], str]]) -> tuple[list[SharedMemory], dict[str, np.ndarray]]:
+    """Attaches arrays of shared memory created by VectorEnv.
+
+    Args:
+        names (dict[str, str]): Name of the shared memory of every array.
+        shapes (dict[str, tuple[tuple[int, ...], str]]): Shape and type of every array.
+
+    Returns:
+        tuple[list[SharedMemory], dict[str, np.ndarray]]: Blocks of shared memory and arrays over them.
+    """
+    blocks = [SharedMemory(name) for name in names.values()]
+    arrays = {
+        key: np.ndarray(shapes[key][0], dtype=shapes[key][1], buffer=block.buf)
+        for key, block in zip(names, blocks)
+    }
+    return blocks, arrays
+
+def run_worker(
+    connection: Connection,
+    names: dict[str, str],
+    shapes: dict[str, tuple[tuple[int, ...], str]],
+    first: int,
+    count: int,
+    seed: int,
+    options: dict[str, Any]
+) -> None:
+    """Runs a block of environments in a worker process, writing straight into the shared arrays.
+
+    Game e of the vector starts episode k with seed `seed + e + k * n_envs`, so games do not depend on
+    the number of workers.
+
+    Args:
+        connection (Connection): End of the pipe receiving commands, answered once they are done.
+        names (dict[str, str]): Name of the shared memory of every array.
+        shapes (dict[str, tuple[tuple[int, ...], str]]): Shape and type of every array.
+        first (int): Index of the first environment of the block.
+        count (int): Number of environments of the block.
+        seed (int): Seed of the first game of the vector.
+        options (dict[str, Any]): Arguments of GameEnv.
+    """
+    blocks, arrays = attach(names, shapes)
+    observations, rewards, dones, actions = arrays["observations"], arrays["rewards"], arrays["dones"], arrays["actions"]
+    n_envs = len(actions)
+    envs = [GameEnv(**options) for _ in range(count)]
+    episodes = [0] * count
+    envs_range = range(first, first + count)
+
+    def restart(slot: int, index: int) -> None:
+        envs[slot].reset(seed + index + episodes[slot] * n_envs)
+        episodes[slot] += 1
+        while envs[slot].done:
+            envs[slot].reset(seed + index + episodes[slot] * n_envs)
+            episodes[slot] += 1
+
+    try:
+        while (command := connection.recv()) != CLOSE:
+            for slot, index in enumerate(envs_range):
+                env = envs[slot]
+                if command == RESET:
+                    restart(slot, index)
+                    rewards[index] = 0.0
+                    dones[index] = False
+                else:
+                    done = env.step(int(actions[index]))
+                    rewards[index] = env.reward
+                    dones[index] = done
+                    if done:
+                        restart(slot, index)
+                env.observe(observations[index])
+            connection.send(None)
+    finally:
+        del observations, rewards, dones, actions, arrays
+        for block in blocks:
+            block.close()
+
+class VectorEnv:
+    """Many copies of GameEnv stepped at once by a pool of worker processes.
+
+    Observations, rewards, done flags and actions live in arrays of shared memory. Workers read actions and
+    write the results of their block of environments into them in place, so a step sends only a short
+    command to every worker and no game or array ever crosses a process boundary. Finished games are reset
+    right away: the observation of a done environment is the first observation of its next game.
+    Arrays returned by reset and step are the shared arrays themselves, copy them to keep them past the next step.
+    """
+    def __init__(
+        self,
+        n_envs: int,
+        workers: int | None = None,
+        seed: int = 0,
+        size: int = BOARD_SIZE,
+        opponents: tuple[str, ...] = ("greedy",),
+        seat: int = 0,
+        max_turns: int = 1000,
+        rules: Rules | None = None
+    ) -> None:
+        workers = min(workers if workers else os.cpu_count() or 1, n_envs)
+        self.n_envs = n_envs
+        shapes: dict[str, tuple[tuple[int, ...], str]] = {
+            "observations": ((n_envs, observation_size(size, len(opponents) + 1)), "float32"),
+            "rewards": ((n_envs,), "float32"),
+            "dones": ((n_envs,), "bool"),
+            "actions": ((n_envs,), "int64"),
+        }
+        self.blocks: dict[str, SharedMemory] = {
+            key: SharedMemory(create=True, size=max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize))
+            for key, (shape, dtype) in shapes.items()
+        }
+        self.arrays = {
+            key: np.ndarray(shape, dtype=dtype, buffer=self.blocks[key].buf)
+            for key, (shape, dtype) in shapes.items()
+        }
+        self.observations = self.arrays["observations"]
+        self.rewards = self.arrays["rewards"]
+        self.dones = self.arrays["dones"]
+        self.actions = self.arrays["actions"]
+        names = {key: block.name for key, block in self.blocks.items()}
+        options = {"size": size, "opponents": opponents, "seat": seat, "max_turns": max_turns, "rules": rules}
+        self.connections: list[Connection] = []
+        self.processes: list[Process] = []
+        for worker in range(workers):
+            first, stop = n_envs * worker // workers, n_envs * (worker + 1) // workers
+            parent, child = Pipe()
+            process = Process(target=run_worker, args=(child, names, shapes, first, stop - first, seed, options), daemon=True)
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+
+    def send(self, command: str) -> None:
+        """Sends a command to all workers and waits until they are done.
+
+        Args:
+            command (str): Command to send.
+        """
+        for connection in self.connections:
+            connection.send(command)
+        for connection in self.connections:
+            connection.recv()
+
+    def reset(self) -> np.ndarray:
+        """Starts new games in all environments.
+
+        Returns:
+            np.ndarray: Observations of all environments.
+        """
+        self.send(RESET)
+        return self.observations
+
+    def step(self, actions: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Takes an action in every environment, resetting the ones whose game is over.
+
+        Args:
+            actions (np.ndarray): Action of every environment.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: Observations, rewards and done flags of all environments.
+        """
+        self.actions[:] = actions
+        self.send(STEP)
+        return self.observations, self.rewards, self.dones
+
+    def close(self) -> None:
+        """Stops the workers and frees the shared memory."""
+        for connection in self.connections:
+            try:
+                connection.send(CLOSE)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join()
+        for connection in self.connections:
+            connection.close()
+        self.connections.clear()
+        self.processes.clear()
+        self.arrays.clear()
+        del self.observations, self.rewards, self.dones, self.actions
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+        self.blocks.clear()
+
+    def __enter__(self) -> 'VectorEnv':
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measures the throughput of vectorized Gigapoly environments under random actions.")
+    parser.add_argument("--envs", type=int, default=64, help="number of environments")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--steps", type=int, default=1000, help="number of steps of all environments")
+    parser.add_argument("--opponents", nargs="+", choices=POLICIES, default=["greedy"], help="policies of the other seats")
+    parser.add_argument("--size", type=int, default=BOARD_SIZE, help="number of tiles on the board")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+    with VectorEnv(args.envs, args.workers, args.seed, args.size, tuple(args.opponents)) as env:
+        env.reset()
+        games = wins = 0
+        start = time.perf_counter()
+        for _ in range(args.steps):
+            _, rewards, dones = env.step(rng.integers(0, args.size, args.envs))
+            games += int(dones.sum())
+            wins += int((rewards > 0).sum())
+        elapsed = time.perf_counter() - start
+    print(f"{args.envs * args.steps / elapsed:.0f} steps/s | games: {games} | agent wins: {wins / max(games, 1):.2%}")
+
+if __name__ == "__main__":
+    main()
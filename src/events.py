@@ -0,0 +1,188 @@
+from misc import TILE, EFFECT
+from collections import Counter, deque
+from typing import Generator, NamedTuple, TextIO, TYPE_CHECKING
+import sys
+
+if TYPE_CHECKING:
+    from game import Game
+    from player import Player
+
+class TurnStarted(NamedTuple):
+    player: 'Player'
+    turn: int
+
+class Rolled(NamedTuple):
+    player: 'Player'
+    value: int
+
+class Moved(NamedTuple):
+    player: 'Player'
+    start: int
+    end: int
+    passes: int
+
+class RentPaid(NamedTuple):
+    player: 'Player'
+    owner: 'Player'
+    tile: TILE
+    amount: int
+
+class Bought(NamedTuple):
+    player: 'Player'
+    tile: TILE
+    price: int
+
+class Declined(NamedTuple):
+    player: 'Player'
+    tile: TILE
+
+class CardDrawn(NamedTuple):
+    player: 'Player'
+    effect: EFFECT
+
+class CardApplied(NamedTuple):
+    player: 'Player'
+    effect: EFFECT
+    money: int
+
+class Bankrupted(NamedTuple):
+    player: 'Player'
+    resigned: bool
+
+class GameEnded(NamedTuple):
+    winner: 'Player | None'
+    turns: int
+
+Event = TurnStarted | Rolled | Moved | RentPaid | Bought | Declined | CardDrawn | CardApplied | Bankrupted | GameEnded
+Subscriber = Generator[None, Event, None]
+
+class EventStream:
+    """Typed events of every state transition of a game, sent to subscribed generators.
+
+    A subscriber is a generator receiving events through yield, started when it subscribes. Emitters check
+    the stream before building an event, and an empty stream is falsy, so games nobody listens to
+    neither create events nor format anything.
+    """
+    def __init__(self) -> None:
+        self.subscribers: list[Subscriber] = []
+
+    def __bool__(self) -> bool:
+        return bool(self.subscribers)
+
+    def subscribe(self, subscriber: Subscriber) -> Subscriber:
+        """Starts a subscriber and sends it all further events.
+
+        Args:
+            subscriber (Subscriber): Generator receiving events.
+
+        Returns:
+            Subscriber: The subscriber, to unsubscribe it later.
+        """
+        next(subscriber)
+        self.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Stops sending events to a subscriber and closes it.
+
+        Args:
+            subscriber (Subscriber): Subscribed generator.
+        """
+        if subscriber in self.subscribers:
+            self.subscribers.remove(subscriber)
+        subscriber.close()
+
+    def emit(self, event: Event) -> None:
+        """Sends an event to all subscribers. Subscribers which return stop receiving events.
+
+        Args:
+            event (Event): Event to send.
+        """
+        for subscriber in list(self.subscribers):
+            try:
+                subscriber.send(event)
+            except StopIteration:
+                self.subscribers.remove(subscriber)
+
+def format_event(event: Event) -> str:
+    """Formats an event as a line of text.
+
+    Args:
+        event (Event): Event to format.
+
+    Returns:
+        str: Description of the event.
+    """
+    match event:
+        case TurnStarted(player, turn):
+            return f"Turn {turn}: {player.name}"
+        case Rolled(player, value):
+            return f"{player.name} rolled {value}"
+        case Moved(player, start, end, passes):
+            return f"{player.name} moved from {start + 1} to {end + 1}" + (f", passing START {passes}x" if passes else "")
+        case RentPaid(player, owner, tile, amount):
+            return f"{player.name} paid {amount} rent for {tile.name} to {owner.name}"
+        case Bought(player, tile, price):
+            return f"{player.name} bought {tile.name} for {price}"
+        case Declined(player, tile):
+            return f"{player.name} declined to buy {tile.name}"
+        case CardDrawn(player, effect):
+            return f"{player.name} drew {effect.name}"
+        case CardApplied(player, effect, money):
+            if not money:
+                return f"{player.name} played {effect.name}"
+            return f"{player.name} {'gained' if money > 0 else 'lost'} {abs(money)} from {effect.name}"
+        case Bankrupted(player, resigned):
+            return f"{player.name} {'resigned' if resigned else 'bankrupted'}"
+        case GameEnded(winner, turns):
+            return f"{winner.name} won the game after {turns} turns" if winner else f"Draw after {turns} turns"
+    return repr(event)
+
+def printer(out: TextIO | None = None) -> Subscriber:
+    """Subscriber writing every event as a line of text.
+
+    Args:
+        out (TextIO | None, optional): Stream to write to. Defaults to the standard output.
+    """
+    out = out if out else sys.stdout
+    while True:
+        event = yield
+        out.write(format_event(event) + "\n")
+
+def tally(counts: Counter[str]) -> Subscriber:
+    """Subscriber counting events by type.
+
+    Args:
+        counts (Counter[str]): Counter updated with the name of the type of every event.
+    """
+    while True:
+        event = yield
+        counts[type(event).__name__] += 1
+
+def collector(buffer: deque[Event]) -> Subscriber:
+    """Subscriber appending every event to a buffer.
+
+    Args:
+        buffer (deque[Event]): Buffer of events.
+    """
+    while True:
+        buffer.append((yield))
+
+def play(game: 'Game') -> Generator[Event, None, None]:
+    """Plays the game turn by turn, yielding its events as they happen, so the game can be consumed as a stream.
+
+    Args:
+        game (Game): Game to play.
+
+    Yields:
+        Event: Events of the game, ending with GameEnded.
+    """
+    buffer: deque[Event] = deque()
+    subscriber = game.board.events.subscribe(collector(buffer))
+    try:
+        while game.running:
+            game.play_turn()
+            while buffer:
+                yield buffer.popleft()
+    finally:
+        game.board.events.unsubscribe(subscriber)
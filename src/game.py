@@ -0,0 +1,222 @@
+from player import Player
+from board import Board, BOARD_SIZE
+from policy import AsyncPolicy, Policy, GreedyPolicy
+from view import View
+from snapshot import Snapshot, take_snapshot, restore_snapshot
+from turn import ACTION
+from rng import BlockRandom
+from rules import Rules
+from events import TurnStarted, Bankrupted, GameEnded
+from typing import Generator, Any, NoReturn, Sequence, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from layouts import LayoutTable
+
+MIN_PLAYERS = 2
+MAX_PLAYERS = 8
+
+class TurnOrder:
+    """Circular order of players still in the game.
+
+    Players are linked to their neighbours by index, so moving to the next player
+    and dropping a player from the rotation both take constant time.
+    """
+    def __init__(self, count: int) -> None:
+        self.next: list[int] = [(index + 1) % count for index in range(count)]
+        self.prev: list[int] = [(index - 1) % count for index in range(count)]
+        self.current = count - 1
+        self.remaining = count
+
+    def advance(self) -> int:
+        """Moves to the next player.
+
+        Returns:
+            int: Index of the player whose turn it is.
+        """
+        self.current = self.next[self.current]
+        return self.current
+
+    def peek(self) -> int:
+        """Returns the next player without moving to them.
+
+        Returns:
+            int: Index of the player whose turn is next.
+        """
+        return self.next[self.current]
+
+    def remove(self, index: int) -> None:
+        """Drops a player from the rotation.
+
+        Args:
+            index (int): Index of the player to drop.
+        """
+        prev, next_ = self.prev[index], self.next[index]
+        self.next[prev] = next_
+        self.prev[next_] = prev
+        if self.current == index:
+            self.current = prev
+        self.remaining -= 1
+
+class Game:
+    """Game engine managing the game loop, players, and board.
+
+    The engine performs no terminal I/O on its own. Decisions are taken by the policy of each player
+    and state changes are presented by the view, which is headless unless another one is given.
+    All randomness of the game (board layout, card decks and dice) comes from a single generator,
+    so a game is reproducible from its seed. Money, prices and cards follow the rules of the game, see rules.
+    Given a table of layouts, the board is one of its fair layouts, see layouts.
+    Every state transition is emitted as a typed event to the subscribers
+    of board.events, see events.
+    Policies which are only awaited, see policy.AsyncPolicy, can take seats in games driven by awaiting
+    every decision, such as GameServer.host_game, but not in games played by play_turn or mainloop.
+    """
+    def __init__(
+        self,
+        policies: Sequence[AsyncPolicy] | None = None,
+        view: View | None = None,
+        max_turns: int | None = None,
+        seed: int | None = None,
+        size: int = BOARD_SIZE,
+        rules: Rules | None = None,
+        layouts: 'LayoutTable | None' = None
+    ) -> None:
+        if not policies:
+            policies = [GreedyPolicy(), GreedyPolicy()]
+        if not MIN_PLAYERS <= len(policies) <= MAX_PLAYERS:
+            raise ValueError(f"Game needs from {MIN_PLAYERS} to {MAX_PLAYERS} players")
+        self.running = True
+        self.seed = seed
+        self.rng = BlockRandom(seed)
+        self.board = Board(view, self.rng, size, rules=rules, layouts=layouts)
+        self.players = [Player(self.board, f"P{index + 1}", policy, index) for index, policy in enumerate(policies)]
+        self.board.players = list(self.players)
+        self.board.game = self
+        self.order = TurnOrder(len(self.players))
+        self.current_turn = self.turn()
+        self.max_turns = max_turns
+        self.turns_played = 0
+        self.winner: Player | None = None
+        self.synchronous = all(isinstance(player.policy, Policy) for player in self.players)
+
+    def turn(self) -> Generator[int, Any, NoReturn]:
+        """Generator for rotating turns between players still in the game.
+
+        Yields:
+            int: Index of the current player.
+        """
+        while True:
+            yield self.order.advance()
+
+    def start_turn(self) -> Player:
+        """Queues the turn of the next player on the turn resolver of the board.
+        The turn is played by advancing the resolver until it has no more decisions to take.
+
+        Returns:
+            Player: Player whose turn it is.
+        """
+        current_player = self.players[next(self.current_turn)]
+        if self.board.events:
+            self.board.events.emit(TurnStarted(current_player, self.turns_played + 1))
+        self.board.resolver.push(ACTION.ROLL, current_player)
+        return current_player
+
+    def end_turn(self, player: Player) -> None:
+        """Finishes the resolved turn, stopping the game if an end condition is met or the turn limit is reached.
+
+        Args:
+            player (Player): Player who took the turn.
+        """
+        self.turns_played += 1
+        if message := self.check_end_game(player):
+            self.running = False
+            self.board.view.show(self.board, player, None)
+            self.board.view.notify(message)
+        elif self.max_turns and self.turns_played >= self.max_turns:
+            self.running = False
+        if not self.running and self.board.events:
+            self.board.events.emit(GameEnded(self.winner, self.turns_played))
+
+    def play_turn(self) -> Player:
+        """Plays a single turn of the next player, asking policies of players for decisions.
+
+        Returns:
+            Player: Player who took the turn.
+
+        Raises:
+            TypeError: If a player answers decisions only when awaited.
+        """
+        if not self.synchronous:
+            raise TypeError("Game has players answering only when awaited, drive it by awaiting their decisions")
+        current_player = self.start_turn()
+        self.board.resolver.run()
+        self.end_turn(current_player)
+        return current_player
+
+    def check_end_game(self, player: 'Player') -> str | None:
+        """Checks if the player who just took a turn passes wining or loosing condition and settles the winner.
+        Only the current player can lose money or gain parts during a turn, so other players are never checked.
+        Bankrupt players are dropped from the game, the last one standing wins.
+
+        Args:
+            player (Player): Player who just took a turn.
+
+        Returns:
+            str | None: Message announcing the result if the game is over, None otherwise.
+        """
+        if player.is_bankrupt():
+            self.order.remove(player.index)
+            self.board.remove_player(player)
+            if self.board.events:
+                self.board.events.emit(Bankrupted(player, player.resigned))
+            if self.order.remaining > 1:
+                self.board.view.notify(f"{player.name} bankrupted")
+                return None
+            self.winner = self.players[self.order.peek()]
+            return f"{player.name} bankrupted. {self.winner.name} wins the game"
+        if player.has_all_parts():
+            self.winner = player
+            return f"{player.name} won the game"
+        return None
+
+    def snapshot(self) -> Snapshot:
+        """Captures the full state of the game, see Snapshot.
+
+        Returns:
+            Snapshot: State of the game.
+        """
+        return take_snapshot(self)
+
+    def restore(self, snapshot: Snapshot) -> None:
+        """Puts the game back into a captured state.
+
+        Args:
+            snapshot (Snapshot): State taken from this game or another one with as many players and tiles.
+        """
+        restore_snapshot(self, snapshot)
+
+    def clone(self, policies: Sequence[AsyncPolicy] | None = None, view: View | None = None) -> 'Game':
+        """Forks the game. The fork continues from the current state independently of this game.
+
+        Args:
+            policies (Sequence[AsyncPolicy] | None, optional): Policies of players in the fork. Defaults to the policies of this game.
+            view (View | None, optional): View of the fork. Defaults to a headless view.
+
+        Returns:
+            Game: Fork of the game.
+        """
+        game = Game(
+            policies if policies else [player.policy for player in self.players],
+            view, self.max_turns, self.seed, len(self.board.tiles), self.board.rules
+        )
+        game.restore(self.snapshot())
+        return game
+
+    def mainloop(self) -> Player | None:
+        """Main loop for running the game until an end condition is met or the turn limit is reached.
+
+        Returns:
+            Player | None: Winner of the game, None if the turn limit was reached first.
+        """
+        while self.running:
+            self.play_turn()
+        return self.winner
@@ -0,0 +1,358 @@
+from misc import SPECIAL_TILE, COMPONENT_TILE, TILE, TILE_CODES
+from board import BOARD_SIZE
+from batch import BatchSimulator
+from rules import DEFAULT_RULES, Rules
+from bisect import bisect_right
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from math import factorial
+from random import Random
+from typing import Any, Iterator, Sequence
+import argparse
+import json
+import os
+import numpy as np
+
+LAYOUTS_VERSION = 1
+CHUNK = 1024
+GAMES = 100
+MAX_ADVANTAGE = 0.05
+META = "meta.json"
+TABLE = "table.npy"
+START_CODE = TILE_CODES.index(SPECIAL_TILE.START)
+
+def layout_pool(size: int = BOARD_SIZE) -> list[int]:
+    """Returns the codes of tiles laid out after START, the same tiles Board.create_board shuffles.
+
+    Args:
+        size (int, optional): Number of tiles on the board. Defaults to BOARD_SIZE.
+
+    Returns:
+        list[int]: Sorted tile codes.
+    """
+    pool = [TILE_CODES.index(tile) for tile in list(SPECIAL_TILE) + list(COMPONENT_TILE) * 2]
+    pool.remove(START_CODE)
+    return sorted((pool * -(-(size - 1) // len(pool)))[:size - 1])
+
+def count_permutations(counts: dict[int, int]) -> int:
+    """Returns the number of distinct orders of a multiset.
+
+    Args:
+        counts (dict[int, int]): Number of copies of every element.
+
+    Returns:
+        int: Multinomial coefficient of the counts.
+    """
+    permutations = factorial(sum(counts.values()))
+    for count in counts.values():
+        permutations //= factorial(count)
+    return permutations
+
+def count_layouts(size: int = BOARD_SIZE) -> int:
+    """Returns the number of distinct layouts. Layouts differing only in which copy of a repeated tile
+    lies where are the same layout, so a board of 16 tiles has 15! / 2^6 layouts.
+
+    Args:
+        size (int, optional): Number of tiles on the board. Defaults to BOARD_SIZE.
+
+    Returns:
+        int: Number of layouts.
+    """
+    return count_permutations(Counter(layout_pool(size)))
+
+def unrank(index: int, size: int = BOARD_SIZE) -> bytes:
+    """Returns the layout of the given index in lexicographic order of tile codes.
+
+    Args:
+        index (int): Index of the layout, from 0 to count_layouts(size) - 1.
+        size (int, optional): Number of tiles on the board. Defaults to BOARD_SIZE.
+
+    Raises:
+        IndexError: If there is no layout of the index.
+
+    Returns:
+        bytes: Tile codes of the layout, START first.
+    """
+    counts = Counter(layout_pool(size))
+    remaining = size - 1
+    total = count_permutations(counts)
+    if not 0 <= index < total:
+        raise IndexError(f"Layout index out of range: {index}")
+    tiles = bytearray([START_CODE])
+    while remaining:
+        for code in sorted(counts):
+            if not counts[code]:
+                continue
+            following = total * counts[code] // remaining
+            if index < following:
+                tiles.append(code)
+                counts[code] -= 1
+                remaining -= 1
+                total = following
+                break
+            index -= following
+    return bytes(tiles)
+
+def rank(tiles: bytes) -> int:
+    """Returns the index of a layout, the inverse of unrank.
+
+    Args:
+        tiles (bytes): Tile codes of the layout, START first.
+
+    Raises:
+        ValueError: If the tiles are not a layout of a board of their size.
+
+    Returns:
+        int: Index of the layout.
+    """
+    if tiles[0] != START_CODE or sorted(tiles[1:]) != layout_pool(len(tiles)):
+        raise ValueError("Tiles are not a layout of a board")
+    counts = Counter(tiles[1:])
+    remaining = len(tiles) - 1
+    total = count_permutations(counts)
+    index = 0
+    for code in tiles[1:]:
+        for smaller in sorted(counts):
+            if smaller == code:
+                break
+            index += total * counts[smaller] // remaining
+        total = total * counts[code] // remaining
+        counts[code] -= 1
+        remaining -= 1
+    return index
+
+def evaluate(
+    indices: np.ndarray,
+    size: int = BOARD_SIZE,
+    games: int = GAMES,
+    seed: int = 0,
+    max_turns: int = 1000,
+    rules: Rules | None = None
+) -> np.ndarray:
+    """Scores layouts by games between two greedy players in the batch engine. Runs in a worker process.
+
+    Every layout is played with the same seeds, from seed to seed + games - 1, so layouts are compared
+    on the same dice and decks and differ only in their tiles.
+
+    Args:
+        indices (np.ndarray): Indices of layouts.
+        size (int, optional): Number of tiles on the board. Defaults to BOARD_SIZE.
+        games (int, optional): Number of games of every layout. Defaults to GAMES.
+        seed (int, optional): Seed of the first game of every layout. Defaults to 0.
+        max_turns (int, optional): Maximum number of turns of every game. Defaults to 1000.
+        rules (Rules | None, optional): Rules of the games. Defaults to the default rules.
+
+    Returns:
+        np.ndarray: Row of every layout, see table_dtype.
+    """
+    tiles = np.array([list(unrank(int(index), size)) for index in indices], dtype=np.uint8).reshape(-1, size)
+    simulator = BatchSimulator(
+        len(indices) * games, seed=seed, size=size, rules=rules,
+        layouts=np.repeat(tiles, games, axis=0), seeds=list(range(seed, seed + games)) * len(indices)
+    ).run(max_turns)
+    winners = simulator.winners.reshape(-1, games)
+    rows = np.empty(len(indices), dtype=table_dtype(size))
+    rows["index"] = indices
+    rows["tiles"] = tiles
+    rows["advantage"] = (winners == 0).mean(axis=1) - (winners == 1).mean(axis=1)
+    rows["length"] = simulator.lengths.reshape(-1, games).mean(axis=1)
+    return rows
+
+def table_dtype(size: int) -> np.dtype:
+    """Returns the type of rows of scored layouts.
+
+    Args:
+        size (int): Number of tiles on the board.
+
+    Returns:
+        np.dtype: Index and tile codes of the layout, difference between the win rates of the first
+        and the second player, and average number of turns.
+    """
+    return np.dtype([("index", "<u8"), ("tiles", "u1", (size,)), ("advantage", "<f4"), ("length", "<f4")])
+
+def open_job(path: str, params: dict[str, Any]) -> None:
+    """Creates the directory of an evaluation, or checks that the existing one was started with the same parameters.
+
+    Args:
+        path (str): Directory of the evaluation.
+        params (dict[str, Any]): Parameters of the evaluation.
+
+    Raises:
+        ValueError: If the directory holds an evaluation with other parameters.
+    """
+    os.makedirs(path, exist_ok=True)
+    meta_path = os.path.join(path, META)
+    params = {"version": LAYOUTS_VERSION, **params}
+    if os.path.exists(meta_path):
+        with open(meta_path) as file:
+            existing = json.load(file)
+        if existing != params:
+            raise ValueError(f"{path} holds an evaluation with other parameters")
+        return
+    temporary = f"{meta_path}.{os.getpid()}.tmp"
+    with open(temporary, "w") as file:
+        json.dump(params, file)
+    os.replace(temporary, meta_path)
+
+def save_chunk(path: str, number: int, rows: np.ndarray) -> None:
+    """Saves scored layouts of a chunk. The file is replaced atomically, so an interrupted evaluation never leaves a partial chunk.
+
+    Args:
+        path (str): Directory of the evaluation.
+        number (int): Number of the chunk.
+        rows (np.ndarray): Scored layouts.
+    """
+    chunk_path = os.path.join(path, f"chunk-{number:09d}.npy")
+    temporary = f"{chunk_path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as file:
+        np.save(file, rows)
+    os.replace(temporary, chunk_path)
+
+def iter_chunks(path: str) -> Iterator[int]:
+    """Yields the numbers of chunks saved in an evaluation.
+
+    Args:
+        path (str): Directory of the evaluation.
+
+    Yields:
+        int: Number of a chunk.
+    """
+    for entry in os.listdir(path):
+        if entry.startswith("chunk-") and entry.endswith(".npy"):
+            yield int(entry[6:-4])
+
+def run_evaluation(
+    path: str,
+    indices: Sequence[int],
+    size: int = BOARD_SIZE,
+    games: int = GAMES,
+    seed: int = 0,
+    max_turns: int = 1000,
+    rules: Rules | None = None,
+    workers: int | None = None
+) -> int:
+    """Scores layouts in chunks of CHUNK using a pool of processes. Every chunk is saved as soon as it is scored,
+    and chunks already saved are skipped, so an interrupted evaluation resumes where it stopped.
+
+    Args:
+        path (str): Directory of the evaluation, created by open_job.
+        indices (Sequence[int]): Indices of layouts to score, a range or an array.
+        size (int, optional): Number of tiles on the board. Defaults to BOARD_SIZE.
+        games (int, optional): Number of games of every layout. Defaults to GAMES.
+        seed (int, optional): Seed of the first game of every layout. Defaults to 0.
+        max_turns (int, optional): Maximum number of turns of every game. Defaults to 1000.
+        rules (Rules | None, optional): Rules of the games. Defaults to the default rules.
+        workers (int | None, optional): Number of worker processes. Defaults to number of CPUs.
+
+    Returns:
+        int: Number of chunks scored by this call.
+    """
+    workers = workers if workers else os.cpu_count() or 1
+    done = set(iter_chunks(path))
+    pending = (number for number in range(-(-len(indices) // CHUNK)) if number not in done)
+    scored = 0
+    with ProcessPoolExecutor(workers) as executor:
+        running: dict[Future[np.ndarray], int] = {}
+
+        def fill() -> None:
+            for number in pending:
+                chunk = np.asarray(indices[number * CHUNK:(number + 1) * CHUNK], dtype=np.uint64)
+                running[executor.submit(evaluate, chunk, size, games, seed, max_turns, rules)] = number
+                if len(running) >= workers * 2:
+                    return
+
+        fill()
+        while running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                save_chunk(path, running.pop(future), future.result())
+                scored += 1
+            fill()
+    return scored
+
+def build_table(path: str) -> int:
+    """Ranks all scored layouts of an evaluation, the fairest first, and saves them as its table.
+    Layouts are ordered by the absolute advantage of the first player, then by average number of turns.
+
+    Args:
+        path (str): Directory of the evaluation.
+
+    Returns:
+        int: Number of ranked layouts.
+    """
+    with open(os.path.join(path, META)) as file:
+        size = json.load(file)["size"]
+    chunks = [np.load(os.path.join(path, f"chunk-{number:09d}.npy")) for number in sorted(iter_chunks(path))]
+    rows = np.concatenate(chunks) if chunks else np.empty(0, dtype=table_dtype(size))
+    rows = rows[np.lexsort((rows["length"], np.abs(rows["advantage"])))]
+    table_path = os.path.join(path, TABLE)
+    temporary = f"{table_path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as file:
+        np.save(file, rows)
+    os.replace(temporary, table_path)
+    return len(rows)
+
+class LayoutTable:
+    """Ranked layouts of an evaluation, of which the ones with a small advantage of the first player are drawn at game start.
+
+    The table is memory-mapped and ordered by absolute advantage, so the fair layouts are a prefix of it
+    found by a binary search, and drawing one is a single lookup of a random row.
+    """
+    def __init__(self, path: str, max_advantage: float = MAX_ADVANTAGE) -> None:
+        self.table = np.load(os.path.join(path, TABLE), mmap_mode="r")
+        self.size = self.table.dtype["tiles"].shape[0]
+        self.fair = bisect_right(self.table["advantage"], max_advantage, key=abs)
+        if not self.fair:
+            raise ValueError(f"No layout gives the first player an advantage of at most {max_advantage:.2%}")
+
+    def draw(self, rng: Random) -> list[TILE]:
+        """Draws a fair layout uniformly.
+
+        Args:
+            rng (Random): Random number generator.
+
+        Returns:
+            list[TILE]: Tiles of the layout in order, starting with the START tile.
+        """
+        return [TILE_CODES[code] for code in self.table["tiles"][rng.randrange(self.fair)]]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Enumerates and scores board layouts of Gigapoly for the advantage of the first player.")
+    parser.add_argument("path", help="directory of the evaluation, holding checkpoints and the ranked table")
+    parser.add_argument("--start", type=int, default=0, help="index of the first layout to score")
+    parser.add_argument("--stop", type=int, default=None, help="index after the last layout to score, defaults to all layouts")
+    parser.add_argument("--sample", type=int, default=None, help="score this many random layouts of the range instead of all of them")
+    parser.add_argument("--games", type=int, default=GAMES, help="number of games of every layout")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game of every layout, and of the sample")
+    parser.add_argument("--max-turns", type=int, default=1000, help="turn limit after which a game is a draw")
+    parser.add_argument("--size", type=int, default=BOARD_SIZE, help="number of tiles on the board")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--max-advantage", type=float, default=MAX_ADVANTAGE, help="largest advantage of the first player of a fair layout")
+    parser.add_argument("--top", type=int, default=10, help="number of the fairest layouts printed")
+    args = parser.parse_args()
+    total = count_layouts(args.size)
+    stop = min(args.stop, total) if args.stop is not None else total
+    if not 0 <= args.start < stop:
+        parser.error(f"Range of layouts must lie within 0 and {total}")
+    params = {
+        "size": args.size, "games": args.games, "seed": args.seed, "max_turns": args.max_turns,
+        "start": args.start, "stop": stop, "sample": args.sample, "rules": DEFAULT_RULES._asdict(),
+    }
+    try:
+        open_job(args.path, params)
+    except ValueError as error:
+        parser.error(str(error))
+    indices: Sequence[int] = range(args.start, stop)
+    if args.sample:
+        indices = np.unique(np.random.default_rng(args.seed).integers(args.start, stop, args.sample, dtype=np.uint64))
+    print(f"{total} distinct layouts, scoring {len(indices)}")
+    run_evaluation(args.path, indices, args.size, args.games, args.seed, args.max_turns, None, args.workers)
+    ranked = build_table(args.path)
+    table = LayoutTable(args.path, args.max_advantage)
+    print(f"{ranked} layouts ranked, {table.fair} fair")
+    for row in table.table[:args.top]:
+        tiles = " ".join(TILE_CODES[code].name for code in row["tiles"])
+        print(f"#{row['index']:<12} | advantage: {row['advantage']:+.2%} | avg turns: {row['length']:.1f} | {tiles}")
+
+if __name__ == "__main__":
+    main()
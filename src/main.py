@@ -1,62 +1,33 @@
-from player import Player
-from board import Board
-import random
-from misc import clear_screen
-from typing import Generator, Literal, Any, NoReturn
-
-class Game:
-    """Main Game class for managing the game loop, players, and board.
-    """
-    def __init__(self) -> None:
-        self.running = True
-        self.board = Board()
-        self.player_1 = Player(self.board, "P1")
-        self.player_2 = Player(self.board, "P2")
-        self.players = [self.player_1, self.player_2]
-        if self.board.board.head:
-            self.board.board.head.current_players = [self.player_1, self.player_2]
-        self.current_turn = self.turn()
-
-    def turn(self) -> Generator[Literal[0, 1], Any, NoReturn]:
-        """Generator for alternating turns between two players.
-
-        Yields:
-            Literal[0, 1]: Index of the current player.
-        """
-        while True:
-            yield 0
-            yield 1
-
-    def mainloop(self) -> None:
-        """Main loop for running the game until an end condition is met.
-        """
-        while self.running:
-            current_player_index = next(self.current_turn)
-            current_player = self.players[current_player_index]
-            clear_screen()
-            print(f"P1 money: {self.player_1.money} | P2 money: {self.player_2.money}")
-            print()
-            print(f"Current player: {current_player.name}")
-            self.board.display()
-            input("Roll the dice")
-            dice_roll = random.randint(1, 6)
-            clear_screen()
-            current_player.move(dice_roll)
-            print(f"P1 money: {self.player_1.money} | P2 money: {self.player_2.money}")
-            print(f"{current_player.name} rolled: {dice_roll}")
-            print(f"Current player: {current_player.name}")
-            self.board.display()
-            self.board.buy_part(current_player, self.player_1, self.player_2, current_player, dice_roll)
-            if self.player_1.check_end_game(self.player_2) or self.player_2.check_end_game(self.player_1):
-                clear_screen()
-                self.running = False
-                print(f"P1 money: {self.player_1.money} | P2 money: {self.player_2.money}")
-                print()
-                print(f"Current player: {current_player.name}")
-                self.board.display()
-                self.player_1.check_end_game(self.player_2)
-                self.player_2.check_end_game(self.player_1)
+from game import Game
+from policy import ConsolePolicy
+from view import ConsoleView
+from metrics import Metrics, instrument
+from events import printer
+from replay import record
+from layouts import LayoutTable
+import argparse
 
 if __name__ == "__main__":
-    game = Game()
-    game.mainloop()
+    parser = argparse.ArgumentParser(description="Plays Gigapoly at the console.")
+    parser.add_argument("--metrics", default=None, help="export timings to this file, as JSON for .json files and Prometheus text otherwise")
+    parser.add_argument("--log", default=None, help="append events of the game to this file")
+    parser.add_argument("--record", default=None, help="append the finished game to this replay log")
+    parser.add_argument("--layouts", default=None, help="play one of the fair layouts ranked in this directory by src/layouts.py")
+    args = parser.parse_args()
+    layouts = LayoutTable(args.layouts) if args.layouts else None
+    game = Game([ConsolePolicy(), ConsolePolicy()], ConsoleView(), layouts=layouts)
+    metrics = Metrics() if args.metrics else None
+    if metrics:
+        instrument(game, metrics)
+    log = open(args.log, "a") if args.log else None
+    if log:
+        game.board.events.subscribe(printer(log))
+    if args.record:
+        record(game, args.record)
+    try:
+        game.mainloop()
+    finally:
+        if metrics:
+            metrics.save(args.metrics)
+        if log:
+            log.close()
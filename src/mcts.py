@@ -0,0 +1,252 @@
+from misc import COMPONENT_TILE, SPECIAL_TILE
+from policy import Policy, GreedyPolicy
+from turn import DECISION, Decision
+from random import Random
+from math import log, sqrt
+from typing import Any, Hashable, TYPE_CHECKING
+import time
+
+if TYPE_CHECKING:
+    from board import Board
+    from game import Game
+    from player import Player
+
+BUDGET = 0.05
+HORIZON = 40
+EXPLORATION = 1.4
+MONEY_BUCKET = 500
+MAX_NODES = 200_000
+
+class SearchNode:
+    """Statistics of a decision point shared by all move orders reaching the same state.
+
+    Attributes:
+        visits (int): Number of simulations passing through the node.
+        stats (dict[Any, list[float]]): Visits and total reward of every action tried.
+    """
+    __slots__ = ("visits", "stats")
+
+    def __init__(self, actions: list[Any]) -> None:
+        self.visits = 0
+        self.stats: dict[Any, list[float]] = {action: [0, 0.0] for action in actions}
+
+    def select(self, exploration: float) -> Any:
+        """Picks the action to simulate, trying every action once before using UCB1.
+
+        Args:
+            exploration (float): Weight of the exploration term.
+
+        Returns:
+            Any: Action to simulate.
+        """
+        best, best_score = None, -1.0
+        scale = exploration * sqrt(log(self.visits + 1))
+        for action, (visits, total) in self.stats.items():
+            if not visits:
+                return action
+            score = total / visits + scale / sqrt(visits)
+            if score > best_score:
+                best, best_score = action, score
+        return best
+
+    def update(self, action: Any, reward: float) -> None:
+        """Adds the outcome of a simulation.
+
+        Args:
+            action (Any): Action taken in the simulation.
+            reward (float): Reward of the player deciding at the node.
+        """
+        self.visits += 1
+        stats = self.stats[action]
+        stats[0] += 1
+        stats[1] += reward
+
+    def best(self) -> Any:
+        """Returns the most visited action, the first one of equally visited actions.
+
+        Returns:
+            Any: Action to play.
+        """
+        return max(self.stats, key=lambda action: self.stats[action][0])
+
+def get_actions(board: 'Board', decision: Decision, preferred: Any = None) -> list[Any]:
+    """Returns the possible answers to a decision. Travelling to a TRAVEL tile only asks for travelling again,
+    so those tiles are left out.
+
+    Args:
+        board (Board): Board the game is played on.
+        decision (Decision): Decision to take.
+        preferred (Any, optional): Answer put first, so it is tried first and wins ties. Defaults to None.
+
+    Returns:
+        list[Any]: Possible answers.
+    """
+    if decision.kind == DECISION.BUY:
+        actions = [True, False]
+    else:
+        actions = [index + 1 for index, tile in enumerate(board.tiles) if tile != SPECIAL_TILE.TRAVEL]
+    if preferred in actions:
+        actions.remove(preferred)
+        actions.insert(0, preferred)
+    return actions
+
+def evaluate(game: 'Game') -> list[float]:
+    """Scores every player of a game, 1 for the winner of a finished game. Unfinished games are scored
+    by the share of wealth (money and prices of owned tiles) and the progress in collecting parts.
+
+    Args:
+        game (Game): Game to score.
+
+    Returns:
+        list[float]: Score between 0 and 1 of every player.
+    """
+    if game.winner:
+        return [float(player is game.winner) for player in game.players]
+    worth = [max(player.money, 0) for player in game.players]
+    for tile, owner in zip(game.board.tiles, game.board.owners):
+        if owner:
+            worth[owner.index] += game.board.prices[tile]
+    total = sum(worth) or 1
+    return [
+        0.5 * worth[player.index] / total + 0.5 * (len(player.all_parts) - player.missing_parts()) / len(player.all_parts)
+        if not player.is_bankrupt() else 0.0
+        for player in game.players
+    ]
+
+class MCTSPolicy(Policy):
+    """Policy choosing purchases and travel targets by Monte Carlo tree search within a time budget.
+
+    Every simulation forks the game from a snapshot into a scratch game, reseeds its dice and reshuffles the
+    remaining cards, so the search never peeks at hidden information. Decisions met during the simulation are
+    taken by UCB1 on nodes of the tree, expanding one node per simulation, and by the rollout policy below the
+    tree or once a simulation returns to a node it already passed, until the game ends or the horizon is reached. Nodes are stored in a transposition table keyed
+    by positions, owners and bucketed money, so states reached by different move orders share statistics,
+    also between consecutive moves of the game.
+
+    Args:
+        budget (float, optional): Seconds spent on every decision. Defaults to BUDGET.
+        horizon (int, optional): Turns simulated before an unfinished game is scored. Defaults to HORIZON.
+        exploration (float, optional): Weight of the exploration term of UCB1. Defaults to EXPLORATION.
+        money_bucket (int, optional): Money differences smaller than this are treated as the same state. Defaults to MONEY_BUCKET.
+        rollout (Policy | None, optional): Policy taking decisions below the tree. Defaults to GreedyPolicy.
+        simulations (int | None, optional): Fixed number of simulations instead of the time budget,
+            which makes decisions reproducible from the seed. Defaults to None.
+        seed (int | None, optional): Seed of the search. Defaults to None.
+    """
+    def __init__(
+        self,
+        budget: float = BUDGET,
+        horizon: int = HORIZON,
+        exploration: float = EXPLORATION,
+        money_bucket: int = MONEY_BUCKET,
+        rollout: Policy | None = None,
+        simulations: int | None = None,
+        seed: int | None = None
+    ) -> None:
+        self.budget = budget
+        self.horizon = horizon
+        self.exploration = exploration
+        self.money_bucket = money_bucket
+        self.rollout = rollout if rollout else GreedyPolicy()
+        self.simulations = simulations
+        self.rng = Random(seed)
+        self.table: dict[Hashable, SearchNode] = {}
+        self.scratch: 'Game | None' = None
+
+    def decide_buy(self, board: 'Board', player: 'Player', tile: COMPONENT_TILE) -> bool:
+        return self.decide(board, Decision(DECISION.BUY, player, None, tile))
+
+    def choose_travel(self, board: 'Board', player: 'Player') -> int:
+        return self.decide(board, Decision(DECISION.TRAVEL, player, None))
+
+    def decide(self, board: 'Board', decision: Decision) -> Any:
+        if decision.kind == DECISION.ACKNOWLEDGE or not board.game or board.resolver.pending != decision:
+            return self.rollout.decide(board, decision)
+        return self.search(board.game, decision)
+
+    def get_key(self, board: 'Board', decision: Decision) -> Hashable:
+        """Returns the key of a decision point in the transposition table.
+
+        Args:
+            board (Board): Board the game is played on.
+            decision (Decision): Decision to take.
+
+        Returns:
+            Hashable: Key of the decision point.
+        """
+        bucket = self.money_bucket
+        return (
+            decision.kind,
+            decision.player.index,
+            tuple([player.position for player in board.players]),
+            tuple([player.money // bucket for player in board.players]),
+            tuple([owner.index if owner else -1 for owner in board.owners]),
+        )
+
+    def search(self, game: 'Game', decision: Decision) -> Any:
+        """Runs simulations from the pending decision of the game and returns the most visited action.
+
+        Args:
+            game (Game): Game the decision is taken in.
+            decision (Decision): Pending decision.
+
+        Returns:
+            Any: Answer to the decision.
+        """
+        if len(self.table) > MAX_NODES:
+            self.table.clear()
+        scratch = self.scratch
+        if not scratch or len(scratch.players) != len(game.players) or len(scratch.board.tiles) != len(game.board.tiles):
+            self.scratch = game.clone([self.rollout] * len(game.players))
+        snapshot = game.snapshot()
+        deadline = time.perf_counter() + self.budget
+        done = 0
+        while (done < self.simulations) if self.simulations else (not done or time.perf_counter() < deadline):
+            self.scratch.restore(snapshot)
+            self.simulate(self.scratch)
+            done += 1
+        return self.table[self.get_key(game.board, decision)].best()
+
+    def simulate(self, game: 'Game') -> None:
+        """Plays a single simulation from the pending decision of the game and updates statistics of the tree.
+
+        Args:
+            game (Game): Scratch game restored to the searched state.
+        """
+        board = game.board
+        resolver = board.resolver
+        board.rng.seed(self.rng.getrandbits(64))
+        board.chance_cards.shuffle()
+        board.risk_cards.shuffle()
+        path: list[tuple[SearchNode, Any, int]] = []
+        expanding = True
+        turns = 0
+        while True:
+            while decision := resolver.advance():
+                if decision.kind == DECISION.ACKNOWLEDGE:
+                    resolver.resolve(None)
+                    continue
+                node = None
+                if expanding:
+                    key = self.get_key(board, decision)
+                    node = self.table.get(key)
+                    if node is None:
+                        node = self.table[key] = SearchNode(get_actions(board, decision, self.rollout.decide(board, decision)))
+                        expanding = False
+                    elif any(node is seen for seen, _, _ in path):
+                        node = None
+                        expanding = False
+                if node:
+                    action = node.select(self.exploration)
+                    path.append((node, action, decision.player.index))
+                else:
+                    action = self.rollout.decide(board, decision)
+                resolver.resolve(action)
+            game.end_turn(game.players[game.order.current])
+            turns += 1
+            if not game.running or turns >= self.horizon:
+                break
+            game.start_turn()
+        rewards = evaluate(game)
+        for node, action, index in path:
+            node.update(action, rewards[index])
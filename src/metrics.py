@@ -0,0 +1,255 @@
+from turn import ACTION
+from policy import Policy
+from bisect import bisect_left
+from functools import wraps
+from typing import Any, Callable, TYPE_CHECKING
+import inspect
+import json
+import os
+import time
+
+if TYPE_CHECKING:
+    from game import Game
+
+BUCKETS: tuple[float, ...] = tuple(
+    mantissa * 10.0 ** exponent for exponent in range(-7, 2) for mantissa in (1.0, 2.5, 5.0)
+) + (100.0, 1000.0)
+PREFIX = "gigapoly"
+
+class Histogram:
+    """Latency histogram with fixed bucket bounds in seconds, cumulative only when exported.
+
+    Attributes:
+        counts (list[int]): Observations falling into every bucket, the last one above all bounds.
+        count (int): Number of observations.
+        total (float): Sum of observations.
+    """
+    __slots__ = ("counts", "count", "total")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Adds an observation.
+
+        Args:
+            seconds (float): Observed duration.
+        """
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """Returns cumulative counts of observations up to every bound, ending with +Inf.
+
+        Returns:
+            list[tuple[str, int]]: Bound and number of observations not above it.
+        """
+        bounds = [f"{bound:g}" for bound in BUCKETS] + ["+Inf"]
+        result: list[tuple[str, int]] = []
+        running = 0
+        for bound, count in zip(bounds, self.counts):
+            running += count
+            result.append((bound, running))
+        return result
+
+class Metrics:
+    """Counters and latency histograms of the phases of turns.
+
+    Phases are timed exclusively: the time a phase spends in another timed phase (a card moving the player,
+    the view drawing after a move) is counted only by the inner one, so the phases of a turn add up to the turn.
+    Turns and whole games are timed inclusively. Time spent waiting for human players is the input_wait phase,
+    separate from decide, the time bots spend thinking.
+    """
+    def __init__(self) -> None:
+        self.counters: dict[str, int] = {}
+        self.histograms: dict[str, Histogram] = {}
+        self.nested = 0.0
+
+    def increment(self, name: str, value: int = 1) -> None:
+        """Increments a counter.
+
+        Args:
+            name (str): Name of the counter.
+            value (int, optional): Amount to add. Defaults to 1.
+        """
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def histogram(self, name: str) -> Histogram:
+        """Returns the histogram of a phase, creating it on first use.
+
+        Args:
+            name (str): Name of the phase.
+
+        Returns:
+            Histogram: Histogram of the phase.
+        """
+        if name not in self.histograms:
+            self.histograms[name] = Histogram()
+        return self.histograms[name]
+
+    def timed(self, name: str, function: Callable[..., Any], inclusive: bool = False) -> Callable[..., Any]:
+        """Wraps a function so every call is observed by the histogram of the phase.
+
+        Args:
+            name (str): Name of the phase.
+            function (Callable[..., Any]): Function to time.
+            inclusive (bool, optional): Count time of nested phases too. Defaults to False.
+
+        Returns:
+            Callable[..., Any]: Timed function.
+        """
+        histogram = self.histogram(name)
+        clock = time.perf_counter
+
+        if inspect.iscoroutinefunction(function):
+            @wraps(function)
+            async def timed_coroutine(*args: Any, **kwargs: Any) -> Any:
+                start = clock()
+                try:
+                    return await function(*args, **kwargs)
+                finally:
+                    histogram.observe(clock() - start)
+            return timed_coroutine
+
+        @wraps(function)
+        def timed_function(*args: Any, **kwargs: Any) -> Any:
+            outer, self.nested = self.nested, 0.0
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                histogram.observe(elapsed if inclusive else elapsed - self.nested)
+                self.nested = outer + elapsed
+        return timed_function
+
+    def to_dict(self) -> dict[str, Any]:
+        """Returns counters and histograms as plain data.
+
+        Returns:
+            dict[str, Any]: Counters, and count, sum and cumulative buckets of every histogram.
+        """
+        return {
+            "counters": dict(self.counters),
+            "histograms": {
+                name: {"count": histogram.count, "sum": histogram.total, "buckets": dict(histogram.cumulative())}
+                for name, histogram in self.histograms.items()
+            },
+        }
+
+    def to_json(self) -> str:
+        """Exports metrics as JSON.
+
+        Returns:
+            str: JSON document.
+        """
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Exports metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: Counters as gigapoly_events_total and histograms as gigapoly_phase_seconds, labelled by name.
+        """
+        lines = [
+            f"# HELP {PREFIX}_events_total Number of events of the game.",
+            f"# TYPE {PREFIX}_events_total counter",
+        ]
+        lines += [f'{PREFIX}_events_total{{event="{name}"}} {value}' for name, value in sorted(self.counters.items())]
+        lines += [
+            f"# HELP {PREFIX}_phase_seconds Time spent in phases of turns.",
+            f"# TYPE {PREFIX}_phase_seconds histogram",
+        ]
+        for name, histogram in sorted(self.histograms.items()):
+            lines += [f'{PREFIX}_phase_seconds_bucket{{phase="{name}",le="{bound}"}} {count}' for bound, count in histogram.cumulative()]
+            lines.append(f'{PREFIX}_phase_seconds_sum{{phase="{name}"}} {histogram.total!r}')
+            lines.append(f'{PREFIX}_phase_seconds_count{{phase="{name}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def save(self, path: str) -> None:
+        """Writes metrics to a local file, as JSON for .json files and as Prometheus text otherwise.
+        The file is replaced atomically, so collectors never read a partial export.
+
+        Args:
+            path (str): Path of the file.
+        """
+        text = self.to_json() if path.endswith(".json") else self.to_prometheus()
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as file:
+            file.write(text)
+        os.replace(temporary, path)
+
+def patch(target: Any, attribute: str, wrapper: Callable[[Callable[..., Any]], Callable[..., Any]]) -> None:
+    """Replaces a method of an object with a wrapped one, unless it is wrapped already.
+
+    Args:
+        target (Any): Object to patch.
+        attribute (str): Name of the method.
+        wrapper (Callable[[Callable[..., Any]], Callable[..., Any]]): Function wrapping the method.
+    """
+    function = getattr(target, attribute)
+    if not hasattr(function, "__wrapped__"):
+        setattr(target, attribute, wrapper(function))
+
+def instrument(game: 'Game', metrics: Metrics) -> 'Game':
+    """Times the phases of turns of a game: dice, movement, rent and purchase offers, purchases, card draws
+    and effects, rendering, end game checks and decisions, as well as whole turns and games.
+
+    Instrumentation patches methods of the objects of this game only, so games which are not instrumented
+    run exactly the same code as before and pay nothing for it.
+
+    Args:
+        game (Game): Game to instrument.
+        metrics (Metrics): Metrics collecting the timings.
+
+    Returns:
+        Game: The game itself.
+    """
+    board, resolver = game.board, game.board.resolver
+    timed = metrics.timed
+    patch(game, "mainloop", lambda function: timed("game", function, inclusive=True))
+    patch(game, "play_turn", lambda function: timed("turn", function, inclusive=True))
+    patch(game, "check_end_game", lambda function: timed("end_game", function))
+    patch(board.rng, "roll", lambda function: timed("dice", function))
+    patch(board, "move_player", lambda function: timed("movement", function))
+    patch(board, "move_player_to_position", lambda function: timed("movement", function))
+    patch(board, "display", lambda function: timed("render", function))
+    patch(board.view, "show", lambda function: timed("render", function))
+    patch(board.view, "notify", lambda function: timed("render", function))
+    patch(resolver, "bought", lambda function: timed("purchase", function))
+    patch(resolver, "apply_effect", lambda function: timed("card_effect", function))
+    for action, phase in ((ACTION.BUY, "rent"), (ACTION.CHANCE, "card_draw"), (ACTION.RISK, "card_draw")):
+        if not hasattr(resolver.handlers[action], "__wrapped__"):
+            resolver.handlers[action] = timed(phase, resolver.handlers[action])
+    for player in game.players:
+        phase = "input_wait" if player.policy.interactive else "decide"
+        if isinstance(player.policy, Policy):
+            patch(player.policy, "decide", lambda function: timed(phase, function))
+        if type(player.policy).ask is not Policy.ask:
+            patch(player.policy, "ask", lambda function: timed(phase, function))
+    patch(game, "end_turn", lambda function: counted(metrics, game, function))
+    return game
+
+def counted(metrics: Metrics, game: 'Game', function: Callable[..., Any]) -> Callable[..., Any]:
+    """Wraps Game.end_turn to count turns and finished games.
+
+    Args:
+        metrics (Metrics): Metrics collecting the counters.
+        game (Game): Game the method belongs to.
+        function (Callable[..., Any]): Bound end_turn of the game.
+
+    Returns:
+        Callable[..., Any]: Counting end_turn.
+    """
+    @wraps(function)
+    def end_turn(*args: Any, **kwargs: Any) -> Any:
+        result = function(*args, **kwargs)
+        metrics.increment("turns")
+        if not game.running:
+            metrics.increment("games")
+            metrics.increment("wins" if game.winner else "draws")
+        return result
+    return end_turn
@@ -1,4 +1,4 @@
-"""Enums and utility types for Gigapoly tiles and effects, plus a screen clearing function.
+"""Enums and utility types for Gigapoly tiles and effects.
 """
 
 from enum import IntEnum, StrEnum
@@ -35,9 +35,8 @@ class NEUTRAL_EFFECT(StrEnum):
 
 EFFECT = Union[GOOD_EFFECT, BAD_EFFECT, NEUTRAL_EFFECT]
 
+TILE_CODES: list[TILE] = [*COMPONENT_TILE, *SPECIAL_TILE]  # small integer codes of tiles in compact encodings
+EFFECT_CODES: list[EFFECT] = [*GOOD_EFFECT, *BAD_EFFECT, *NEUTRAL_EFFECT]
+
 if os.name == 'nt':
-    def clear_screen() -> None:
-        os.system('cls')
-else:
-    def clear_screen() -> None:
-        os.system('clear')
+    os.system('')  # enables processing of ANSI escape sequences in the Windows console
@@ -1,19 +1,70 @@
 from typing import TYPE_CHECKING
 from misc import COMPONENT_TILE
+from state import PARTS, PART_BITS, ALL_PARTS, get_parts
 
 if TYPE_CHECKING:
     from board import Board
     from board import Node
+    from policy import AsyncPolicy
 
 class Player:
-    """Represents a player in the game."""
-    def __init__(self, board: 'Board', name: str) -> None:
+    """Represents a player in the game.
+
+    The player is a view of its seat in the state of the board: money, position, parts and the resigned flag
+    are read from and written to the arrays of the game state, the object itself holds only references.
+    """
+    __slots__ = ("board", "name", "policy", "index")
+    all_parts: list[COMPONENT_TILE] = PARTS
+
+    def __init__(self, board: 'Board', name: str, policy: 'AsyncPolicy', index: int = 0) -> None:
         self.board: 'Board' = board
         self.name: str = name
-        self.money: int = 10_000
-        self.current_position: 'Node' | None = board.board.head
-        self.owned_parts: list[COMPONENT_TILE] = []
-        self.all_parts = [e for e in COMPONENT_TILE if e != COMPONENT_TILE.SERVICE]
+        self.policy: 'AsyncPolicy' = policy
+        self.index: int = index
+        board.add_seat(self)
+
+    @property
+    def money(self) -> int:
+        return self.board.state.money[self.index]
+
+    @money.setter
+    def money(self, value: int) -> None:
+        self.board.state.money[self.index] = value
+
+    @property
+    def position(self) -> int:
+        return self.board.state.positions[self.index]
+
+    @position.setter
+    def position(self, value: int) -> None:
+        self.board.state.positions[self.index] = value
+
+    @property
+    def resigned(self) -> bool:
+        return bool(self.board.state.resigned[self.index])
+
+    @resigned.setter
+    def resigned(self, value: bool) -> None:
+        self.board.state.resigned[self.index] = value
+
+    @property
+    def owned_parts(self) -> list[COMPONENT_TILE]:
+        """Distinct parts owned by the player.
+        """
+        return get_parts(self.board.state.parts[self.index])
+
+    @owned_parts.setter
+    def owned_parts(self, parts: list[COMPONENT_TILE]) -> None:
+        mask = 0
+        for part in parts:
+            mask |= PART_BITS.get(part, 0)
+        self.board.state.parts[self.index] = mask
+
+    @property
+    def current_position(self) -> 'Node':
+        """Node of the board the player is standing on.
+        """
+        return self.board.nodes[self.position]
 
     def move(self, steps: int) -> None:
         """Moves player by the amount of steps.
@@ -32,34 +83,48 @@ class Player:
         self.board.move_player_to_position(self, position)
 
     def add_start_money(self) -> None:
-        """Adds funds to the player.
+        """Adds the funds of passing START to the player.
         """
-        self.money += 1000
+        self.money += self.board.rules.pass_start_money
 
-    def check_end_game(self, other: 'Player') -> bool:
-        """Checks if player passes wining or loosing condition.
+    def is_bankrupt(self) -> bool:
+        """Checks if player ran out of money or resigned from the game.
 
-        Args:
-            other (Player): Other player in the game.
+        Returns:
+            bool: True if player is bankrupt False otherwise.
+        """
+        return self.money <= 0 or self.resigned
+
+    def has_all_parts(self) -> bool:
+        """Checks if player owns all unique parts needed to build the PC.
+
+        Returns:
+            bool: True if all parts are owned False otherwise.
+        """
+        return self.board.state.parts[self.index] == ALL_PARTS
+
+    def missing_parts(self) -> int:
+        """Counts unique parts the player still has to collect.
+
+        Returns:
+            int: Number of missing parts.
+        """
+        return self.board.state.missing_parts(self.index)
+
+    def check_end_game(self) -> bool:
+        """Checks if player passes wining or loosing condition.
 
         Returns:
             bool: True if conditions are passed False otherwise.
         """
-        if self.money <= 0:
-            print(f"{self.name} bankrupted. {other.name} wins the game")
-            return True
-        else:
-            if len(set(self.owned_parts)) == len(self.all_parts):
-                print(f"{self.name} won the game")
-                return True
-        return False
+        return self.is_bankrupt() or self.has_all_parts()
 
     def add_owned_part(self, part: COMPONENT_TILE) -> None:
-        """Appends list of owned PC parts to list of items owned by player.
+        """Adds the PC part to the parts owned by player.
 
         Args:
-            part (COMPONENT_TILE): Component to add to list.
+            part (COMPONENT_TILE): Component to add.
         """
         if part == COMPONENT_TILE.SERVICE:
             return
-        self.owned_parts.append(part)
+        self.board.state.parts[self.index] |= PART_BITS[part]
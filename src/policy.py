@@ -0,0 +1,205 @@
+from misc import COMPONENT_TILE
+from abc import ABC, abstractmethod
+from random import Random
+from turn import DECISION, Decision
+from state import CODE_PART_BITS
+from typing import Any, Callable, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from board import Board
+    from player import Player
+
+class AsyncPolicy(ABC):
+    """Abstract base class for objects answering decisions on behalf of a player by awaiting them,
+    such as players connected over the network.
+
+    Only drivers awaiting every decision can seat these policies, see GameServer.host_game,
+    games played synchronously need a Policy in every seat.
+    Policies waiting for a human set interactive, so the time spent deciding is not mistaken for compute.
+    """
+    interactive: bool = False
+
+    @abstractmethod
+    async def ask(self, board: 'Board', decision: Decision) -> Any:
+        """Answers a decision for a driver awaiting answers.
+
+        Args:
+            board (Board): Board the game is played on.
+            decision (Decision): Decision to take.
+
+        Returns:
+            Any: Answer to the decision.
+        """
+        pass
+
+class Policy(AsyncPolicy):
+    """Abstract base class for objects making decisions on behalf of a player.
+
+    The board asks the policy of the current player whenever the rules require a choice,
+    so the same game can be driven by a human at the console or by a bot with no I/O at all.
+    Every policy can also be awaited, so bots take seats in games driven by awaiting decisions.
+    """
+
+    @abstractmethod
+    def decide_buy(self, board: 'Board', player: 'Player', tile: COMPONENT_TILE) -> bool:
+        """Decides whether the player buys the unowned tile they landed on.
+
+        Args:
+            board (Board): Board the game is played on.
+            player (Player): Player taking the decision.
+            tile (COMPONENT_TILE): Tile offered for sale.
+
+        Returns:
+            bool: True to buy the tile, False to skip.
+        """
+        pass
+
+    @abstractmethod
+    def choose_travel(self, board: 'Board', player: 'Player') -> int:
+        """Chooses the tile the player travels to from the TRAVEL tile.
+
+        Args:
+            board (Board): Board the game is played on.
+            player (Player): Player taking the decision.
+
+        Returns:
+            int: Number on the tile to travel to.
+        """
+        pass
+
+    def acknowledge(self, player: 'Player', message: str) -> None:
+        """Lets the player acknowledge a message before the game continues. Does nothing by default.
+
+        Args:
+            player (Player): Player the message is addressed to.
+            message (str): Message to acknowledge.
+        """
+        pass
+
+    def decide(self, board: 'Board', decision: Decision) -> Any:
+        """Answers a decision requested by the turn resolver.
+
+        Args:
+            board (Board): Board the game is played on.
+            decision (Decision): Decision to take.
+
+        Returns:
+            Any: Answer to the decision.
+        """
+        return DECIDERS[decision.kind](self, board, decision)
+
+    async def ask(self, board: 'Board', decision: Decision) -> Any:
+        """Answers a decision for a driver awaiting answers, such as the game server.
+        Policies answering synchronously decide right away.
+
+        Args:
+            board (Board): Board the game is played on.
+            decision (Decision): Decision to take.
+
+        Returns:
+            Any: Answer to the decision.
+        """
+        return self.decide(board, decision)
+
+DECIDERS: dict[DECISION, Callable[[Policy, 'Board', Decision], Any]] = {
+    DECISION.ACKNOWLEDGE: lambda policy, board, decision: policy.acknowledge(decision.player, decision.message),
+    DECISION.BUY: lambda policy, board, decision: policy.decide_buy(board, decision.player, decision.tile),
+    DECISION.TRAVEL: lambda policy, board, decision: policy.choose_travel(board, decision.player),
+}
+
+PROMPTS: dict[DECISION, Callable[['Board', Decision], str]] = {
+    DECISION.ACKNOWLEDGE: lambda board, decision: decision.message,
+    DECISION.BUY: lambda board, decision: "Are you willing to buy this part [yes | no]: ",
+    DECISION.TRAVEL: lambda board, decision: f"Enter tile number u want to travel to [1 - {len(board.tiles)}]: ",
+}
+
+def parse_buy(board: 'Board', text: str) -> bool:
+    """Parses the answer of a human to the offer of a tile.
+
+    Args:
+        board (Board): Board the game is played on.
+        text (str): Answer typed by the player.
+
+    Raises:
+        ValueError: If the answer is neither 'yes' nor 'no'.
+
+    Returns:
+        bool: True to buy the tile, False to skip.
+    """
+    if text not in {"yes", "no"}:
+        raise ValueError(f"Invalid answer: {text}")
+    return text == "yes"
+
+def parse_travel(board: 'Board', text: str) -> int:
+    """Parses the tile number a human wants to travel to.
+
+    Args:
+        board (Board): Board the game is played on.
+        text (str): Answer typed by the player.
+
+    Raises:
+        ValueError: If the answer is not a number of a tile.
+
+    Returns:
+        int: Number on the tile to travel to.
+    """
+    position = int(text)
+    if position < 1 or position > len(board.tiles):
+        raise ValueError(f"Invalid tile number: {position}")
+    return position
+
+PARSERS: dict[DECISION, Callable[['Board', str], Any]] = {
+    DECISION.ACKNOWLEDGE: lambda board, text: None,
+    DECISION.BUY: parse_buy,
+    DECISION.TRAVEL: parse_travel,
+}
+
+class ConsolePolicy(Policy):
+    """Policy asking a human player at the console."""
+    interactive = True
+
+    def decide(self, board: 'Board', decision: Decision) -> Any:
+        while True:
+            try:
+                return PARSERS[decision.kind](board, input(PROMPTS[decision.kind](board, decision)))
+            except ValueError:
+                pass
+
+    def decide_buy(self, board: 'Board', player: 'Player', tile: COMPONENT_TILE) -> bool:
+        return self.decide(board, Decision(DECISION.BUY, player, None, tile))
+
+    def choose_travel(self, board: 'Board', player: 'Player') -> int:
+        return self.decide(board, Decision(DECISION.TRAVEL, player, None))
+
+    def acknowledge(self, player: 'Player', message: str) -> None:
+        input(message)
+
+class RandomPolicy(Policy):
+    """Policy taking uniformly random decisions.
+
+    Uses the random generator of the board unless its own one is given, so decisions are reproducible from the seed of the game.
+    """
+    def __init__(self, rng: Random | None = None) -> None:
+        self.rng = rng
+
+    def decide_buy(self, board: 'Board', player: 'Player', tile: COMPONENT_TILE) -> bool:
+        return (self.rng if self.rng else board.rng).random() < 0.5
+
+    def choose_travel(self, board: 'Board', player: 'Player') -> int:
+        return (self.rng if self.rng else board.rng).randint(1, len(board.tiles))
+
+class GreedyPolicy(Policy):
+    """Policy buying every affordable tile and travelling to the first unowned part it is missing."""
+    def decide_buy(self, board: 'Board', player: 'Player', tile: COMPONENT_TILE) -> bool:
+        return True
+
+    def choose_travel(self, board: 'Board', player: 'Player') -> int:
+        state = board.state
+        parts = state.parts[player.index]
+        missing = unowned = 0
+        for code, tiles in enumerate(state.unowned):
+            unowned |= tiles
+            if CODE_PART_BITS[code] & ~parts:
+                missing |= tiles
+        target = missing if missing else unowned
+        return (target & -target).bit_length() if target else 1
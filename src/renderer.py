@@ -0,0 +1,259 @@
+from functools import cache
+from typing import TextIO, TYPE_CHECKING
+import sys
+
+if TYPE_CHECKING:
+    from board import Board
+    from player import Player
+
+CELL_WIDTH = 8
+CELL_LINES = 4
+
+HOME = "\033[H"
+CLEAR = "\033[2J"
+CLEAR_LINE = "\033[2K"
+CLEAR_BELOW = "\033[J"
+RESET = "\033[0m"
+PLAYER_COLORS = [
+    "\033[33m", "\033[32m", "\033[36m", "\033[35m",
+    "\033[34m", "\033[31m", "\033[93m", "\033[92m"
+]
+
+def move_cursor(line: int, column: int) -> str:
+    """Returns ANSI sequence moving the cursor.
+
+    Args:
+        line (int): Line on the screen, starting from 1.
+        column (int): Column on the screen, starting from 1.
+
+    Returns:
+        str: ANSI escape sequence.
+    """
+    return f"\033[{line};{column}H"
+
+def get_players_display(players: list['Player']) -> str:
+    """Returns a formatted string displaying the names of players standing on a tile,
+    with color coding based on the index of the player (yellow for P1, green for P2 and so on).
+    Names are packed tighter, down to player numbers only, when they do not fit in a cell.
+
+    Args:
+        players (list[Player]): Players standing on the tile.
+
+    Returns:
+        str: A formatted string of player names with ANSI color codes, padded to the width of a cell.
+    """
+    if not players:
+        return " " * CELL_WIDTH
+    labels = [player.name for player in players]
+    separator = " "
+    if len(" ".join(labels)) > CELL_WIDTH:
+        separator = ""
+        if len("".join(labels)) > CELL_WIDTH:
+            labels = [label.lstrip("P") for label in labels]
+    names = separator.join(
+        f"{PLAYER_COLORS[player.index % len(PLAYER_COLORS)]}{label}{RESET}" for player, label in zip(players, labels)
+    )
+    visible = len(separator.join(labels))
+    return names + " " * max(CELL_WIDTH - visible, 0)
+
+def get_owner_display(owner: 'Player | None') -> str:
+    """Returns a string representation of the owner of a tile.
+
+    Args:
+        owner (Player | None): Owner of the tile.
+
+    Returns:
+        str: The name of the owner if the tile has one, otherwise '--', centered in a cell.
+    """
+    return (owner.name if owner else "--").center(CELL_WIDTH)
+
+class Layout:
+    """Geometry of a square board drawn around the edge of a grid.
+
+    Tiles are placed clockwise starting from the top left corner. The grid is the smallest square
+    whose border fits all tiles, cells of the border left over after the last tile stay empty.
+    """
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.side = -(-size // 4) + 1
+        self.inner = (self.side - 2) * (CELL_WIDTH + 1) - 1
+        self.perimeter: list[tuple[int, int]] = self.create_perimeter()
+        self.grid: dict[tuple[int, int], int] = {position: index for index, position in enumerate(self.perimeter)}
+        self.cells: list[tuple[int, int]] = [
+            (row * (CELL_LINES + 1) + 1, col * (CELL_WIDTH + 1) + 1) for row, col in self.perimeter
+        ]
+        self.height = self.side * (CELL_LINES + 1) + 1
+
+    def create_perimeter(self) -> list[tuple[int, int]]:
+        """Maps tile indices to grid coordinates.
+
+        Returns:
+            list[tuple[int, int]]: Row and column of every tile.
+        """
+        last = self.side - 1
+        ring = (
+            [(0, col) for col in range(self.side)]
+            + [(row, last) for row in range(1, self.side)]
+            + [(last, col) for col in range(last - 1, -1, -1)]
+            + [(row, 0) for row in range(last - 1, 0, -1)]
+        )
+        return ring[:self.size]
+
+    def get_separator(self, row: int) -> str:
+        """Returns the separator line drawn above the given row of the grid.
+
+        Args:
+            row (int): Row of the grid, side of the grid for the bottom border.
+
+        Returns:
+            str: The separator line.
+        """
+        bar = "─" * CELL_WIDTH
+        if row == 0:
+            return "┌" + "┬".join([bar] * self.side) + "┐"
+        if row == self.side:
+            return "└" + "┴".join([bar] * self.side) + "┘"
+        if row == 1 or row == self.side - 1:
+            middle = "┴" if row == 1 else "┬"
+            return "├" + bar + "┼" + middle.join([bar] * (self.side - 2)) + "┼" + bar + "┤"
+        if row == self.side // 2:
+            text = "GIGAPOLY"
+        elif row == self.side // 2 + 1:
+            text = "c0pson"
+        else:
+            text = ""
+        return "├" + bar + "┤" + text.center(self.inner) + "├" + bar + "┤"
+
+@cache
+def get_layout(size: int) -> Layout:
+    """Returns the layout of a board, computed once per board size.
+
+    Args:
+        size (int): Number of tiles on the board.
+
+    Returns:
+        Layout: Geometry of the board.
+    """
+    return Layout(size)
+
+class Renderer:
+    """Draws the board to a terminal.
+
+    The static part of the frame (borders, tile names and numbers) is built once per board as line templates
+    with slots for the pawns and owner of every tile. Redrawing compares owners and positions of players with
+    what is already on the screen and rewrites only the cells which changed, positioning the cursor with ANSI
+    sequences, and sends the whole update to the terminal in a single write.
+    """
+    def __init__(self, board: 'Board', out: TextIO | None = None) -> None:
+        self.board = board
+        self.out: TextIO = out if out else sys.stdout
+        self.layout = get_layout(len(board.tiles))
+        self.templates: list[str] = []
+        self.slots: list[list[tuple[int, int]]] = []
+        self.create_frame()
+        self.header: list[str] | None = None
+        self.owners: list['Player | None'] = []
+        self.positions: list[int] = []
+
+    def create_frame(self) -> None:
+        """Creates line templates of the static frame with a slot for every dynamic part of a tile.
+        """
+        layout = self.layout
+        last = layout.side - 1
+        for row in range(layout.side):
+            self.add_line(layout.get_separator(row), [])
+            columns = range(layout.side) if row in {0, last} else (0, last)
+            indices = [layout.grid.get((row, col)) for col in columns]
+            for line in range(CELL_LINES):
+                cells: list[str] = []
+                slots: list[tuple[int, int]] = []
+                for index in indices:
+                    if index is None:
+                        cells.append(" " * CELL_WIDTH)
+                    elif line == 1:
+                        cells.append(self.board.tiles[index].name.center(CELL_WIDTH))
+                    elif line == 3:
+                        cells.append(f"{index + 1:<{CELL_WIDTH}}")
+                    else:
+                        cells.append("{}")
+                        slots.append((index, line // 2))
+                if row in {0, last}:
+                    text = "│" + "│".join(cells) + "│"
+                else:
+                    text = "│" + cells[0] + "│" + " " * layout.inner + "│" + cells[1] + "│"
+                self.add_line(text, slots)
+        self.add_line(layout.get_separator(layout.side), [])
+
+    def add_line(self, template: str, slots: list[tuple[int, int]]) -> None:
+        """Appends a line template of the static frame.
+
+        Args:
+            template (str): Line with '{}' in place of every slot.
+            slots (list[tuple[int, int]]): Tile index and kind (0 for pawns, 1 for owner) of every slot.
+        """
+        self.templates.append(template)
+        self.slots.append(slots)
+
+    def get_pawns(self, index: int) -> str:
+        """Returns pawns standing on a tile, formatted for display.
+
+        Args:
+            index (int): Index of the tile.
+
+        Returns:
+            str: Formatted pawns.
+        """
+        return get_players_display([player for player in self.board.players if player.position == index])
+
+    def frame(self) -> str:
+        """Returns the whole board as text.
+
+        Returns:
+            str: Lines of the board joined with newlines.
+        """
+        pawns = {position: self.get_pawns(position) for position in {player.position for player in self.board.players}}
+        empty = get_players_display([])
+        content = (
+            [pawns.get(index, empty) for index in range(len(self.board.tiles))],
+            [get_owner_display(owner) for owner in self.board.owners]
+        )
+        return "\n".join(
+            template.format(*[content[kind][index] for index, kind in slots]) if slots else template
+            for template, slots in zip(self.templates, self.slots)
+        )
+
+    def invalidate(self) -> None:
+        """Forces the next draw to redraw the whole screen.
+        """
+        self.header = None
+
+    def draw(self, header: list[str]) -> None:
+        """Draws header lines followed by the board, updating only what changed since the last draw.
+
+        Args:
+            header (list[str]): Lines displayed above the board.
+        """
+        positions = [player.position for player in self.board.players]
+        parts: list[str] = []
+        if self.header is None or len(self.header) != len(header) or len(self.positions) != len(positions):
+            parts.append(HOME + CLEAR + "\n".join(header) + "\n" + self.frame())
+        else:
+            for line, (old, new) in enumerate(zip(self.header, header)):
+                if old != new:
+                    parts.append(move_cursor(line + 1, 1) + CLEAR_LINE + new)
+            top = len(header)
+            cells = self.layout.cells
+            moved = {index for pair in zip(self.positions, positions) if pair[0] != pair[1] for index in pair}
+            for index in moved:
+                line, column = cells[index]
+                parts.append(move_cursor(top + line + 1, column + 1) + self.get_pawns(index))
+            for index, (old, new) in enumerate(zip(self.owners, self.board.owners)):
+                if old is not new:
+                    line, column = cells[index]
+                    parts.append(move_cursor(top + line + 3, column + 1) + get_owner_display(new))
+        parts.append(move_cursor(len(header) + self.layout.height + 1, 1) + CLEAR_BELOW)
+        self.header = list(header)
+        self.owners = list(self.board.owners)
+        self.positions = positions
+        self.out.write("".join(parts))
+        self.out.flush()
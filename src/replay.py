@@ -0,0 +1,479 @@
+from misc import TILE, EFFECT, TILE_CODES, EFFECT_CODES
+from game import Game
+from policy import GreedyPolicy
+from snapshot import EFFECT_INDEX, Snapshot, take_snapshot
+from turn import ACTION, TILE_ACTIONS
+from rules import Rules
+from events import Subscriber, TurnStarted, Rolled, Moved, Bought, Declined, CardDrawn, CardApplied, Bankrupted, GameEnded, Event
+from bisect import bisect_right
+from typing import Iterator, NamedTuple
+import argparse
+import mmap
+import os
+import struct
+
+MAGIC = b"GPRL"
+VERSION = 3
+KEYFRAME_INTERVAL = 64
+MASK = (1 << 64) - 1
+HEADER = struct.Struct("<4sBI?QBIIbHII")
+KEYFRAME = struct.Struct("<IIII")
+RULES = struct.Struct(f"<{len(Rules._fields)}q")
+
+# Turns are encoded as operations of one byte, the tag in the upper three bits and a small argument in the lower five.
+# POSITION is followed by the position as a varint.
+# The argument of END is the number of changes of money, with DRAWN set if words drawn from the generator follow.
+TURN, ROLL, CARD, BUY, DECLINE, POSITION, BANKRUPT, END = range(8)
+ARGUMENT = 0x1F
+DRAWN = 0x10
+
+class Keyframe(NamedTuple):
+    """Snapshot of a recorded game taken before a turn, and where the operations of that turn start."""
+    turn: int
+    ops: int
+    snapshot: int
+    length: int
+
+class TurnRecord(NamedTuple):
+    """Decoded turn of a recorded game.
+
+    Attributes:
+        turn (int): Number of the turn, starting at 1.
+        player (int): Index of the player who took the turn.
+        ops (tuple[tuple[int, int], ...]): Tags and arguments of operations in the order they happened.
+        money (tuple[tuple[int, int], ...]): Index of every player whose money changed during the turn and the change.
+        drawn (int): Number of words policies drew from the generator during the turn.
+    """
+    turn: int
+    player: int
+    ops: tuple[tuple[int, int], ...]
+    money: tuple[tuple[int, int], ...]
+    drawn: int
+
+    @property
+    def rolls(self) -> tuple[int, ...]:
+        """Values of the dice rolled during the turn."""
+        return tuple(argument for tag, argument in self.ops if tag == ROLL)
+
+    @property
+    def cards(self) -> tuple[EFFECT, ...]:
+        """Effects of the cards drawn during the turn."""
+        return tuple(EFFECT_CODES[argument] for tag, argument in self.ops if tag == CARD)
+
+def write_varint(out: bytearray, value: int) -> None:
+    """Appends a signed integer in zigzag LEB128 encoding, a single byte for changes below 64.
+
+    Args:
+        out (bytearray): Buffer to append to.
+        value (int): Integer to encode.
+    """
+    value = value << 1 if value >= 0 else (-value << 1) - 1
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+def read_varint(data: bytes | mmap.mmap, offset: int) -> tuple[int, int]:
+    """Reads a signed integer written by write_varint.
+
+    Args:
+        data (bytes | mmap.mmap): Encoded data.
+        offset (int): Offset of the integer.
+
+    Returns:
+        tuple[int, int]: Decoded integer and the offset following it.
+    """
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            break
+        shift += 7
+    return (value >> 1) if not value & 1 else -((value + 1) >> 1), offset
+
+class Recording:
+    """Record of a game being played, built from its events.
+
+    Turns are kept as operations of a byte or two: the dice rolls, cards drawn, buy decisions, tiles travelled to
+    and bankruptcies, followed by the changes of money and the number of words policies drew from the generator
+    of the game. Moves caused by the dice or cards are implied by them.
+    Every interval turns a snapshot of the game is kept as a keyframe, so a replay can jump to any turn
+    by restoring the keyframe before it and applying at most interval turns.
+    """
+    def __init__(self, game: Game, interval: int = KEYFRAME_INTERVAL) -> None:
+        self.game = game
+        self.interval = interval
+        self.ops = bytearray()
+        self.snapshots = bytearray()
+        self.keyframes: list[Keyframe] = []
+        self.money = list(game.board.state.money)
+        self.position = game.rng.tell()
+        self.implied = 0
+        self.open = False
+
+    def add(self, event: Event) -> None:
+        """Adds an event of the game to the record.
+
+        Args:
+            event (Event): Event emitted by the game.
+        """
+        ops = self.ops
+        match event:
+            case TurnStarted(player, turn):
+                self.end_turn()
+                if not self.keyframes or (turn - 1) % self.interval == 0:
+                    self.add_keyframe(turn - 1)
+                ops.append(TURN << 5 | player.index)
+                self.open = True
+            case Rolled(_, value):
+                ops.append(ROLL << 5 | value)
+                self.implied = value
+            case CardDrawn(_, effect):
+                ops.append(CARD << 5 | EFFECT_INDEX[effect])
+            case CardApplied(_, effect, _):
+                self.implied = self.game.board.card_effects[effect].steps
+            case Moved(_, start, end, _):
+                if not self.implied or end != (start + self.implied) % len(self.game.board.tiles):
+                    ops.append(POSITION << 5)
+                    write_varint(ops, end)
+                self.implied = 0
+            case Bought():
+                ops.append(BUY << 5)
+            case Declined():
+                ops.append(DECLINE << 5)
+            case Bankrupted(_, resigned):
+                ops.append(BANKRUPT << 5 | resigned)
+            case GameEnded():
+                self.end_turn()
+
+    def add_keyframe(self, turn: int) -> None:
+        """Keeps a snapshot of the game as it was before the turn.
+        Events of a turn start after the next player was picked, so the snapshot is moved back to the previous one.
+
+        Args:
+            turn (int): Number of turns played.
+        """
+        order = self.game.order
+        snapshot = take_snapshot(self.game)._replace(current=order.prev[order.current]).to_bytes()
+        self.keyframes.append(Keyframe(turn, len(self.ops), len(self.snapshots), len(snapshot)))
+        self.snapshots += snapshot
+
+    def end_turn(self) -> None:
+        """Closes the open turn with the changes of money of all players."""
+        if not self.open:
+            return
+        money, position = self.game.board.state.money, self.game.rng.tell()
+        changes = [(index, value - self.money[index]) for index, value in enumerate(money) if value != self.money[index]]
+        self.ops.append(END << 5 | len(changes) | (DRAWN if position != self.position else 0))
+        for index, change in changes:
+            self.ops.append(index)
+            write_varint(self.ops, change)
+        if position != self.position:
+            write_varint(self.ops, position - self.position)
+        self.money = list(money)
+        self.position = position
+        self.open = False
+
+    def to_bytes(self) -> bytes:
+        """Serializes the record, header first, then the rules, the layout, the keyframe index, turns and snapshots.
+
+        Returns:
+            bytes: Serialized record.
+        """
+        game, tiles = self.game, self.game.board.state.tiles
+        index = b"".join(KEYFRAME.pack(*keyframe) for keyframe in self.keyframes)
+        length = HEADER.size + RULES.size + len(tiles) + len(index) + len(self.ops) + len(self.snapshots)
+        header = HEADER.pack(
+            MAGIC, VERSION, length, isinstance(game.seed, int), game.seed & MASK if isinstance(game.seed, int) else 0,
+            len(game.players), len(tiles), game.turns_played, game.winner.index if game.winner else -1,
+            self.interval, len(self.keyframes), len(self.ops)
+        )
+        return b"".join((header, RULES.pack(*game.board.rules), tiles, index, self.ops, self.snapshots))
+
+def append_record(path: str, record: bytes) -> None:
+    """Appends a record to a log file with a single write, so processes recording into the same file never interleave.
+
+    Args:
+        path (str): Path of the log.
+        record (bytes): Serialized record.
+    """
+    descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        os.write(descriptor, record)
+    finally:
+        os.close(descriptor)
+
+def recorder(game: Game, path: str, interval: int = KEYFRAME_INTERVAL) -> Subscriber:
+    """Subscriber recording the game and appending its record to a log file when the game ends.
+
+    Args:
+        game (Game): Game the subscriber is subscribed to.
+        path (str): Path of the log.
+        interval (int, optional): Number of turns between keyframes. Defaults to KEYFRAME_INTERVAL.
+    """
+    recording = Recording(game, interval)
+    while True:
+        event = yield
+        recording.add(event)
+        if isinstance(event, GameEnded):
+            append_record(path, recording.to_bytes())
+            return
+
+def record(game: Game, path: str, interval: int = KEYFRAME_INTERVAL) -> Game:
+    """Records a game into a log file, see Recording.
+
+    Args:
+        game (Game): Game to record, before it is played.
+        path (str): Path of the log.
+        interval (int, optional): Number of turns between keyframes. Defaults to KEYFRAME_INTERVAL.
+
+    Returns:
+        Game: The game itself.
+    """
+    game.board.events.subscribe(recorder(game, path, interval))
+    return game
+
+class Replay:
+    """Recorded game read from a memory-mapped log. Nothing is decoded until a turn is asked for.
+
+    Attributes:
+        seed (int | None): Seed of the game, None if it was not seeded with an integer.
+        players (int): Number of players.
+        rules (Rules): Rules of the game.
+        tiles (tuple[TILE, ...]): Layout of the board.
+        turns (int): Number of turns played.
+        winner (int | None): Index of the winner, None for a draw or an unfinished game.
+        interval (int): Number of turns between keyframes.
+        keyframes (list[Keyframe]): Keyframes of the game, in order of turns.
+    """
+    def __init__(self, data: mmap.mmap, offset: int) -> None:
+        _, _, self.length, has_seed, seed, self.players, size, self.turns, winner, self.interval, n_keyframes, n_ops = HEADER.unpack_from(data, offset)
+        self.data = data
+        self.seed = seed if has_seed else None
+        self.winner = winner if winner >= 0 else None
+        self.rules = Rules(*RULES.unpack_from(data, offset + HEADER.size))
+        start = offset + HEADER.size + RULES.size
+        self.layout = bytes(data[start:start + size])
+        self.tiles: tuple[TILE, ...] = tuple(TILE_CODES[code] for code in self.layout)
+        start += size
+        self.keyframes = [Keyframe(*KEYFRAME.unpack_from(data, start + index * KEYFRAME.size)) for index in range(n_keyframes)]
+        self.ops = start + n_keyframes * KEYFRAME.size
+        self.snapshots = self.ops + n_ops
+
+    def keyframe(self, turn: int) -> Keyframe:
+        """Returns the last keyframe taken before the turn.
+
+        Args:
+            turn (int): Number of turns played.
+
+        Returns:
+            Keyframe: Keyframe to start from.
+        """
+        return self.keyframes[max(bisect_right(self.keyframes, turn, key=lambda keyframe: keyframe.turn) - 1, 0)]
+
+    def snapshot(self, keyframe: Keyframe) -> Snapshot:
+        """Decodes the snapshot of a keyframe.
+
+        Args:
+            keyframe (Keyframe): Keyframe of this game.
+
+        Returns:
+            Snapshot: State of the game before the turn of the keyframe.
+        """
+        start = self.snapshots + keyframe.snapshot
+        return Snapshot.from_bytes(self.data[start:start + keyframe.length])
+
+    def iter_turns(self, first: int = 1) -> Iterator[TurnRecord]:
+        """Decodes turns starting with the given one, skipping from the keyframe before it.
+
+        Args:
+            first (int, optional): Number of the first turn. Defaults to 1.
+
+        Yields:
+            TurnRecord: Turns in order.
+        """
+        data, end = self.data, self.snapshots
+        keyframe = self.keyframe(first - 1)
+        turn, offset = keyframe.turn, self.ops + keyframe.ops
+        while offset < end:
+            byte = data[offset]
+            player, offset = byte & ARGUMENT, offset + 1
+            ops: list[tuple[int, int]] = []
+            while True:
+                byte = data[offset]
+                tag, argument = byte >> 5, byte & ARGUMENT
+                offset += 1
+                if tag == END:
+                    break
+                if tag == POSITION:
+                    argument, offset = read_varint(data, offset)
+                ops.append((tag, argument))
+            money: list[tuple[int, int]] = []
+            for _ in range(argument & ~DRAWN):
+                index = data[offset]
+                change, offset = read_varint(data, offset + 1)
+                money.append((index, change))
+            drawn = 0
+            if argument & DRAWN:
+                drawn, offset = read_varint(data, offset)
+            turn += 1
+            if turn >= first:
+                yield TurnRecord(turn, player, tuple(ops), tuple(money), drawn)
+
+    def game_at(self, turn: int) -> Game:
+        """Rebuilds the game as it was after the given number of turns, restoring the keyframe before it
+        and applying the turns since. Dice and cards are drawn again from the restored generator and decks
+        and checked against the log, so the rebuilt game can also be played on.
+
+        Args:
+            turn (int): Number of turns played, from 0 to turns.
+
+        Raises:
+            IndexError: If the game has no such turn.
+            ValueError: If the log does not match the game replayed from the keyframe.
+
+        Returns:
+            Game: Rebuilt game with greedy policies and a headless view.
+        """
+        if not self.keyframes[0].turn <= turn <= self.turns:
+            raise IndexError(f"Game was recorded from turn {self.keyframes[0].turn} to {self.turns}")
+        keyframe = self.keyframe(turn)
+        game = Game([GreedyPolicy() for _ in range(self.players)], seed=self.seed, size=len(self.tiles), rules=self.rules)
+        game.restore(self.snapshot(keyframe))
+        if turn > keyframe.turn:
+            for record in self.iter_turns(keyframe.turn + 1):
+                apply_turn(game, record)
+                if record.turn == turn:
+                    break
+        if turn == self.turns:
+            game.running = False
+            game.winner = game.players[self.winner] if self.winner is not None else None
+        return game
+
+def apply_turn(game: Game, record: TurnRecord) -> None:
+    """Applies a recorded turn to a game in the state before it.
+
+    Args:
+        game (Game): Game to update.
+        record (TurnRecord): Turn to apply.
+
+    Raises:
+        ValueError: If dice or cards drawn by the game differ from the record.
+    """
+    board, state, index = game.board, game.board.state, record.player
+    player, size = game.players[index], len(board.tiles)
+    game.order.current = index
+    for tag, argument in record.ops:
+        if tag == ROLL:
+            if board.rng.roll() != argument:
+                raise ValueError(f"Turn {record.turn}: dice do not match the log")
+            state.positions[index] = (state.positions[index] + argument) % size
+        elif tag == CARD:
+            effect = EFFECT_CODES[argument]
+            cards = board.chance_cards if TILE_ACTIONS[board.tiles[state.positions[index]]] == ACTION.CHANCE else board.risk_cards
+            if cards.use_card() != effect:
+                raise ValueError(f"Turn {record.turn}: cards do not match the log")
+            state.positions[index] = (state.positions[index] + board.card_effects[effect].steps) % size
+        elif tag == POSITION:
+            state.positions[index] = argument
+        elif tag == BUY:
+            state.set_owner(state.positions[index], index)
+        elif tag == BANKRUPT:
+            state.resigned[index] = argument
+            game.order.remove(index)
+            board.remove_player(player)
+    for other, change in record.money:
+        state.money[other] += change
+    if record.drawn:
+        board.rng.seek(board.rng.tell() + record.drawn)
+    game.turns_played = record.turn
+
+class ReplayLog:
+    """Append-only log of recorded games, memory-mapped for reading. Records are found by their lengths
+    when the log is opened, a record cut short by a crash at the end of the log is ignored.
+    """
+    def __init__(self, path: str) -> None:
+        self.file = open(path, "rb")
+        size = os.fstat(self.file.fileno()).st_size
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self.offsets: list[int] = []
+        offset = 0
+        while offset + HEADER.size <= size:
+            magic, version, length = struct.unpack_from("<4sBI", self.data, offset)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"Not a replay record of version {VERSION} at offset {offset}")
+            if offset + length > size:
+                break
+            self.offsets.append(offset)
+            offset += length
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, index: int) -> Replay:
+        return Replay(self.data, self.offsets[index])
+
+    def __iter__(self) -> Iterator[Replay]:
+        return (Replay(self.data, offset) for offset in self.offsets)
+
+    def close(self) -> None:
+        """Unmaps and closes the log."""
+        if self.data:
+            self.data.close()
+        self.file.close()
+
+    def __enter__(self) -> 'ReplayLog':
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+def format_turn(replay: Replay, record: TurnRecord) -> str:
+    """Formats a recorded turn as a line of text.
+
+    Args:
+        replay (Replay): Game the turn belongs to.
+        record (TurnRecord): Turn to format.
+
+    Returns:
+        str: Description of the turn.
+    """
+    parts: list[str] = []
+    for tag, argument in record.ops:
+        if tag == ROLL:
+            parts.append(f"rolled {argument}")
+        elif tag == CARD:
+            parts.append(f"drew {EFFECT_CODES[argument].name}")
+        elif tag == POSITION:
+            parts.append(f"moved to {argument + 1}")
+        elif tag == BANKRUPT:
+            parts.append("resigned" if argument else "bankrupted")
+        else:
+            parts.append("bought" if tag == BUY else "declined")
+    money = ", ".join(f"P{index + 1} {change:+}" for index, change in record.money)
+    return f"Turn {record.turn}: P{record.player + 1} " + ", ".join(parts) + (f" | {money}" if money else "")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replays games recorded into a Gigapoly replay log.")
+    parser.add_argument("path", help="path of the replay log")
+    parser.add_argument("--game", type=int, default=None, help="index of the game in the log, lists all games if not given")
+    parser.add_argument("--turn", type=int, default=None, help="draws the board after this many turns, the last one by default")
+    parser.add_argument("--turns", action="store_true", help="prints the turns of the game instead of drawing the board")
+    args = parser.parse_args()
+    with ReplayLog(args.path) as log:
+        if args.game is None:
+            for index, replay in enumerate(log):
+                result = f"P{replay.winner + 1} won" if replay.winner is not None else "draw"
+                print(f"game {index}: seed {replay.seed}, {replay.players} players, {len(replay.tiles)} tiles, {replay.turns} turns, {result}")
+            return
+        replay = log[args.game]
+        if args.turns:
+            for record in replay.iter_turns(args.turn if args.turn else 1):
+                print(format_turn(replay, record))
+            return
+        replay.game_at(replay.turns if args.turn is None else args.turn).board.display()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+from misc import COMPONENT_TILE, TILE, EFFECT, GOOD_EFFECT, BAD_EFFECT, NEUTRAL_EFFECT
+from typing import Any, NamedTuple
+
+MAX_ADVANCE = 12  # moves of cards stay within the jump tables of boards, see board.MAX_JUMP
+
+class CardEffect(NamedTuple):
+    message: str
+    money: int
+    steps: int
+    roll: bool
+
+class Rules(NamedTuple):
+    """Economy of a game: money of players, prices of parts and amounts of cards.
+
+    Rules are a flat tuple of integers, so they are hashable and cheap to send between processes,
+    can be used as keys of caches and written as plain data. The engine reads prices and card effects
+    from the rules of its board, see Board.
+    """
+    start_money: int = 10_000
+    pass_start_money: int = 1000
+    gpu_price: int = COMPONENT_TILE.GPU.value
+    cpu_price: int = COMPONENT_TILE.CPU.value
+    mem_price: int = COMPONENT_TILE.MEM.value
+    ram_price: int = COMPONENT_TILE.RAM.value
+    nic_price: int = COMPONENT_TILE.NIC.value
+    service_price: int = COMPONENT_TILE.SERVICE.value
+    raise_money: int = 500
+    bonus_money: int = 400
+    loss_money: int = 300
+    advance_steps: int = 3
+
+    def prices(self) -> dict[TILE, int]:
+        """Returns the price of every component tile, which is also the rent paid for landing on it.
+
+        Returns:
+            dict[TILE, int]: Price of every component.
+        """
+        return {tile: getattr(self, f"{tile.name.lower()}_price") for tile in COMPONENT_TILE}
+
+    def card_effects(self) -> dict[EFFECT, CardEffect]:
+        """Returns the effect of every card.
+
+        Returns:
+            dict[EFFECT, CardEffect]: Message, change of money, steps moved and whether to roll again of every effect.
+        """
+        return {
+            GOOD_EFFECT.RAISE: CardEffect(f"Claim {self.raise_money}$", self.raise_money, 0, False),
+            GOOD_EFFECT.BONUS: CardEffect(f"Claim {self.bonus_money}$", self.bonus_money, 0, False),
+            GOOD_EFFECT.ADVANCE: CardEffect(f"Move by {self.advance_steps} tiles", 0, self.advance_steps, False),
+            GOOD_EFFECT.MOVE: CardEffect("Roll the dice", 0, 0, True),
+            BAD_EFFECT.LOOSE: CardEffect(f"You are loosing {self.loss_money}$ ", -self.loss_money, 0, False),
+            NEUTRAL_EFFECT.NOTHING: CardEffect("Nothing ever happens", 0, 0, False),
+        }
+
+    @classmethod
+    def from_dict(cls, values: dict[str, Any]) -> 'Rules':
+        """Creates rules from plain data, taking defaults for missing values.
+
+        Args:
+            values (dict[str, Any]): Values by name of the field.
+
+        Raises:
+            ValueError: If a name is not a field of the rules, or a value is not a non-negative integer
+                or moves further than MAX_ADVANCE.
+
+        Returns:
+            Rules: Rules with the given values.
+        """
+        unknown = set(values) - set(cls._fields)
+        if unknown:
+            raise ValueError(f"Unknown rules: {', '.join(sorted(unknown))}")
+        if not all(isinstance(value, int) and value >= 0 for value in values.values()):
+            raise ValueError("Rules must be non-negative integers")
+        rules = cls(**values)
+        if rules.advance_steps > MAX_ADVANCE:
+            raise ValueError(f"Cards can move at most {MAX_ADVANCE} tiles")
+        return rules
+
+DEFAULT_RULES = Rules()
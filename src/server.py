@@ -0,0 +1,255 @@
+from game import Game, MIN_PLAYERS, MAX_PLAYERS
+from board import BOARD_SIZE
+from policy import AsyncPolicy, GreedyPolicy, PROMPTS, PARSERS
+from view import ConsoleView
+from turn import DECISION, Decision
+from metrics import Metrics, instrument
+from replay import record
+from typing import Any, Callable, TYPE_CHECKING
+import argparse
+import asyncio
+import io
+
+if TYPE_CHECKING:
+    from board import Board
+
+LINE_LIMIT = 256
+BUFFER_LIMIT = 1 << 20
+TIMEOUT = 300.0
+METRICS_INTERVAL = 10.0
+
+DEFAULT_ANSWERS: dict[DECISION, Callable[['Board', Decision], Any]] = {
+    DECISION.ACKNOWLEDGE: lambda board, decision: None,
+    DECISION.BUY: lambda board, decision: False,
+    DECISION.TRAVEL: lambda board, decision: 1,
+}
+
+class Broadcast(io.TextIOBase):
+    """Text stream sending everything written to it to all connected clients of a game.
+
+    Writes only append to the buffers of the connections, the game drains them after every turn.
+    A client whose buffer grows past the limit is not reading what it is sent and is disconnected,
+    so a stalled client cannot make the server hold an unbounded backlog of frames.
+    """
+    def __init__(self, writers: list[asyncio.StreamWriter], limit: int = BUFFER_LIMIT) -> None:
+        self.writers = writers
+        self.limit = limit
+
+    def write(self, text: str) -> int:
+        data = text.replace("\n", "\r\n").encode()
+        for writer in self.writers:
+            if writer.is_closing():
+                continue
+            if writer.transport.get_write_buffer_size() > self.limit:
+                writer.close()
+                continue
+            writer.write(data)
+        return len(text)
+
+class RemotePolicy(AsyncPolicy):
+    """Policy of a player connected to the game server, answering decisions typed at their terminal.
+
+    The connection is read only while the player is asked for a decision, so a session waiting for its players
+    holds no more than the small buffers of its connections. A player who disconnects or stays idle for too long
+    resigns: pending and further decisions get default answers and the player is dropped at the end of their turn.
+    """
+    interactive = True
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, timeout: float = TIMEOUT) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.timeout = timeout
+        self.connected = True
+        self.closed = asyncio.Event()
+
+    async def ask(self, board: 'Board', decision: Decision) -> Any:
+        while self.connected:
+            line = await self.read_line(PROMPTS[decision.kind](board, decision))
+            if line is None:
+                break
+            try:
+                return PARSERS[decision.kind](board, line)
+            except ValueError:
+                pass
+        decision.player.resigned = True
+        return DEFAULT_ANSWERS[decision.kind](board, decision)
+
+    async def read_line(self, prompt: str) -> str | None:
+        """Sends the prompt and waits for a line typed by the player.
+
+        Args:
+            prompt (str): Prompt to send.
+
+        Returns:
+            str | None: Line without surrounding whitespace, None if the player disconnected or timed out.
+        """
+        try:
+            self.writer.write(prompt.encode())
+            await self.writer.drain()
+            line = await asyncio.wait_for(self.reader.readline(), self.timeout)
+        except (ConnectionError, TimeoutError, ValueError):
+            line = b""
+        if not line:
+            self.close()
+            return None
+        return line.decode(errors="replace").strip()
+
+    async def drain(self) -> None:
+        """Waits until the client has read what it was sent, closing the connection if it does not in time.
+        """
+        if not self.connected:
+            return
+        try:
+            await asyncio.wait_for(self.writer.drain(), self.timeout)
+        except (ConnectionError, TimeoutError):
+            self.close()
+
+    def close(self) -> None:
+        """Closes the connection and releases the client handler waiting for the end of the game.
+        """
+        self.connected = False
+        self.writer.close()
+        self.closed.set()
+
+class GameServer:
+    """Hosts many concurrent games in a single process.
+
+    Connected players wait in a lobby until there are enough of them for a game, empty seats are taken by bots.
+    Every game runs as a task driving the turn resolver of its board: actions resolve synchronously and the task
+    suspends only while a remote player is asked for a decision, so idle games cost no CPU time. The board is
+    drawn to all players of the game with the same diff-based updates as on the console.
+    Given metrics, all games are instrumented into them, see metrics.instrument. Given a replay log,
+    all finished games are recorded into it, see replay.
+    """
+    def __init__(
+        self,
+        players: int = 2,
+        bots: int = 0,
+        max_turns: int | None = None,
+        size: int = BOARD_SIZE,
+        timeout: float = TIMEOUT,
+        metrics: Metrics | None = None,
+        replays: str | None = None
+    ) -> None:
+        if not MIN_PLAYERS <= players <= MAX_PLAYERS:
+            raise ValueError(f"Game needs from {MIN_PLAYERS} to {MAX_PLAYERS} players")
+        if not 0 <= bots < players:
+            raise ValueError("Game needs at least one remote player")
+        self.players = players
+        self.bots = bots
+        self.max_turns = max_turns
+        self.size = size
+        self.timeout = timeout
+        self.metrics = metrics
+        self.replays = replays
+        self.lobby: list[RemotePolicy] = []
+        self.games: set[asyncio.Task[None]] = set()
+        self.exporter: asyncio.Task[None] | None = None
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Seats a new client in the lobby and keeps the connection open until its game ends.
+
+        Args:
+            reader (asyncio.StreamReader): Stream of the client.
+            writer (asyncio.StreamWriter): Stream to the client.
+        """
+        policy = RemotePolicy(reader, writer, self.timeout)
+        self.lobby = [waiting for waiting in self.lobby if not waiting.writer.is_closing()]
+        self.lobby.append(policy)
+        writer.write(b"Waiting for players...\r\n")
+        if len(self.lobby) + self.bots >= self.players:
+            seats: list[AsyncPolicy] = [*self.lobby[:self.players - self.bots], *(GreedyPolicy() for _ in range(self.bots))]
+            del self.lobby[:self.players - self.bots]
+            task = asyncio.create_task(self.host_game(seats))
+            self.games.add(task)
+            task.add_done_callback(self.games.discard)
+        await policy.closed.wait()
+
+    async def host_game(self, policies: list[AsyncPolicy]) -> None:
+        """Plays a game, awaiting decisions of all players and draining the connections of remote players after every turn.
+
+        Args:
+            policies (list[AsyncPolicy]): Policies of all players.
+        """
+        remote = [policy for policy in policies if isinstance(policy, RemotePolicy)]
+        game = Game(policies, ConsoleView(Broadcast([policy.writer for policy in remote])), self.max_turns, size=self.size)
+        if self.metrics:
+            instrument(game, self.metrics)
+        if self.replays:
+            record(game, self.replays)
+        resolver = game.board.resolver
+        try:
+            for player in game.players:
+                if isinstance(player.policy, RemotePolicy):
+                    player.policy.writer.write(f"You are {player.name}\r\n".encode())
+            while game.running and any(policy.connected for policy in remote):
+                player = game.start_turn()
+                while decision := resolver.advance():
+                    resolver.resolve(await decision.player.policy.ask(game.board, decision))
+                game.end_turn(player)
+                await asyncio.gather(*(policy.drain() for policy in remote))
+            for policy in remote:
+                if policy.connected:
+                    policy.writer.write(b"\r\nGame over\r\n")
+                    await policy.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for policy in remote:
+                policy.close()
+
+    async def export_metrics(self, path: str, interval: float = METRICS_INTERVAL) -> None:
+        """Saves the metrics of the server to a local file periodically until cancelled.
+
+        Args:
+            path (str): Path of the file, see Metrics.save.
+            interval (float, optional): Seconds between exports. Defaults to METRICS_INTERVAL.
+        """
+        if not self.metrics:
+            return
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                self.metrics.save(path)
+        finally:
+            self.metrics.save(path)
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765, path: str | None = None, metrics_path: str | None = None) -> None:
+        """Accepts players until cancelled.
+
+        Args:
+            host (str, optional): Address to listen on. Defaults to "127.0.0.1".
+            port (int, optional): TCP port to listen on. Defaults to 8765.
+            path (str | None, optional): Path of a Unix socket to listen on instead of TCP. Defaults to None.
+            metrics_path (str | None, optional): Path of the file metrics are exported to. Defaults to None.
+        """
+        if metrics_path:
+            self.exporter = asyncio.create_task(self.export_metrics(metrics_path))
+        if path:
+            server = await asyncio.start_unix_server(self.handle_connection, path, limit=LINE_LIMIT)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port, limit=LINE_LIMIT)
+        async with server:
+            await server.serve_forever()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Hosts Gigapoly games for players connecting with a terminal client such as telnet or nc.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port to listen on")
+    parser.add_argument("--unix", default=None, help="path of a Unix socket to listen on instead of TCP")
+    parser.add_argument("--players", type=int, default=2, help="number of players in every game")
+    parser.add_argument("--bots", type=int, default=0, help="number of seats of every game taken by bots")
+    parser.add_argument("--max-turns", type=int, default=None, help="turn limit after which a game is a draw")
+    parser.add_argument("--size", type=int, default=BOARD_SIZE, help="number of tiles on the board")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT, help="seconds a player may take to answer before resigning")
+    parser.add_argument("--metrics", default=None, help="export timings to this file, as JSON for .json files and Prometheus text otherwise")
+    parser.add_argument("--record", default=None, help="append finished games to this replay log")
+    args = parser.parse_args()
+    server = GameServer(args.players, args.bots, args.max_turns, args.size, args.timeout, Metrics() if args.metrics else None, args.record)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix, args.metrics))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
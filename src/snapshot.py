@@ -0,0 +1,216 @@
+from misc import EFFECT, TILE_CODES, EFFECT_CODES
+from state import TILE_INDEX
+from turn import ACTION, DECISION, ROLL_MESSAGE, Decision
+from typing import NamedTuple, TYPE_CHECKING
+from array import array
+import struct
+
+if TYPE_CHECKING:
+    from game import Game
+
+VERSION = 4
+NONE = -1
+HEADER = struct.Struct("<BIBIbbbb")
+RNG = struct.Struct("<QIH?dB")
+STREAM = struct.Struct("<BiH")
+PENDING = struct.Struct("<bbbbb")
+EFFECT_INDEX: dict[EFFECT, int] = {effect: code for code, effect in enumerate(EFFECT_CODES)}
+CONTINUATIONS: dict[DECISION, str] = {
+    DECISION.BUY: "bought",
+    DECISION.TRAVEL: "travelled",
+}
+
+class Snapshot(NamedTuple):
+    """Immutable copy of the full state of a game, down to the random generator and remaining cards of the decks.
+
+    The arrays of the game state are copied as bytes, positions and money as tuples, and other objects of the game are referred to by small integer
+    codes (players by index, tiles and effects by position in TILE_CODES and EFFECT_CODES, -1 for none),
+    so a snapshot is cheap to take, compare and hash, and is independent of the game it was taken from.
+    """
+    tiles: bytes
+    owners: bytes
+    positions: tuple[int, ...]
+    money: tuple[int, ...]
+    parts: bytes
+    resigned: bytes
+    alive: bytes
+    next: bytes
+    prev: bytes
+    current: int
+    remaining: int
+    turns_played: int
+    running: bool
+    winner: int
+    chance: bytes
+    risk: bytes
+    queue: tuple[tuple[int, int, int], ...]
+    pending: tuple[int, int, int, int, int] | None
+    rng: tuple[int, int, int, float | None, tuple[tuple[int, int, int], ...]]
+
+    def to_bytes(self) -> bytes:
+        """Serializes the snapshot into a few bytes per tile and player.
+
+        Returns:
+            bytes: Serialized snapshot.
+        """
+        return b"".join((
+            HEADER.pack(VERSION, len(self.tiles), len(self.positions), self.turns_played, self.current, self.remaining, self.running, self.winner),
+            self.tiles,
+            self.owners,
+            array("I", self.positions).tobytes(),
+            array("q", self.money).tobytes(),
+            self.parts,
+            self.resigned,
+            self.alive,
+            self.next,
+            self.prev,
+            bytes([len(self.chance)]),
+            self.chance,
+            bytes([len(self.risk)]),
+            self.risk,
+            bytes([len(self.queue), *(value & 0xFF for item in self.queue for value in item)]),
+            PENDING.pack(*self.pending) if self.pending else PENDING.pack(NONE, NONE, NONE, NONE, NONE),
+            RNG.pack(*self.rng[:3], self.rng[3] is not None, self.rng[3] if self.rng[3] is not None else 0.0, len(self.rng[4])),
+            *(STREAM.pack(*stream) for stream in self.rng[4]),
+        ))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Snapshot':
+        """Deserializes a snapshot written by to_bytes.
+
+        Args:
+            data (bytes): Serialized snapshot.
+
+        Raises:
+            ValueError: If the data was written by another version of the format.
+
+        Returns:
+            Snapshot: Deserialized snapshot.
+        """
+        version, size, count, turns_played, current, remaining, running, winner = HEADER.unpack_from(data)
+        if version != VERSION:
+            raise ValueError(f"Unsupported snapshot version: {version}")
+        offset = HEADER.size
+
+        def take(length: int) -> bytes:
+            nonlocal offset
+            offset += length
+            return bytes(data[offset - length:offset])
+
+        tiles, owners, positions = take(size), take(size), tuple(array("I", take(4 * count)))
+        money = tuple(array("q", take(8 * count)))
+        parts, resigned, alive, next_, prev = take(count), take(count), take(count), take(count), take(count)
+        chance = take(take(1)[0])
+        risk = take(take(1)[0])
+        flat = array("b", take(3 * take(1)[0]))
+        queue = tuple((flat[index], flat[index + 1], flat[index + 2]) for index in range(0, len(flat), 3))
+        pending = PENDING.unpack(take(PENDING.size))
+        key, block, cursor, has_gauss, gauss, n_streams = RNG.unpack(take(RNG.size))
+        streams = tuple(STREAM.unpack(take(STREAM.size)) for _ in range(n_streams))
+        return cls(
+            tiles, owners, positions, money, parts, resigned, alive, next_, prev,
+            current, remaining, turns_played, bool(running), winner, chance, risk, queue,
+            pending if pending[0] != NONE else None, (key, block, cursor, gauss if has_gauss else None, streams)
+        )
+
+def take_snapshot(game: 'Game') -> Snapshot:
+    """Captures the state of a game. Can be taken at any point, also while a decision is pending.
+
+    Args:
+        game (Game): Game to capture.
+
+    Returns:
+        Snapshot: State of the game.
+    """
+    board, resolver, state = game.board, game.board.resolver, game.board.state
+    alive = bytearray(len(game.players))
+    for player in board.players:
+        alive[player.index] = 1
+    pending = resolver.pending
+    return Snapshot(
+        state.tiles,
+        bytes(state.owners),
+        tuple(state.positions),
+        tuple(state.money),
+        bytes(state.parts),
+        bytes(state.resigned),
+        bytes(alive),
+        bytes(game.order.next),
+        bytes(game.order.prev),
+        game.order.current,
+        game.order.remaining,
+        game.turns_played,
+        game.running,
+        game.winner.index if game.winner else NONE,
+        bytes(map(EFFECT_INDEX.__getitem__, board.chance_cards.deck)),
+        bytes(map(EFFECT_INDEX.__getitem__, board.risk_cards.deck)),
+        tuple((action, player.index, dice_roll or 0) for action, player, dice_roll in resolver.queue),
+        (
+            pending.kind,
+            pending.player.index,
+            pending.dice_roll or 0,
+            TILE_INDEX[pending.tile] if pending.tile else NONE,
+            EFFECT_INDEX[pending.effect] if pending.effect else NONE,
+        ) if pending else None,
+        game.rng.getstate(),
+    )
+
+def restore_snapshot(game: 'Game', snapshot: Snapshot) -> None:
+    """Puts a game back into a captured state. The game must have the same number of players and tiles
+    as the snapshot, its policies and view are kept.
+
+    Args:
+        game (Game): Game to restore.
+        snapshot (Snapshot): State to restore.
+
+    Raises:
+        ValueError: If the number of players or tiles does not match.
+    """
+    board, resolver, players, state = game.board, game.board.resolver, game.players, game.board.state
+    if len(snapshot.positions) != len(players) or len(snapshot.tiles) != len(board.tiles):
+        raise ValueError(
+            f"Snapshot has {len(snapshot.positions)} players and {len(snapshot.tiles)} tiles, "
+            f"game has {len(players)} players and {len(board.tiles)} tiles"
+        )
+    if snapshot.tiles != state.tiles:
+        state.tiles = snapshot.tiles
+        for name in ("board", "nodes", "renderer"):
+            board.__dict__.pop(name, None)
+    state.owners[:] = snapshot.owners
+    state.positions[:] = array("I", snapshot.positions)
+    state.money[:] = array("q", snapshot.money)
+    state.resigned[:] = snapshot.resigned
+    state.reindex()
+    board.players = [player for player, alive in zip(players, snapshot.alive) if alive]
+    game.order.next[:] = snapshot.next
+    game.order.prev[:] = snapshot.prev
+    game.order.current = snapshot.current
+    game.order.remaining = snapshot.remaining
+    game.turns_played = snapshot.turns_played
+    game.running = snapshot.running
+    game.winner = players[snapshot.winner] if snapshot.winner != NONE else None
+    board.chance_cards.deck = [EFFECT_CODES[code] for code in snapshot.chance]
+    board.risk_cards.deck = [EFFECT_CODES[code] for code in snapshot.risk]
+    resolver.queue.clear()
+    resolver.queue.extend((ACTION(action), players[index], dice_roll or None) for action, index, dice_roll in snapshot.queue)
+    resolver.pending = None
+    resolver.after = None
+    if snapshot.pending:
+        kind, index, dice_roll, tile, effect = snapshot.pending
+        decision = Decision(
+            DECISION(kind),
+            players[index],
+            dice_roll or None,
+            TILE_CODES[tile] if tile != NONE else None,
+            EFFECT_CODES[effect] if effect != NONE else None,
+        )
+        if decision.effect:
+            decision = decision._replace(message=board.card_effects[decision.effect].message)
+            after = resolver.apply_effect
+        elif decision.kind == DECISION.ACKNOWLEDGE:
+            decision = decision._replace(message=ROLL_MESSAGE)
+            after = resolver.rolled
+        else:
+            after = getattr(resolver, CONTINUATIONS[decision.kind])
+        resolver.ask(decision, after)
+    game.rng.setstate(snapshot.rng)
@@ -0,0 +1,275 @@
+from misc import COMPONENT_TILE, SPECIAL_TILE, TILE
+from board import Board
+from policy import Policy
+from analytics import DECKS, analyze, get_deck_probabilities
+from turn import ACTION, DECISION, TILE_ACTIONS, Decision
+from rules import DEFAULT_RULES, CardEffect, Rules
+from functools import lru_cache
+from typing import Any, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from player import Player
+
+DEPTH = 2
+HORIZON = 50
+MONEY_BUCKET = 250
+PART_VALUE = 2000
+WIN_VALUE = 1_000_000
+MAX_CHAIN = 4
+MAX_STATES = 1_000_000
+SOLVER_CACHE = 64
+
+class Solver:
+    """Expectimax solver of buy and travel decisions on a single board layout.
+
+    The state of the deciding player is abstracted to their position, the tiles they own, the tiles owned by
+    anyone else, and their money rounded down to buckets. Dice and cards are chance nodes weighted by the
+    frequencies of a full deck, opponents keep their tiles and only collect rent. Turns of the player are
+    searched to a fixed depth, after which a state is worth its money plus the rent its tiles are expected to earn
+    over the horizon (see analytics) minus the rent the player is expected to pay, plus a bonus per distinct part.
+    Collecting all parts wins and running out of money loses. Values and best actions of every state are memoized,
+    so once a state was solved the decision is a single dictionary lookup.
+    """
+    def __init__(
+        self,
+        tiles: tuple[TILE, ...],
+        depth: int = DEPTH,
+        horizon: int = HORIZON,
+        money_bucket: int = MONEY_BUCKET,
+        rules: Rules = DEFAULT_RULES
+    ) -> None:
+        self.tiles = tiles
+        self.rules = rules
+        self.pass_start_money = rules.pass_start_money
+        self.depth = depth
+        self.horizon = horizon
+        self.money_bucket = money_bucket
+        self.jumps = Board.create_jumps(len(tiles))
+        self.rent = [float(rent) for rent in analyze(tiles, rules=rules).rent]
+        prices = rules.prices()
+        self.prices = [prices.get(tile, 0) for tile in tiles]
+        parts = [part for part in COMPONENT_TILE if part != COMPONENT_TILE.SERVICE]
+        self.part_bits = [1 << parts.index(tile) if tile in parts else 0 for tile in tiles]
+        self.all_parts = (1 << len(parts)) - 1
+        self.travel_targets = [index for index, tile in enumerate(tiles) if tile != SPECIAL_TILE.TRAVEL]
+        card_effects = rules.card_effects()
+        self.decks: dict[ACTION, list[tuple[CardEffect, float]]] = {
+            action: [(card_effects[effect], probability) for effect, probability in get_deck_probabilities(cards).items()]
+            for action, cards in DECKS.items()
+        }
+        self.values: dict[tuple, float] = {}
+        self.choices: dict[tuple, Any] = {}
+
+    def get_parts(self, mine: int) -> int:
+        """Returns the distinct parts held by the owner of the given tiles.
+
+        Args:
+            mine (int): Bitmask of owned tiles.
+
+        Returns:
+            int: Bitmask of parts.
+        """
+        parts = 0
+        for index, bit in enumerate(self.part_bits):
+            if mine >> index & 1:
+                parts |= bit
+        return parts
+
+    def leaf(self, mine: int, theirs: int, money: int) -> float:
+        """Scores a state at the end of the search.
+        """
+        rent = 0.0
+        for index, value in enumerate(self.rent):
+            if mine >> index & 1:
+                rent += value
+            elif theirs >> index & 1:
+                rent -= value
+        return money + self.horizon * rent + PART_VALUE * self.get_parts(mine).bit_count()
+
+    def value(self, position: int, mine: int, theirs: int, money: int, depth: int) -> float:
+        """Returns the expected value of a state at the start of a turn of the player.
+
+        Args:
+            position (int): Position of the player.
+            mine (int): Bitmask of tiles owned by the player.
+            theirs (int): Bitmask of tiles owned by other players.
+            money (int): Money of the player.
+            depth (int): Turns left to search.
+
+        Returns:
+            float: Expected value of the state.
+        """
+        money -= money % self.money_bucket
+        if depth == 0:
+            return self.leaf(mine, theirs, money)
+        key = (position, mine, theirs, money, depth)
+        value = self.values.get(key)
+        if value is None:
+            if len(self.values) > MAX_STATES:
+                self.values.clear()
+                self.choices.clear()
+            value = sum(self.roll(position, mine, theirs, money, depth, 0, steps) for steps in range(1, 7)) / 6
+            self.values[key] = value
+        return value
+
+    def roll(self, position: int, mine: int, theirs: int, money: int, depth: int, chain: int, steps: int) -> float:
+        """Returns the expected value of moving by the rolled number of steps.
+        """
+        destination, passes = self.jumps[position][steps]
+        return self.land(destination, mine, theirs, money + passes * self.pass_start_money, depth, chain)
+
+    def land(self, position: int, mine: int, theirs: int, money: int, depth: int, chain: int) -> float:
+        """Returns the expected value of landing on a tile, resolving its action and ending the turn.
+        """
+        action = TILE_ACTIONS[self.tiles[position]]
+        if chain >= MAX_CHAIN:
+            action = ACTION.NOTHING
+        if action == ACTION.BUY:
+            price, bit = self.prices[position], 1 << position
+            if theirs & bit:
+                return self.end(position, mine, theirs, money - price, depth)
+            if mine & bit or money < price:
+                return self.end(position, mine, theirs, money, depth)
+            return max(self.get_buy_values(position, mine, theirs, money, depth).values())
+        if action == ACTION.TRAVEL:
+            return max(self.get_travel_values(position, mine, theirs, money, depth, chain).values())
+        if action in self.decks:
+            value = 0.0
+            for effect, probability in self.decks[action]:
+                if effect.steps:
+                    destination, passes = self.jumps[position][effect.steps]
+                    outcome = self.land(destination, mine, theirs, money + effect.money + passes * self.pass_start_money, depth, chain + 1)
+                elif effect.roll:
+                    outcome = sum(self.roll(position, mine, theirs, money + effect.money, depth, chain + 1, steps) for steps in range(1, 7)) / 6
+                else:
+                    outcome = self.end(position, mine, theirs, money + effect.money, depth)
+                value += probability * outcome
+            return value
+        return self.end(position, mine, theirs, money, depth)
+
+    def end(self, position: int, mine: int, theirs: int, money: int, depth: int) -> float:
+        """Returns the value of a resolved turn, checking the end of the game.
+        """
+        if money <= 0:
+            return -WIN_VALUE
+        if self.get_parts(mine) == self.all_parts:
+            return WIN_VALUE
+        return self.value(position, mine, theirs, money, depth - 1)
+
+    def get_buy_values(self, position: int, mine: int, theirs: int, money: int, depth: int) -> dict[bool, float]:
+        """Returns the value of buying and of skipping the tile the player landed on.
+
+        Returns:
+            dict[bool, float]: Value of every answer.
+        """
+        return {
+            True: self.end(position, mine | 1 << position, theirs, money - self.prices[position], depth),
+            False: self.end(position, mine, theirs, money, depth),
+        }
+
+    def get_travel_values(self, position: int, mine: int, theirs: int, money: int, depth: int, chain: int = 0) -> dict[int, float]:
+        """Returns the value of travelling to every tile, by number on the tile.
+
+        Returns:
+            dict[int, float]: Value of every answer.
+        """
+        return {target + 1: self.land(target, mine, theirs, money, depth, chain + 1) for target in self.travel_targets}
+
+    def decide(self, kind: DECISION, position: int, mine: int, theirs: int, money: int, depth: int | None = None) -> Any:
+        """Returns the best answer to a decision, solving the state on first use.
+
+        Args:
+            kind (DECISION): Kind of the decision, BUY or TRAVEL.
+            position (int): Position of the player.
+            mine (int): Bitmask of tiles owned by the player.
+            theirs (int): Bitmask of tiles owned by other players.
+            money (int): Money of the player.
+            depth (int | None, optional): Turns to search. Defaults to the depth of the solver.
+
+        Returns:
+            Any: Best answer.
+        """
+        depth = depth if depth else self.depth
+        money -= money % self.money_bucket
+        key = (kind, position, mine, theirs, money, depth)
+        choice = self.choices.get(key)
+        if choice is None:
+            values = self.evaluate(kind, position, mine, theirs, money, depth)
+            choice = self.choices[key] = max(values, key=values.__getitem__)
+        return choice
+
+    def evaluate(self, kind: DECISION, position: int, mine: int, theirs: int, money: int, depth: int | None = None) -> dict[Any, float]:
+        """Returns the value of every answer to a decision.
+
+        Args:
+            kind (DECISION): Kind of the decision, BUY or TRAVEL.
+            position (int): Position of the player.
+            mine (int): Bitmask of tiles owned by the player.
+            theirs (int): Bitmask of tiles owned by other players.
+            money (int): Money of the player.
+            depth (int | None, optional): Turns to search. Defaults to the depth of the solver.
+
+        Returns:
+            dict[Any, float]: Value of every answer.
+        """
+        depth = depth if depth else self.depth
+        money -= money % self.money_bucket
+        if kind == DECISION.BUY:
+            return self.get_buy_values(position, mine, theirs, money, depth)
+        return self.get_travel_values(position, mine, theirs, money, depth)
+
+@lru_cache(maxsize=SOLVER_CACHE)
+def get_solver(tiles: tuple[TILE, ...], depth: int = DEPTH, rules: Rules = DEFAULT_RULES) -> Solver:
+    """Returns the solver of a layout. Solvers of the most recently used layouts are kept with everything they solved.
+
+    Args:
+        tiles (tuple[TILE, ...]): Layout of the board.
+        depth (int, optional): Turns to search. Defaults to DEPTH.
+        rules (Rules, optional): Rules of the game. Defaults to DEFAULT_RULES.
+
+    Returns:
+        Solver: Solver of the layout.
+    """
+    return Solver(tiles, depth, rules=rules)
+
+def get_state(board: 'Board', player: 'Player') -> tuple[int, int, int, int]:
+    """Abstracts the state of the game as seen by the player.
+
+    Args:
+        board (Board): Board the game is played on.
+        player (Player): Player taking a decision.
+
+    Returns:
+        tuple[int, int, int, int]: Position, bitmasks of tiles owned by the player and by others, and money.
+    """
+    owned = 0
+    for tiles in board.state.holdings:
+        owned |= tiles
+    mine = board.state.holdings[player.index]
+    return player.position, mine, owned & ~mine, player.money
+
+def get_regret(board: 'Board', decision: Decision, answer: Any, depth: int = DEPTH) -> float:
+    """Measures how much value an answer to a decision loses against the best one, according to the solver.
+
+    Args:
+        board (Board): Board the game is played on.
+        decision (Decision): Decision taken.
+        answer (Any): Answer given.
+        depth (int, optional): Turns to search. Defaults to DEPTH.
+
+    Returns:
+        float: Difference between the value of the best answer and the given one, 0 for the best answer.
+    """
+    values = get_solver(tuple(board.tiles), depth, board.rules).evaluate(decision.kind, *get_state(board, decision.player))
+    return max(values.values()) - values.get(answer, min(values.values()))
+
+class SolverPolicy(Policy):
+    """Policy answering buy and travel decisions with the memoized expectimax solver of the layout."""
+    def __init__(self, depth: int = DEPTH) -> None:
+        self.depth = depth
+
+    def decide_buy(self, board: 'Board', player: 'Player', tile: COMPONENT_TILE) -> bool:
+        return get_solver(tuple(board.tiles), self.depth, board.rules).decide(DECISION.BUY, *get_state(board, player))
+
+    def choose_travel(self, board: 'Board', player: 'Player') -> int:
+        return get_solver(tuple(board.tiles), self.depth, board.rules).decide(DECISION.TRAVEL, *get_state(board, player))
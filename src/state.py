@@ -0,0 +1,234 @@
+from misc import COMPONENT_TILE, TILE, TILE_CODES
+from rules import DEFAULT_RULES
+from array import array
+from functools import lru_cache
+from typing import Iterator, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from board import Board
+    from player import Player
+
+NO_OWNER = 0
+PARTS: list[COMPONENT_TILE] = [part for part in COMPONENT_TILE if part != COMPONENT_TILE.SERVICE]
+PART_BITS: dict[TILE, int] = {part: 1 << index for index, part in enumerate(PARTS)}
+ALL_PARTS = (1 << len(PARTS)) - 1
+TILE_INDEX: dict[TILE, int] = {tile: code for code, tile in enumerate(TILE_CODES)}
+N_COMPONENTS = len(COMPONENT_TILE)
+CODE_PART_BITS: list[int] = [PART_BITS.get(tile, 0) for tile in TILE_CODES]  # components come first in TILE_CODES
+
+@lru_cache(maxsize=1024)
+def decode_tiles(codes: bytes) -> tuple[TILE, ...]:
+    """Decodes a layout. Layouts are cached, so games played on the same layout share a single tuple of tiles.
+
+    Args:
+        codes (bytes): Codes of tiles, see TILE_CODES.
+
+    Returns:
+        tuple[TILE, ...]: Tiles of the layout.
+    """
+    return tuple(TILE_CODES[code] for code in codes)
+
+def encode_tiles(tiles: list[TILE] | tuple[TILE, ...]) -> bytes:
+    """Encodes a layout.
+
+    Args:
+        tiles (list[TILE] | tuple[TILE, ...]): Tiles of the layout.
+
+    Returns:
+        bytes: Codes of tiles, see TILE_CODES.
+    """
+    return bytes(TILE_INDEX[tile] for tile in tiles)
+
+def get_positions(mask: int) -> list[int]:
+    """Decodes a bitmask of tiles.
+
+    Args:
+        mask (int): Bitmask of tiles, bit i for the tile at position i.
+
+    Returns:
+        list[int]: Positions in the mask, in order.
+    """
+    positions: list[int] = []
+    while mask:
+        low = mask & -mask
+        positions.append(low.bit_length() - 1)
+        mask ^= low
+    return positions
+
+def get_parts(mask: int) -> list[COMPONENT_TILE]:
+    """Decodes a bitmask of parts.
+
+    Args:
+        mask (int): Bitmask of parts, see PART_BITS.
+
+    Returns:
+        list[COMPONENT_TILE]: Parts in the mask.
+    """
+    return [part for part in PARTS if mask & PART_BITS[part]]
+
+class GameState:
+    """Mutable state of a single game stored as a struct of arrays of small integers.
+
+    Tiles are codes of TILE_CODES, owners are player index + 1 (0 for no owner), and parts of every player
+    are a bitmask. Positions are 32-bit, so they index boards of any size. The whole state of a two-player game takes a few tens of bytes of payload,
+    Board, Player and Node are views reading and writing these arrays.
+
+    Ownership is indexed incrementally by set_owner: parts hold the distinct parts of the tiles every player owns,
+    holdings the bitmask of their tiles, counts the number of their tiles of every component including duplicates,
+    and unowned the bitmask of unowned tiles of every component. Win checks and ownership queries are
+    constant time, the index is derived from owners and rebuilt by reindex.
+    """
+    __slots__ = ("tiles", "start_money", "owners", "positions", "money", "parts", "resigned", "holdings", "counts", "unowned")
+
+    def __init__(self, tiles: bytes, start_money: int = DEFAULT_RULES.start_money) -> None:
+        self.tiles: bytes = tiles
+        self.start_money = start_money
+        self.owners = bytearray(len(tiles))
+        self.positions = array("I")
+        self.money = array("q")
+        self.parts = bytearray()
+        self.resigned = bytearray()
+        self.holdings: list[int] = []
+        self.counts = bytearray()
+        self.unowned: list[int] = [0] * N_COMPONENTS
+        self.reindex()
+
+    def add_player(self, index: int) -> None:
+        """Resets the state of a player, growing the arrays to fit them.
+
+        Args:
+            index (int): Index of the player.
+        """
+        while len(self.positions) <= index:
+            self.positions.append(0)
+            self.money.append(self.start_money)
+            self.parts.append(0)
+            self.resigned.append(0)
+            self.holdings.append(0)
+            self.counts.extend(bytes(N_COMPONENTS))
+        self.positions[index] = 0
+        self.money[index] = self.start_money
+        self.resigned[index] = 0
+        self.release(index)
+        self.parts[index] = 0
+
+    def reindex(self) -> None:
+        """Rebuilds the ownership index from owners, after the tiles or owners were replaced as a whole.
+        """
+        self.parts[:] = bytes(len(self.parts))
+        self.holdings[:] = [0] * len(self.holdings)
+        self.counts[:] = bytes(len(self.counts))
+        self.unowned[:] = [0] * N_COMPONENTS
+        for position, (code, owner) in enumerate(zip(self.tiles, self.owners)):
+            if code >= N_COMPONENTS:
+                continue
+            if owner:
+                self.holdings[owner - 1] |= 1 << position
+                self.counts[(owner - 1) * N_COMPONENTS + code] += 1
+                self.parts[owner - 1] |= CODE_PART_BITS[code]
+            else:
+                self.unowned[code] |= 1 << position
+
+    def set_owner(self, position: int, index: int | None) -> None:
+        """Changes the owner of a tile, updating the ownership index.
+
+        Args:
+            position (int): Position of the tile.
+            index (int | None): Index of the new owner, None to release the tile.
+        """
+        code, bit = self.tiles[position], 1 << position
+        old = self.owners[position]
+        if old:
+            self.holdings[old - 1] &= ~bit
+            if code < N_COMPONENTS:
+                slot = (old - 1) * N_COMPONENTS + code
+                self.counts[slot] -= 1
+                if not self.counts[slot]:
+                    self.parts[old - 1] &= ~CODE_PART_BITS[code]
+        elif code < N_COMPONENTS:
+            self.unowned[code] &= ~bit
+        if index is None:
+            self.owners[position] = NO_OWNER
+            if code < N_COMPONENTS:
+                self.unowned[code] |= bit
+            return
+        self.owners[position] = index + 1
+        self.holdings[index] |= bit
+        if code < N_COMPONENTS:
+            self.counts[index * N_COMPONENTS + code] += 1
+            self.parts[index] |= CODE_PART_BITS[code]
+
+    def release(self, index: int) -> None:
+        """Releases all tiles owned by a player.
+
+        Args:
+            index (int): Index of the player.
+        """
+        for position in get_positions(self.holdings[index]):
+            self.set_owner(position, None)
+
+    def count_owned(self, index: int, tile: TILE) -> int:
+        """Returns how many tiles of a component a player owns, duplicates included.
+
+        Args:
+            index (int): Index of the player.
+            tile (TILE): Component.
+
+        Returns:
+            int: Number of tiles.
+        """
+        code = TILE_INDEX[tile]
+        return self.counts[index * N_COMPONENTS + code] if code < N_COMPONENTS else 0
+
+    def missing_parts(self, index: int) -> int:
+        """Returns how many distinct parts a player still has to collect.
+
+        Args:
+            index (int): Index of the player.
+
+        Returns:
+            int: Number of missing parts.
+        """
+        return (ALL_PARTS & ~self.parts[index]).bit_count()
+
+    def unowned_tiles(self, tile: TILE) -> int:
+        """Returns the unowned tiles of a component.
+
+        Args:
+            tile (TILE): Component.
+
+        Returns:
+            int: Bitmask of positions, see get_positions.
+        """
+        code = TILE_INDEX[tile]
+        return self.unowned[code] if code < N_COMPONENTS else 0
+
+    def to_bytes(self) -> bytes:
+        """Packs the state of the board and players.
+
+        Returns:
+            bytes: Tiles, owners, positions, money, parts and resigned flags, one after another.
+        """
+        return b"".join((self.tiles, self.owners, self.positions.tobytes(), self.money.tobytes(), self.parts, self.resigned))
+
+class Owners:
+    """Sequence view of owners of tiles, mapping the codes of the game state to players.
+    """
+    __slots__ = ("board",)
+
+    def __init__(self, board: 'Board') -> None:
+        self.board = board
+
+    def __len__(self) -> int:
+        return len(self.board.state.owners)
+
+    def __getitem__(self, index: int) -> 'Player | None':
+        code = self.board.state.owners[index]
+        return self.board.seats[code - 1] if code else None
+
+    def __setitem__(self, index: int, player: 'Player | None') -> None:
+        self.board.state.set_owner(index, player.index if player else None)
+
+    def __iter__(self) -> Iterator['Player | None']:
+        seats = self.board.seats
+        return (seats[code - 1] if code else None for code in self.board.state.owners)
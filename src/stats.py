@@ -0,0 +1,125 @@
+from math import inf, sqrt
+from typing import Any
+
+Z_95 = 1.959963984540054
+
+class RunningStats:
+    """Count, mean, variance and range of a stream of observations, updated in constant memory.
+
+    Observations are folded in with Welford's algorithm and shards are merged with the parallel
+    variant of Chan et al., so neither loses precision over millions of games.
+
+    Attributes:
+        count (int): Number of observations.
+        mean (float): Mean of observations.
+        m2 (float): Sum of squared differences from the mean.
+        low (float): Smallest observation.
+        high (float): Largest observation.
+    """
+    __slots__ = ("count", "mean", "m2", "low", "high")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.low = inf
+        self.high = -inf
+
+    def add(self, value: float) -> None:
+        """Adds an observation.
+
+        Args:
+            value (float): Observed value.
+        """
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.low:
+            self.low = value
+        if value > self.high:
+            self.high = value
+
+    def merge(self, other: 'RunningStats') -> None:
+        """Adds observations summarized by another instance.
+
+        Args:
+            other (RunningStats): Statistics to add.
+        """
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.low = min(self.low, other.low)
+        self.high = max(self.high, other.high)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Returns the statistics as plain data.
+
+        Returns:
+            dict[str, Any]: Count, mean, m2, low and high.
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> 'RunningStats':
+        """Creates statistics from plain data returned by to_dict.
+
+        Args:
+            data (dict[str, Any]): Count, mean, m2, low and high.
+
+        Returns:
+            RunningStats: Statistics.
+        """
+        stats = cls()
+        for name in cls.__slots__:
+            setattr(stats, name, data[name])
+        return stats
+
+    @property
+    def variance(self) -> float:
+        """Sample variance of observations, 0 for less than two of them."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        """Sample standard deviation of observations."""
+        return sqrt(self.variance)
+
+    def interval(self, z: float = Z_95) -> tuple[float, float]:
+        """Returns the normal confidence interval of the mean.
+
+        Args:
+            z (float, optional): Quantile of the standard normal distribution. Defaults to Z_95.
+
+        Returns:
+            tuple[float, float]: Lower and upper bound of the mean.
+        """
+        if self.count < 2:
+            return -inf, inf
+        half = z * self.stdev / sqrt(self.count)
+        return self.mean - half, self.mean + half
+
+def wilson_interval(successes: int, trials: int, z: float = Z_95) -> tuple[float, float]:
+    """Returns the Wilson score interval of a proportion. Unlike the normal interval it stays within [0, 1]
+    and does not collapse for proportions close to 0 or 1, so it is safe to stop a run on its width.
+
+    Args:
+        successes (int): Number of successes.
+        trials (int): Number of trials.
+        z (float, optional): Quantile of the standard normal distribution. Defaults to Z_95.
+
+    Returns:
+        tuple[float, float]: Lower and upper bound of the proportion.
+    """
+    if not trials:
+        return 0.0, 1.0
+    p = successes / trials
+    z2 = z * z
+    denominator = 1 + z2 / trials
+    center = (p + z2 / (2 * trials)) / denominator
+    half = z * sqrt(p * (1 - p) / trials + z2 / (4 * trials * trials)) / denominator
+    return max(0.0, center - half), min(1.0, center + half)
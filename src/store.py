@@ -0,0 +1,373 @@
+from game import Game
+from events import Subscriber, TurnStarted, GameEnded
+from policy import Policy
+from array import array
+from hashlib import blake2b
+from typing import Iterator, NamedTuple
+import argparse
+import json
+import os
+import time
+import numpy as np
+
+STORE_VERSION = 1
+CHUNK_ROWS = 1 << 16
+META = "meta.json"
+DRAW, PARTS, BANKRUPTCY = range(3)
+REASONS = ("draw", "parts", "bankruptcy")
+NO_POLICY = 255
+TYPECODES: dict[str, str] = {"uint8": "B", "int8": "b", "uint32": "I", "uint64": "Q", "int64": "q"}
+
+class Column(NamedTuple):
+    """Fixed-width typed column. Columns with a width hold a row of values per record,
+    one per tile of the board or one per player."""
+    dtype: str
+    width: str | None = None
+
+TABLES: dict[str, dict[str, Column]] = {
+    "games": {
+        "game": Column("uint64"),
+        "seed": Column("uint64"),
+        "layout_key": Column("uint64"),
+        "layout": Column("uint8", "size"),
+        "policies": Column("uint8", "players"),
+        "winner": Column("int8"),
+        "reason": Column("uint8"),
+        "turns": Column("uint32"),
+        "money": Column("int64", "players"),
+    },
+    "turns": {
+        "game": Column("uint64"),
+        "turn": Column("uint32"),
+        "player": Column("uint8"),
+        "money": Column("int64", "players"),
+    },
+}
+
+def layout_key(tiles: bytes) -> int:
+    """Returns a 64-bit key of a layout, equal for equal layouts, to group games by layout.
+
+    Args:
+        tiles (bytes): Codes of tiles of the layout.
+
+    Returns:
+        int: Key of the layout.
+    """
+    return int.from_bytes(blake2b(tiles, digest_size=8).digest(), "little")
+
+def create_store(path: str, size: int, players: int, policies: list[str]) -> dict[str, object]:
+    """Creates a store for games of the given board size and number of players, or opens the existing one.
+
+    Args:
+        path (str): Directory of the store.
+        size (int): Number of tiles on the board.
+        players (int): Number of players in every game.
+        policies (list[str]): Names of policies, policies of games are stored as indices into the names.
+
+    Raises:
+        ValueError: If the existing store holds games of another size or number of players, or names other policies.
+
+    Returns:
+        dict[str, object]: Metadata of the store.
+    """
+    for table in TABLES:
+        os.makedirs(os.path.join(path, table), exist_ok=True)
+    meta_path = os.path.join(path, META)
+    if not os.path.exists(meta_path):
+        temporary = f"{meta_path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as file:
+            json.dump({"version": STORE_VERSION, "size": size, "players": players, "policies": policies}, file)
+        os.replace(temporary, meta_path)
+    meta = load_meta(path)
+    if (meta["size"], meta["players"]) != (size, players):
+        raise ValueError(f"Store holds games of {meta['players']} players on {meta['size']} tiles")
+    if meta["policies"] != policies:
+        raise ValueError(f"Store names other policies: {', '.join(meta['policies'])}")  # type: ignore[arg-type]
+    return meta
+
+def load_meta(path: str) -> dict[str, object]:
+    """Loads the metadata of a store.
+
+    Args:
+        path (str): Directory of the store.
+
+    Raises:
+        ValueError: If the store was written by another version of the format.
+
+    Returns:
+        dict[str, object]: Version, board size, number of players and names of policy codes.
+    """
+    with open(os.path.join(path, META)) as file:
+        meta = json.load(file)
+    if meta.get("version") != STORE_VERSION:
+        raise ValueError(f"Unsupported store version: {meta.get('version')}")
+    return meta
+
+class StoreWriter:
+    """Appends records of games to a store in chunks of columns.
+
+    Records are buffered in typed arrays and written once CHUNK_ROWS games were added or the writer is closed.
+    Every chunk is written to a directory of its own under a temporary name and renamed when complete, so any
+    number of processes can append to the same store without locks, and readers never see a partial chunk.
+    """
+    def __init__(
+        self,
+        path: str,
+        size: int,
+        players: int,
+        policies: dict[str, type[Policy]],
+        compress: bool = False,
+        chunk_rows: int = CHUNK_ROWS
+    ) -> None:
+        create_store(path, size, players, list(policies))
+        self.path = path
+        self.codes = {policy: code for code, policy in enumerate(policies.values())}
+        self.widths = {"size": size, "players": players}
+        self.compress = compress
+        self.chunk_rows = chunk_rows
+        self.buffers: dict[str, dict[str, array]] = {}
+        self.rows = 0
+        self.chunks = 0
+        self.clear()
+
+    def clear(self) -> None:
+        """Empties the buffers."""
+        self.buffers = {
+            table: {name: array(TYPECODES[column.dtype]) for name, column in columns.items()}
+            for table, columns in TABLES.items()
+        }
+        self.rows = 0
+
+    def add_turn(self, game_id: int, turn: int, player: int, money: array) -> None:
+        """Adds the record of a finished turn.
+
+        Args:
+            game_id (int): Identifier of the game.
+            turn (int): Number of the turn, starting at 1.
+            player (int): Index of the player who took the turn.
+            money (array): Money of every player after the turn.
+        """
+        buffers = self.buffers["turns"]
+        buffers["game"].append(game_id)
+        buffers["turn"].append(turn)
+        buffers["player"].append(player)
+        buffers["money"].extend(money)
+
+    def add_game(self, game_id: int, game: Game) -> None:
+        """Adds the record of a finished game, writing a chunk if the buffers are full.
+
+        Args:
+            game_id (int): Identifier of the game, the same as of its turns.
+            game (Game): Finished game.
+        """
+        state = game.board.state
+        buffers = self.buffers["games"]
+        buffers["game"].append(game_id)
+        buffers["seed"].append(game.rng.key)
+        buffers["layout_key"].append(layout_key(state.tiles))
+        buffers["layout"].frombytes(state.tiles)
+        buffers["policies"].extend(self.codes.get(type(player.policy), NO_POLICY) for player in game.players)
+        buffers["winner"].append(game.winner.index if game.winner else -1)
+        buffers["reason"].append(DRAW if not game.winner else PARTS if game.winner.has_all_parts() else BANKRUPTCY)
+        buffers["turns"].append(game.turns_played)
+        buffers["money"].extend(state.money)
+        self.rows += 1
+        if self.rows >= self.chunk_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes buffered records as a new chunk of every table."""
+        if not self.rows:
+            return
+        name = f"{time.time_ns():x}-{os.getpid()}-{self.chunks}"
+        for table, columns in TABLES.items():
+            temporary = os.path.join(self.path, table, f".{name}.tmp")
+            os.makedirs(temporary)
+            for column_name, column in columns.items():
+                values = np.frombuffer(self.buffers[table][column_name], dtype=column.dtype)
+                if column.width:
+                    values = values.reshape(-1, self.widths[column.width])
+                if self.compress:
+                    np.savez_compressed(os.path.join(temporary, f"{column_name}.npz"), values=values)
+                else:
+                    np.save(os.path.join(temporary, f"{column_name}.npy"), values)
+            os.rename(temporary, os.path.join(self.path, table, name))
+        self.chunks += 1
+        self.clear()
+
+    def close(self) -> None:
+        """Writes the remaining records."""
+        self.flush()
+
+    def __enter__(self) -> 'StoreWriter':
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+def collector(game: Game, writer: StoreWriter) -> Subscriber:
+    """Subscriber adding every turn of the game and the game itself to a store.
+
+    Args:
+        game (Game): Game the subscriber is subscribed to.
+        writer (StoreWriter): Writer of the store.
+    """
+    game_id = int.from_bytes(os.urandom(8), "little")
+    state = game.board.state
+    player = None
+    while True:
+        event = yield
+        if isinstance(event, (TurnStarted, GameEnded)) and player is not None:
+            writer.add_turn(game_id, game.turns_played, player, state.money)
+        if isinstance(event, TurnStarted):
+            player = event.player.index
+        elif isinstance(event, GameEnded):
+            writer.add_game(game_id, game)
+            return
+
+def collect(game: Game, writer: StoreWriter) -> Game:
+    """Adds the game to a store once it ends, with a record of every turn.
+
+    Args:
+        game (Game): Game to collect, before it is played.
+        writer (StoreWriter): Writer of the store.
+
+    Returns:
+        Game: The game itself.
+    """
+    game.board.events.subscribe(collector(game, writer))
+    return game
+
+class Table:
+    """Table of a store, read chunk by chunk. Columns of uncompressed chunks are memory-mapped,
+    so only the columns a query reads are ever touched and no record becomes a Python object.
+    """
+    def __init__(self, path: str, name: str) -> None:
+        self.path = os.path.join(path, name)
+        self.columns = TABLES[name]
+        self.chunks = sorted(entry for entry in os.listdir(self.path) if not entry.startswith("."))
+
+    def load(self, chunk: str, column: str) -> np.ndarray:
+        """Loads a column of a chunk.
+
+        Args:
+            chunk (str): Name of the chunk.
+            column (str): Name of the column.
+
+        Raises:
+            KeyError: If the table has no such column.
+
+        Returns:
+            np.ndarray: Values of the column, memory-mapped unless the chunk is compressed.
+        """
+        if column not in self.columns:
+            raise KeyError(f"Unknown column: {column}")
+        path = os.path.join(self.path, chunk, column)
+        if os.path.exists(f"{path}.npy"):
+            return np.load(f"{path}.npy", mmap_mode="r")
+        with np.load(f"{path}.npz") as data:
+            return data["values"]
+
+    def scan(self, *columns: str) -> Iterator[tuple[np.ndarray, ...]]:
+        """Reads the given columns chunk by chunk.
+
+        Args:
+            *columns (str): Names of columns.
+
+        Yields:
+            tuple[np.ndarray, ...]: Values of the columns in a chunk.
+        """
+        for chunk in self.chunks:
+            yield tuple(self.load(chunk, column) for column in columns)
+
+    def read(self, *columns: str) -> tuple[np.ndarray, ...]:
+        """Reads the given columns of all chunks into single arrays.
+
+        Args:
+            *columns (str): Names of columns.
+
+        Returns:
+            tuple[np.ndarray, ...]: Values of the columns.
+        """
+        parts = list(self.scan(*columns))
+        if not parts:
+            return tuple(np.empty(0, dtype=self.columns[column].dtype) for column in columns)
+        return tuple(np.concatenate(values) for values in zip(*parts))
+
+    def __len__(self) -> int:
+        first = next(iter(self.columns))
+        return sum(len(values) for values, in self.scan(first))
+
+class Store:
+    """Store of games written by StoreWriter, with a games and a turns table."""
+    def __init__(self, path: str) -> None:
+        meta = load_meta(path)
+        self.path = path
+        self.size = int(meta["size"])  # type: ignore[arg-type]
+        self.players = int(meta["players"])  # type: ignore[arg-type]
+        self.policies: list[str] = list(meta["policies"])  # type: ignore[call-overload]
+        self.games = Table(path, "games")
+        self.turns = Table(path, "turns")
+
+def win_rate_by_layout(store: Store, seat: int = 0) -> dict[int, tuple[int, float]]:
+    """Returns the win rate of a seat on every layout, the first mover by default. Reads two columns.
+
+    Args:
+        store (Store): Store to query.
+        seat (int, optional): Index of the seat. Defaults to 0.
+
+    Returns:
+        dict[int, tuple[int, float]]: Number of games and win rate of the seat by layout key.
+    """
+    games: dict[int, int] = {}
+    wins: dict[int, int] = {}
+    for keys, winners in store.games.scan("layout_key", "winner"):
+        unique, inverse = np.unique(keys, return_inverse=True)
+        counts = np.bincount(inverse, minlength=unique.size)
+        won = np.bincount(inverse, weights=winners == seat, minlength=unique.size)
+        for key, count, win in zip(unique.tolist(), counts.tolist(), won.tolist()):
+            games[key] = games.get(key, 0) + count
+            wins[key] = wins.get(key, 0) + int(win)
+    return {key: (count, wins[key] / count) for key, count in games.items()}
+
+def outcomes(store: Store) -> dict[str, float]:
+    """Returns the share of games won by every seat, ended by every reason, and the average number of turns.
+
+    Args:
+        store (Store): Store to query.
+
+    Returns:
+        dict[str, float]: Shares of outcomes and average turns.
+    """
+    total = turns = 0
+    winners = np.zeros(store.players + 1, dtype=np.int64)
+    reasons = np.zeros(len(REASONS), dtype=np.int64)
+    for winner, reason, length in store.games.scan("winner", "reason", "turns"):
+        total += len(winner)
+        turns += int(length.sum(dtype=np.int64))
+        winners += np.bincount(winner.astype(np.int64) + 1, minlength=store.players + 1)
+        reasons += np.bincount(reason, minlength=len(REASONS))
+    games = max(total, 1)
+    return {
+        "games": total,
+        **{f"P{seat} wins": int(winners[seat]) / games for seat in range(1, store.players + 1)},
+        **{reason: int(count) / games for reason, count in zip(REASONS, reasons)},
+        "avg turns": turns / games,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Queries a columnar store of simulated Gigapoly games.")
+    parser.add_argument("path", help="directory of the store")
+    parser.add_argument("--by-layout", action="store_true", help="print the win rate of the first mover on every layout")
+    parser.add_argument("--seat", type=int, default=0, help="seat whose win rate is printed by layout")
+    args = parser.parse_args()
+    store = Store(args.path)
+    if args.by_layout:
+        for key, (games, rate) in sorted(win_rate_by_layout(store, args.seat).items(), key=lambda item: -item[1][1]):
+            print(f"{key:016x} | games: {games} | P{args.seat + 1} wins: {rate:.2%}")
+        return
+    for name, value in outcomes(store).items():
+        print(f"{name}: {value:.2%}" if isinstance(value, float) and name != "avg turns" else f"{name}: {value:g}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+from board import BOARD_SIZE
+from rules import DEFAULT_RULES, Rules
+from tournament import POLICIES, MatchupResult, play_shard
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+from random import Random
+from typing import Sequence
+import argparse
+import hashlib
+import json
+import os
+
+CACHE_VERSION = 1
+SORT_KEYS = ("none", "imbalance", "turns", "draws")
+
+def parse_space(specs: list[str]) -> dict[str, Sequence[int]]:
+    """Parses the values of parameters to sweep, given as name=1,2,3 or name=low:high[:step] for an inclusive range.
+
+    Args:
+        specs (list[str]): Specifications of parameters, one per parameter.
+
+    Raises:
+        ValueError: If a specification is malformed or names no field of Rules.
+
+    Returns:
+        dict[str, Sequence[int]]: Values of every parameter.
+    """
+    space: dict[str, Sequence[int]] = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if name not in Rules._fields:
+            raise ValueError(f"Unknown rule: {name}")
+        if ":" in values:
+            low, high, *step = (int(value) for value in values.split(":"))
+            space[name] = range(low, high + 1, step[0] if step else 1)
+        else:
+            space[name] = [int(value) for value in values.split(",")]
+        if not space[name]:
+            raise ValueError(f"No values of {name}")
+    return space
+
+def grid(space: dict[str, Sequence[int]], base: Rules = DEFAULT_RULES) -> list[Rules]:
+    """Returns every combination of values of the parameters.
+
+    Args:
+        space (dict[str, Sequence[int]]): Values of every parameter.
+        base (Rules, optional): Rules taken for parameters not swept. Defaults to DEFAULT_RULES.
+
+    Returns:
+        list[Rules]: Rules of every point of the grid.
+    """
+    names = list(space)
+    return [Rules.from_dict({**base._asdict(), **dict(zip(names, values))}) for values in product(*space.values())]
+
+def random_search(space: dict[str, Sequence[int]], n_points: int, seed: int = 0, base: Rules = DEFAULT_RULES) -> list[Rules]:
+    """Draws points uniformly from the values of every parameter. Duplicate points are dropped.
+
+    Args:
+        space (dict[str, Sequence[int]]): Values of every parameter.
+        n_points (int): Number of points to draw.
+        seed (int, optional): Seed of the draws. Defaults to 0.
+        base (Rules, optional): Rules taken for parameters not swept. Defaults to DEFAULT_RULES.
+
+    Returns:
+        list[Rules]: Rules of every drawn point, in order of drawing.
+    """
+    rng = Random(seed)
+    points = (
+        Rules.from_dict({**base._asdict(), **{name: rng.choice(values) for name, values in space.items()}})
+        for _ in range(n_points)
+    )
+    return list(dict.fromkeys(points))
+
+def cache_key(rules: Rules, policies: tuple[str, ...], n_games: int, seed: int, max_turns: int, size: int) -> str:
+    """Returns the key of the results of a point, identical for identical games.
+
+    Args:
+        rules (Rules): Rules of the point.
+        policies (tuple[str, ...]): Names of policies of all seats.
+        n_games (int): Number of games.
+        seed (int): Seed of the first game.
+        max_turns (int): Maximum number of turns of every game.
+        size (int): Number of tiles on the board.
+
+    Returns:
+        str: Hexadecimal digest of the parameters.
+    """
+    data = json.dumps({
+        "version": CACHE_VERSION,
+        "rules": rules._asdict(),
+        "policies": list(policies),
+        "games": n_games,
+        "seed": seed,
+        "max_turns": max_turns,
+        "size": size,
+    }, sort_keys=True)
+    return hashlib.sha256(data.encode()).hexdigest()[:32]
+
+def load_cached(cache: str | None, key: str) -> MatchupResult | None:
+    """Loads results of a point from the cache.
+
+    Args:
+        cache (str | None): Directory of the cache, None for no cache.
+        key (str): Key of the point, see cache_key.
+
+    Returns:
+        MatchupResult | None: Cached results, None if the point was not evaluated yet.
+    """
+    if not cache:
+        return None
+    try:
+        with open(os.path.join(cache, f"{key}.json")) as file:
+            return MatchupResult.from_dict(json.load(file)["result"])
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        return None
+
+def save_cached(cache: str, key: str, rules: Rules, result: MatchupResult) -> None:
+    """Saves results of a point to the cache. The file is replaced atomically, so sweeps running at the same time
+    and sweeps stopped halfway never leave a partial entry.
+
+    Args:
+        cache (str): Directory of the cache.
+        key (str): Key of the point, see cache_key.
+        rules (Rules): Rules of the point.
+        result (MatchupResult): Results of the point.
+    """
+    os.makedirs(cache, exist_ok=True)
+    path = os.path.join(cache, f"{key}.json")
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w") as file:
+        json.dump({"rules": rules._asdict(), "result": result.to_dict()}, file)
+    os.replace(temporary, path)
+
+def imbalance(result: MatchupResult) -> float:
+    """Returns the difference between the win rates of the best and the worst seat.
+
+    Args:
+        result (MatchupResult): Results of a point.
+
+    Returns:
+        float: Difference of win rates, 0 for perfectly fair rules.
+    """
+    games = max(result.games, 1)
+    return (max(result.wins) - min(result.wins)) / games
+
+def run_sweep(
+    points: list[Rules],
+    policies: tuple[str, ...],
+    n_games: int,
+    seed: int = 0,
+    max_turns: int = 1000,
+    size: int = BOARD_SIZE,
+    workers: int | None = None,
+    cache: str | None = None
+) -> list[tuple[Rules, MatchupResult]]:
+    """Plays the same games under the rules of every point using a pool of processes.
+
+    Game i of every point is played with seed `seed + i`, so points are compared on the same boards, decks and dice.
+    Points found in the cache are not played again, and every point is saved to the cache as soon as all its
+    games are played, so an interrupted sweep resumes where it stopped and overlapping sweeps share their points.
+
+    Args:
+        points (list[Rules]): Rules to evaluate.
+        policies (tuple[str, ...]): Names of policies of all seats.
+        n_games (int): Number of games of every point.
+        seed (int, optional): Seed of the first game. Defaults to 0.
+        max_turns (int, optional): Maximum number of turns of every game. Defaults to 1000.
+        size (int, optional): Number of tiles on the board. Defaults to BOARD_SIZE.
+        workers (int | None, optional): Number of worker processes. Defaults to number of CPUs.
+        cache (str | None, optional): Directory caching results of points. Defaults to None.
+
+    Returns:
+        list[tuple[Rules, MatchupResult]]: Rules and results of every point, in the order of points.
+    """
+    workers = workers if workers else os.cpu_count() or 1
+    keys = [cache_key(rules, policies, n_games, seed, max_turns, size) for rules in points]
+    results: dict[str, MatchupResult] = {}
+    for key in keys:
+        cached = load_cached(cache, key)
+        if cached:
+            results[key] = cached
+    missing = {key: rules for key, rules in zip(keys, points) if key not in results}
+    if missing:
+        shard_size = max(1, min(n_games, -(-n_games * len(missing) // (workers * 4))))
+        shards: dict[str, dict[int, MatchupResult]] = {key: {} for key in missing}
+        n_shards = len(range(seed, seed + n_games, shard_size))
+        with ProcessPoolExecutor(workers) as executor:
+            futures = {
+                executor.submit(play_shard, policies, first_seed, min(shard_size, seed + n_games - first_seed), max_turns, size, None, rules): (key, first_seed)
+                for key, rules in missing.items()
+                for first_seed in range(seed, seed + n_games, shard_size)
+            }
+            for future in as_completed(futures):
+                key, first_seed = futures[future]
+                shards[key][first_seed] = future.result()
+                if len(shards[key]) < n_shards:
+                    continue
+                result = MatchupResult(policies)
+                for _, shard in sorted(shards.pop(key).items()):
+                    result.merge(shard)
+                results[key] = result
+                if cache:
+                    save_cached(cache, key, missing[key], result)
+    return [(rules, results[key]) for key, rules in zip(keys, points)]
+
+def format_point(rules: Rules, result: MatchupResult, base: Rules = DEFAULT_RULES) -> str:
+    """Formats the results of a point as a line of text, naming only the rules which differ from the base.
+
+    Args:
+        rules (Rules): Rules of the point.
+        result (MatchupResult): Results of the point.
+        base (Rules, optional): Rules the point is compared with. Defaults to DEFAULT_RULES.
+
+    Returns:
+        str: Description of the point.
+    """
+    changed = " ".join(f"{name}={value}" for name, value, default in zip(Rules._fields, rules, base) if value != default)
+    games = max(result.games, 1)
+    wins = " ".join(f"P{index + 1} {wins / games:.2%}" for index, wins in enumerate(result.wins))
+    return (
+        f"{changed or 'default rules':<48} | wins: {wins} | draws: {result.draws / games:.2%} | "
+        f"imbalance: {imbalance(result):.2%} | avg turns: {result.turns.mean:.1f}"
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Plays games under a grid or a random sample of rules to balance the economy of Gigapoly.")
+    parser.add_argument("params", nargs="+", help=f"rules to sweep as name=1,2,3 or name=low:high[:step], names: {', '.join(Rules._fields)}")
+    parser.add_argument("--random", type=int, default=None, help="evaluate this many random points instead of the whole grid")
+    parser.add_argument("--policies", nargs="+", choices=POLICIES, default=["greedy", "greedy"], help="policies of all seats")
+    parser.add_argument("--games", type=int, default=200, help="number of games of every point")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game, and of the random points")
+    parser.add_argument("--max-turns", type=int, default=1000, help="turn limit after which a game is a draw")
+    parser.add_argument("--size", type=int, default=BOARD_SIZE, help="number of tiles on the board")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--cache", default=".sweep-cache", help="directory caching results of points, empty to disable")
+    parser.add_argument("--sort", choices=SORT_KEYS, default="none", help="order of the printed points")
+    args = parser.parse_args()
+    try:
+        space = parse_space(args.params)
+        points = random_search(space, args.random, args.seed) if args.random else grid(space)
+    except ValueError as error:
+        parser.error(str(error))
+    results = run_sweep(points, tuple(args.policies), args.games, args.seed, args.max_turns, args.size, args.workers, args.cache or None)
+    if args.sort == "imbalance":
+        results.sort(key=lambda item: imbalance(item[1]))
+    elif args.sort == "turns":
+        results.sort(key=lambda item: item[1].turns.mean)
+    elif args.sort == "draws":
+        results.sort(key=lambda item: item[1].draws / max(item[1].games, 1))
+    for rules, result in results:
+        print(format_point(rules, result))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+from game import Game, MAX_PLAYERS
+from board import BOARD_SIZE
+from policy import Policy, GreedyPolicy, RandomPolicy
+from mcts import MCTSPolicy
+from solver import SolverPolicy
+from replay import record
+from store import StoreWriter, collect
+from rules import Rules
+from stats import RunningStats, Z_95, wilson_interval
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from itertools import product
+from statistics import NormalDist
+from typing import Any
+import argparse
+import os
+
+POLICIES: dict[str, type[Policy]] = {
+    "greedy": GreedyPolicy,
+    "random": RandomPolicy,
+    "mcts": MCTSPolicy,
+    "solver": SolverPolicy,
+}
+MCTS_SIMULATIONS = 50  # about the work of the default time budget, see MCTSPolicy
+STOP_SHARD = 50
+MIN_GAMES = 200
+
+class MatchupResult:
+    """Aggregated results of games played between policies, one per seat.
+
+    Holds only counters and running estimators, so results of any number of games take constant memory
+    and are cheap to send between processes and to merge.
+
+    Attributes:
+        policies (tuple[str, ...]): Names of policies of all seats.
+        games (int): Number of games played.
+        wins (list[int]): Games won by every seat.
+        completions (list[int]): Games won by every seat by collecting all parts, the rest were won by bankruptcy.
+        draws (int): Games which reached the turn limit.
+        turns (RunningStats): Length of games in turns.
+        money (list[RunningStats]): Money of every seat at the end of games.
+    """
+    def __init__(self, policies: tuple[str, ...]) -> None:
+        self.policies = policies
+        self.games = 0
+        self.wins = [0] * len(policies)
+        self.completions = [0] * len(policies)
+        self.draws = 0
+        self.turns = RunningStats()
+        self.money = [RunningStats() for _ in policies]
+
+    def add(self, game: Game) -> None:
+        """Adds the result of a finished game.
+
+        Args:
+            game (Game): Finished game.
+        """
+        self.games += 1
+        self.turns.add(game.turns_played)
+        for player in game.players:
+            self.money[player.index].add(player.money)
+        if game.winner:
+            self.wins[game.winner.index] += 1
+            if game.winner.has_all_parts():
+                self.completions[game.winner.index] += 1
+        else:
+            self.draws += 1
+
+    def merge(self, other: 'MatchupResult') -> None:
+        """Adds results aggregated by another shard of the same matchup.
+
+        Args:
+            other (MatchupResult): Results to add.
+        """
+        self.games += other.games
+        self.wins = [wins + other_wins for wins, other_wins in zip(self.wins, other.wins)]
+        self.completions = [completions + other_completions for completions, other_completions in zip(self.completions, other.completions)]
+        self.draws += other.draws
+        self.turns.merge(other.turns)
+        for money, other_money in zip(self.money, other.money):
+            money.merge(other_money)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Returns the results as plain data.
+
+        Returns:
+            dict[str, Any]: Counters and estimators of the results.
+        """
+        return {
+            "policies": list(self.policies),
+            "games": self.games,
+            "wins": self.wins,
+            "completions": self.completions,
+            "draws": self.draws,
+            "turns": self.turns.to_dict(),
+            "money": [money.to_dict() for money in self.money],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> 'MatchupResult':
+        """Creates results from plain data returned by to_dict.
+
+        Args:
+            data (dict[str, Any]): Counters and estimators of the results.
+
+        Returns:
+            MatchupResult: Results.
+        """
+        result = cls(tuple(data["policies"]))
+        result.games = data["games"]
+        result.wins = list(data["wins"])
+        result.completions = list(data["completions"])
+        result.draws = data["draws"]
+        result.turns = RunningStats.from_dict(data["turns"])
+        result.money = [RunningStats.from_dict(money) for money in data["money"]]
+        return result
+
+    def win_interval(self, seat: int, z: float = Z_95) -> tuple[float, float]:
+        """Returns the confidence interval of the win rate of a seat.
+
+        Args:
+            seat (int): Index of the seat.
+            z (float, optional): Quantile of the standard normal distribution. Defaults to Z_95.
+
+        Returns:
+            tuple[float, float]: Lower and upper bound of the win rate.
+        """
+        return wilson_interval(self.wins[seat], self.games, z)
+
+    def converged(self, width: float, z: float = Z_95) -> bool:
+        """Checks if the confidence intervals of win rates of all seats are narrower than the given width.
+
+        Args:
+            width (float): Requested width of the intervals.
+            z (float, optional): Quantile of the standard normal distribution. Defaults to Z_95.
+
+        Returns:
+            bool: True if all win rates are known precisely enough.
+        """
+        for seat in range(len(self.policies)):
+            low, high = self.win_interval(seat, z)
+            if high - low > width:
+                return False
+        return True
+
+    def __str__(self) -> str:
+        games = max(self.games, 1)
+        seats = " vs ".join(f"P{index + 1} {policy:<8}" for index, policy in enumerate(self.policies))
+        wins: list[str] = []
+        for index, count in enumerate(self.wins):
+            low, high = self.win_interval(index)
+            wins.append(f"P{index + 1} wins: {count / games:.2%} [{low:.2%}, {high:.2%}]")
+        low, high = self.turns.interval()
+        turns = f"avg turns: {self.turns.mean:.1f} [{low:.1f}, {high:.1f}]" if self.games > 1 else f"avg turns: {self.turns.mean:.1f}"
+        completions = " ".join(f"P{index + 1} {completions / games:.2%}" for index, completions in enumerate(self.completions))
+        bankruptcies = " ".join(
+            f"P{index + 1} {(wins - completions) / games:.2%}" for index, (wins, completions) in enumerate(zip(self.wins, self.completions))
+        )
+        money = " ".join(
+            f"P{index + 1} {stats.mean:.0f} ± {stats.stdev:.0f}" for index, stats in enumerate(self.money)
+        )
+        return (
+            f"{seats} | games: {self.games} | {' | '.join(wins)} | draws: {self.draws / games:.2%} | {turns}\n"
+            f"    won with all parts: {completions} | won by bankruptcy: {bankruptcies} | final money: {money}"
+        )
+
+def create_policy(name: str, seed: int | None = None, seat: int = 0) -> Policy:
+    """Creates the policy of a seat. Tree search runs a fixed number of simulations seeded from the seed of the game
+    and the seat instead of a time budget, so games with searching seats replay from their seed as well.
+
+    Args:
+        name (str): Name of the policy, see POLICIES.
+        seed (int | None, optional): Seed of the game. Defaults to None.
+        seat (int, optional): Index of the seat. Defaults to 0.
+
+    Returns:
+        Policy: Policy of the seat.
+    """
+    if POLICIES[name] is MCTSPolicy:
+        return MCTSPolicy(simulations=MCTS_SIMULATIONS, seed=None if seed is None else seed * MAX_PLAYERS + seat)
+    return POLICIES[name]()
+
+def play_game(
+    policies: tuple[str, ...],
+    seed: int,
+    max_turns: int,
+    size: int = BOARD_SIZE,
+    replays: str | None = None,
+    rules: Rules | None = None,
+    store: StoreWriter | None = None
+) -> Game:
+    """Plays a single headless game. The same seed and policies always replay the same game.
+
+    Args:
+        policies (tuple[str, ...]): Names of policies of all players.
+        seed (int): Seed of the game.
+        max_turns (int): Maximum number of turns.
+        size (int, optional): Number of tiles on the board. Defaults to BOARD_SIZE.
+        replays (str | None, optional): Path of a replay log to record the game into. Defaults to None.
+        rules (Rules | None, optional): Rules of the game. Defaults to the default rules.
+        store (StoreWriter | None, optional): Writer of a results store to add the game to. Defaults to None.
+
+    Returns:
+        Game: Finished game.
+    """
+    game = Game([create_policy(name, seed, seat) for seat, name in enumerate(policies)], max_turns=max_turns, seed=seed, size=size, rules=rules)
+    if replays:
+        record(game, replays)
+    if store:
+        collect(game, store)
+    game.mainloop()
+    return game
+
+def play_shard(
+    policies: tuple[str, ...],
+    first_seed: int,
+    n_games: int,
+    max_turns: int,
+    size: int = BOARD_SIZE,
+    replays: str | None = None,
+    rules: Rules | None = None,
+    store: str | None = None
+) -> MatchupResult:
+    """Plays a shard of consecutive seeds of a matchup. Runs in a worker process.
+
+    Args:
+        policies (tuple[str, ...]): Names of policies of all players.
+        first_seed (int): Seed of the first game of the shard.
+        n_games (int): Number of games in the shard.
+        max_turns (int): Maximum number of turns of every game.
+        size (int, optional): Number of tiles on the board. Defaults to BOARD_SIZE.
+        replays (str | None, optional): Path of a replay log to record games into. Defaults to None.
+        rules (Rules | None, optional): Rules of the games. Defaults to the default rules.
+        store (str | None, optional): Directory of a results store to add games to, as a chunk of the shard. Defaults to None.
+
+    Returns:
+        MatchupResult: Aggregated results of the shard.
+    """
+    result = MatchupResult(policies)
+    writer = StoreWriter(store, size, len(policies), POLICIES) if store else None
+    for seed in range(first_seed, first_seed + n_games):
+        result.add(play_game(policies, seed, max_turns, size, replays, rules, writer))
+    if writer:
+        writer.close()
+    return result
+
+def run_tournament(
+    policies: list[str],
+    n_games: int,
+    seed: int = 0,
+    max_turns: int = 1000,
+    workers: int | None = None,
+    size: int = BOARD_SIZE,
+    players: int = 2,
+    width: float | None = None,
+    z: float = Z_95,
+    min_games: int = MIN_GAMES,
+    replays: str | None = None,
+    store: str | None = None
+) -> dict[tuple[str, ...], MatchupResult]:
+    """Plays every seating of policies against each other using a pool of processes.
+
+    Game i of every matchup is played with seed `seed + i`, so all matchups are compared on the same
+    boards, decks and dice, and any game can be replayed alone with play_game.
+
+    With a width, n_games is only the upper bound of games of a matchup: a matchup stops as soon as the confidence
+    intervals of win rates of all seats are narrower than the width. Shards are submitted lazily and merged
+    in the order of their seeds, STOP_SHARD games each, so a stopped matchup always covers the same consecutive
+    seeds regardless of the number of workers and the order in which shards finish.
+
+    Args:
+        policies (list[str]): Names of policies taking part in the tournament.
+        n_games (int): Number of games of every matchup, maximum number of games if a width is given.
+        seed (int, optional): Seed of the first game. Defaults to 0.
+        max_turns (int, optional): Maximum number of turns of every game. Defaults to 1000.
+        workers (int | None, optional): Number of worker processes. Defaults to number of CPUs.
+        size (int, optional): Number of tiles on the board. Defaults to BOARD_SIZE.
+        players (int, optional): Number of players in every game. Defaults to 2.
+        width (float | None, optional): Width of win rate intervals to stop at. Defaults to None, playing all games.
+        z (float, optional): Quantile of the standard normal distribution of the intervals. Defaults to Z_95.
+        min_games (int, optional): Number of games played before a matchup may stop. Defaults to MIN_GAMES.
+        replays (str | None, optional): Path of a replay log all workers record games into. Defaults to None.
+        store (str | None, optional): Directory of a results store all workers add games to. Defaults to None.
+
+    Returns:
+        dict[tuple[str, ...], MatchupResult]: Results of every matchup.
+    """
+    workers = workers if workers else os.cpu_count() or 1
+    shard_size = STOP_SHARD if width else max(1, -(-n_games // (workers * 4)))
+    matchups = list(product(policies, repeat=players))
+    results = {matchup: MatchupResult(matchup) for matchup in matchups}
+    queued = {matchup: deque(range(seed, seed + n_games, shard_size)) for matchup in matchups}
+    finished: dict[tuple[str, ...], dict[int, MatchupResult]] = {matchup: {} for matchup in matchups}
+    merged = {matchup: seed for matchup in matchups}
+    stopped: set[tuple[str, ...]] = set()
+    capacity = workers * 2 if width else sum(map(len, queued.values()))
+    with ProcessPoolExecutor(workers) as executor:
+        running: dict[Future[MatchupResult], tuple[tuple[str, ...], int]] = {}
+
+        def fill() -> None:
+            while len(running) < capacity and any(queued.values()):
+                for matchup in matchups:
+                    if queued[matchup] and len(running) < capacity:
+                        first_seed = queued[matchup].popleft()
+                        future = executor.submit(
+                            play_shard, matchup, first_seed, min(shard_size, seed + n_games - first_seed), max_turns, size, replays, None, store
+                        )
+                        running[future] = (matchup, first_seed)
+
+        def stop(matchup: tuple[str, ...]) -> None:
+            stopped.add(matchup)
+            queued[matchup].clear()
+            finished[matchup].clear()
+            for future, (other, _) in list(running.items()):
+                if other == matchup and future.cancel():
+                    del running[future]
+
+        fill()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                matchup, first_seed = running.pop(future)
+                if matchup in stopped:
+                    continue
+                finished[matchup][first_seed] = future.result()
+                result = results[matchup]
+                while merged[matchup] in finished[matchup]:
+                    shard = finished[matchup].pop(merged[matchup])
+                    result.merge(shard)
+                    merged[matchup] += shard.games
+                    if width and result.games >= min_games and result.converged(width, z):
+                        stop(matchup)
+                        break
+            fill()
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Plays headless Gigapoly games between policies on all CPU cores.")
+    parser.add_argument("--policies", nargs="+", choices=POLICIES, default=["greedy", "random"], help="policies taking part")
+    parser.add_argument("--games", type=int, default=1000, help="number of games of every matchup")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--max-turns", type=int, default=1000, help="turn limit after which a game is a draw")
+    parser.add_argument("--players", type=int, default=2, help="number of players in every game")
+    parser.add_argument("--size", type=int, default=BOARD_SIZE, help="number of tiles on the board")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--width", type=float, default=None, help="stop a matchup once win rate intervals are narrower than this, --games is then the maximum")
+    parser.add_argument("--confidence", type=float, default=0.95, help="confidence level of the intervals")
+    parser.add_argument("--min-games", type=int, default=MIN_GAMES, help="number of games played before a matchup may stop")
+    parser.add_argument("--record", default=None, help="append all games to this replay log")
+    parser.add_argument("--store", default=None, help="add all games and their turns to the results store in this directory")
+    parser.add_argument("--game", type=int, default=None, help="replay the single game with this seed, seating policies in the given order")
+    args = parser.parse_args()
+    if args.game is not None:
+        matchup = tuple(args.policies[min(index, len(args.policies) - 1)] for index in range(args.players))
+        writer = StoreWriter(args.store, args.size, len(matchup), POLICIES) if args.store else None
+        game = play_game(matchup, args.game, args.max_turns, args.size, args.record, None, writer)
+        if writer:
+            writer.close()
+        print(f"seed {args.game}: {game.winner.name if game.winner else 'draw'} after {game.turns_played} turns")
+        return
+    z = NormalDist().inv_cdf((1 + args.confidence) / 2)
+    results = run_tournament(
+        args.policies, args.games, args.seed, args.max_turns, args.workers, args.size, args.players, args.width, z, args.min_games, args.record, args.store
+    )
+    for result in results.values():
+        print(result)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+from misc import (
+    SPECIAL_TILE,
+    COMPONENT_TILE,
+    TILE,
+    EFFECT
+)
+from cards import Cards
+from events import Rolled, RentPaid, Bought, Declined, CardDrawn, CardApplied
+from collections import deque
+from enum import IntEnum
+from functools import partial
+from typing import Any, Callable, NamedTuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from board import Board
+    from player import Player
+
+class ACTION(IntEnum):
+    ROLL = 0
+    LAND = 1
+    BUY = 2
+    CHANCE = 3
+    RISK = 4
+    TRAVEL = 5
+    NOTHING = 6
+
+class DECISION(IntEnum):
+    ACKNOWLEDGE = 0
+    BUY = 1
+    TRAVEL = 2
+
+ROLL_MESSAGE = "Roll the dice"
+
+TILE_ACTIONS: dict[TILE, ACTION] = {
+    SPECIAL_TILE.START: ACTION.NOTHING,
+    SPECIAL_TILE.CHANCE: ACTION.CHANCE,
+    SPECIAL_TILE.RISK: ACTION.RISK,
+    SPECIAL_TILE.TRAVEL: ACTION.TRAVEL,
+    **{tile: ACTION.BUY for tile in COMPONENT_TILE},
+}
+
+class Decision(NamedTuple):
+    kind: DECISION
+    player: 'Player'
+    dice_roll: int | None
+    tile: TILE | None = None
+    effect: EFFECT | None = None
+    message: str = ""
+
+class TurnResolver:
+    """Resolves turns of players as an explicit state machine.
+
+    Pending actions wait on a work queue and are dispatched through a table of handlers, so follow-up
+    landings caused by cards or travelling are queued instead of resolved recursively. Whenever a player has to
+    take a decision the machine stops and returns it from advance, and continues once the answer is passed to resolve.
+    This lets the same machine be driven synchronously by policies or by anything able to answer later.
+    """
+    def __init__(self, board: 'Board') -> None:
+        self.board = board
+        self.queue: deque[tuple[ACTION, 'Player', int | None]] = deque()
+        self.pending: Decision | None = None
+        self.after: Callable[[Decision, Any], None] | None = None
+        self.handlers: dict[ACTION, Callable[['Player', int | None], None]] = {
+            ACTION.ROLL: self.roll,
+            ACTION.LAND: self.land,
+            ACTION.BUY: self.handle_buying,
+            ACTION.CHANCE: partial(self.draw_card, board.chance_cards),
+            ACTION.RISK: partial(self.draw_card, board.risk_cards),
+            ACTION.TRAVEL: self.travel,
+            ACTION.NOTHING: self.nothing,
+        }
+
+    def push(self, action: ACTION, player: 'Player', dice_roll: int | None = None) -> None:
+        """Queues an action to resolve.
+
+        Args:
+            action (ACTION): Action to resolve.
+            player (Player): Player taking the action.
+            dice_roll (int | None, optional): The value of the dice roll, if applicable. Defaults to None.
+        """
+        self.queue.append((action, player, dice_roll))
+
+    def advance(self) -> Decision | None:
+        """Resolves queued actions until a player has to take a decision or the queue is empty.
+
+        Returns:
+            Decision | None: Decision the player has to take, None if everything is resolved.
+        """
+        while self.pending is None and self.queue:
+            action, player, dice_roll = self.queue.popleft()
+            self.handlers[action](player, dice_roll)
+        return self.pending
+
+    def resolve(self, answer: Any) -> None:
+        """Continues the machine with the answer to the pending decision.
+
+        Args:
+            answer (Any): Answer to the decision returned by advance.
+        """
+        decision, after = self.pending, self.after
+        self.pending = None
+        self.after = None
+        if decision and after:
+            after(decision, answer)
+
+    def run(self) -> None:
+        """Resolves all queued actions, asking policies of players for every decision.
+        """
+        while decision := self.advance():
+            self.resolve(decision.player.policy.decide(self.board, decision))
+
+    def ask(self, decision: Decision, after: Callable[[Decision, Any], None]) -> None:
+        """Suspends the machine until the decision is answered.
+
+        Args:
+            decision (Decision): Decision the player has to take.
+            after (Callable[[Decision, Any], None]): Continuation called with the decision and its answer.
+        """
+        self.pending = decision
+        self.after = after
+
+    def roll(self, player: 'Player', dice_roll: int | None) -> None:
+        """Presents the board and asks the player to roll the dice.
+        """
+        self.board.view.show(self.board, player, None)
+        self.ask(Decision(DECISION.ACKNOWLEDGE, player, None, message=ROLL_MESSAGE), self.rolled)
+
+    def rolled(self, decision: Decision, answer: Any) -> None:
+        """Rolls the dice and moves the player, then lands on the reached tile.
+        """
+        dice_roll = self.board.rng.roll()
+        if self.board.events:
+            self.board.events.emit(Rolled(decision.player, dice_roll))
+        self.board.move_player(decision.player, dice_roll)
+        self.board.view.show(self.board, decision.player, dice_roll)
+        self.push(ACTION.LAND, decision.player, dice_roll)
+
+    def land(self, player: 'Player', dice_roll: int | None) -> None:
+        """Dispatches the action of the tile the player stands on.
+        """
+        self.handlers[TILE_ACTIONS[self.board.tiles[player.position]]](player, dice_roll)
+
+    def nothing(self, player: 'Player', dice_roll: int | None) -> None:
+        """Resolves tiles without any action.
+        """
+        pass
+
+    def handle_buying(self, player: 'Player', dice_roll: int | None) -> None:
+        """Pays rent to the owner of the tile, or offers the unowned tile to the player if affordable.
+        """
+        tile = self.board.tiles[player.position]
+        owner = self.board.owners[player.position]
+        price = self.board.prices[tile]
+        if owner:
+            if owner != player:
+                player.money -= price
+                owner.money += price
+                if self.board.events:
+                    self.board.events.emit(RentPaid(player, owner, tile, price))
+        elif player.money >= price:
+            self.ask(Decision(DECISION.BUY, player, dice_roll, tile), self.bought)
+
+    def bought(self, decision: Decision, answer: Any) -> None:
+        """Transfers ownership of the tile if the player agreed to buy it.
+        """
+        if answer and decision.tile:
+            player = decision.player
+            price = self.board.prices[decision.tile]
+            self.board.owners[player.position] = player
+            player.money -= price
+            player.add_owned_part(decision.tile)
+            if self.board.events:
+                self.board.events.emit(Bought(player, decision.tile, price))
+        elif decision.tile and self.board.events:
+            self.board.events.emit(Declined(decision.player, decision.tile))
+
+    def draw_card(self, cards: Cards, player: 'Player', dice_roll: int | None) -> None:
+        """Draws a card from the deck and lets the player acknowledge its effect.
+        """
+        effect = cards.use_card()
+        if self.board.events:
+            self.board.events.emit(CardDrawn(player, effect))
+        self.ask(Decision(DECISION.ACKNOWLEDGE, player, dice_roll, effect=effect, message=self.board.card_effects[effect].message), self.apply_effect)
+
+    def apply_effect(self, decision: Decision, answer: Any) -> None:
+        """Applies the effect of the drawn card, moving the player and landing again if the card says so.
+        """
+        if decision.effect is None:
+            return
+        effect = self.board.card_effects[decision.effect]
+        player = decision.player
+        player.money += effect.money
+        if self.board.events:
+            self.board.events.emit(CardApplied(player, decision.effect, effect.money))
+        if effect.steps:
+            self.board.move_player(player, effect.steps)
+            self.board.view.show(self.board, player, None)
+            self.push(ACTION.LAND, player)
+        elif effect.roll:
+            dice_roll = self.board.rng.roll()
+            if self.board.events:
+                self.board.events.emit(Rolled(player, dice_roll))
+            self.board.move_player(player, dice_roll)
+            self.board.view.show(self.board, player, dice_roll)
+            self.push(ACTION.LAND, player, dice_roll)
+
+    def travel(self, player: 'Player', dice_roll: int | None) -> None:
+        """Asks the player for the tile to travel to.
+        """
+        self.ask(Decision(DECISION.TRAVEL, player, dice_roll), self.travelled)
+
+    def travelled(self, decision: Decision, answer: Any) -> None:
+        """Moves the player to the chosen tile, then lands on it.
+        """
+        self.board.move_player_to_position(decision.player, answer)
+        self.board.view.show(self.board, decision.player, decision.dice_roll)
+        self.push(ACTION.LAND, decision.player, decision.dice_roll)
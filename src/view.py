@@ -0,0 +1,63 @@
+from renderer import Renderer
+from typing import TextIO, TYPE_CHECKING
+import sys
+
+if TYPE_CHECKING:
+    from board import Board
+    from player import Player
+
+class View:
+    """Headless view of the game. Ignores every state change, so the game runs without any terminal I/O.
+    """
+    def show(self, board: 'Board', current_player: 'Player', dice_roll: int | None) -> None:
+        """Presents the current state of the game.
+
+        Args:
+            board (Board): Board the game is played on.
+            current_player (Player): Player whose turn it currently is.
+            dice_roll (int | None): The value of the last dice roll, if applicable.
+        """
+        pass
+
+    def notify(self, message: str) -> None:
+        """Presents a message about the outcome of the game.
+
+        Args:
+            message (str): Message to present.
+        """
+        pass
+
+class ConsoleView(View):
+    """View drawing the board to the console after every state change.
+
+    Only the parts of the screen which changed since the previous state are redrawn. Drawing goes to the
+    standard output unless another stream is given, in which case the view keeps a renderer of its own.
+    """
+    def __init__(self, out: TextIO | None = None) -> None:
+        self.out = out
+        self.renderer: Renderer | None = None
+
+    def get_renderer(self, board: 'Board') -> Renderer:
+        """Returns the renderer drawing the board to the output of the view.
+
+        Args:
+            board (Board): Board the game is played on.
+
+        Returns:
+            Renderer: Renderer of the board.
+        """
+        if not self.out:
+            return board.renderer
+        if not self.renderer or self.renderer.board is not board:
+            self.renderer = Renderer(board, self.out)
+        return self.renderer
+
+    def show(self, board: 'Board', current_player: 'Player', dice_roll: int | None) -> None:
+        self.get_renderer(board).draw([
+            " | ".join(f"{player.name} money: {player.money}" for player in board.players),
+            f"{current_player.name} rolled: {dice_roll}" if dice_roll else "",
+            f"Current player: {current_player.name}",
+        ])
+
+    def notify(self, message: str) -> None:
+        (self.out if self.out else sys.stdout).write(message + "\n")
@@ -0,0 +1,45 @@
+from random import Random
+
+import numpy as np
+import pytest
+
+from analytics import analyze, travel_distribution
+from game import Game
+from misc import COMPONENT_TILE
+from policy import RandomPolicy
+from rules import Rules
+from turn import ACTION
+
+def test_distributions_are_normalized():
+    stats = analyze(Game(seed=1).board.tiles)
+    assert stats.resting.sum() == pytest.approx(1.0)
+    assert stats.probabilities.sum() == pytest.approx(1.0)
+    assert (stats.resting >= -1e-12).all()
+    assert stats.landings.sum() >= 1.0
+    assert sum(stats.rent_by_component().values()) == pytest.approx(stats.rent.sum())
+
+def test_results_are_cached_per_layout_and_rules():
+    tiles = Game(seed=2).board.tiles
+    assert analyze(tiles) is analyze(list(tiles))
+    assert analyze(tiles, rules=Rules(advance_steps=5)) is not analyze(tiles)
+
+def test_travel_distribution_of_a_random_policy_is_uniform():
+    tiles = Game(seed=3).board.tiles
+    distribution = travel_distribution(RandomPolicy(), tiles, samples=16000)
+    assert sum(distribution) == pytest.approx(1.0)
+    assert max(distribution) - min(distribution) < 0.03
+
+def test_resting_distribution_matches_simulated_turns():
+    game = Game([RandomPolicy(Random(0)), RandomPolicy(Random(1))], seed=4)
+    board, player = game.board, game.players[0]
+    stats = analyze(board.tiles)
+    counts = np.zeros(len(board.tiles))
+    for _ in range(20000):
+        board.move_player(player, board.rng.roll())
+        board.resolver.push(ACTION.LAND, player)
+        while decision := board.resolver.advance():
+            board.resolver.resolve(player.policy.decide(board, decision))
+        player.money = 10_000
+        counts[player.position] += 1
+    assert np.abs(counts / counts.sum() - stats.resting).max() < 0.01
+    assert isinstance(board.tiles[int(np.argmax(stats.rent))], COMPONENT_TILE)
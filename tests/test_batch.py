@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from batch import BatchSimulator
+from game import Game
+from misc import TILE_CODES
+from policy import GreedyPolicy, RandomPolicy
+from rules import Rules
+
+def play_both(seed: int, rules: Rules | None = None) -> tuple[Game, BatchSimulator]:
+    game = Game([GreedyPolicy(), GreedyPolicy()], max_turns=300, seed=seed, rules=rules)
+    layouts = np.array([[TILE_CODES.index(tile) for tile in game.board.tiles]])
+    game.mainloop()
+    return game, BatchSimulator(1, rules=rules, layouts=layouts, seeds=[seed]).run(300)
+
+@pytest.mark.parametrize("seed", range(10))
+def test_batch_games_equal_scalar_games_of_the_same_seed(seed):
+    game, batch = play_both(seed)
+    assert int(batch.winners[0]) == (game.winner.index if game.winner else -1)
+    assert int(batch.lengths[0]) == game.turns_played
+    assert batch.money[0].tolist() == [player.money for player in game.players]
+
+def test_batch_games_follow_the_rules():
+    game, batch = play_both(4, Rules(pass_start_money=3000, gpu_price=500))
+    assert int(batch.lengths[0]) == game.turns_played
+    assert batch.money[0].tolist() == [player.money for player in game.players]
+
+def test_same_seed_gives_the_same_batch():
+    first = BatchSimulator(200, [GreedyPolicy(), RandomPolicy()], seed=3).run(300)
+    second = BatchSimulator(200, [GreedyPolicy(), RandomPolicy()], seed=3).run(300)
+    assert np.array_equal(first.winners, second.winners)
+    assert np.array_equal(first.money, second.money)
+    assert first.wins().sum() == np.count_nonzero(first.winners >= 0)
+
+def test_rejects_policies_without_a_vectorized_counterpart():
+    class Custom(GreedyPolicy):
+        pass
+    with pytest.raises(ValueError):
+        BatchSimulator(1, [Custom(), GreedyPolicy()])
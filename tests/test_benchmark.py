@@ -0,0 +1,29 @@
+import json
+
+import pytest
+
+from benchmark import BENCHMARKS, Measurement, compare, load_baseline, measure, run_benchmarks, save_baseline
+
+@pytest.mark.parametrize("name", list(BENCHMARKS))
+def test_every_benchmark_runs(name):
+    BENCHMARKS[name]()(2)
+
+def test_measure_calibrates_loops():
+    result = measure("sum", lambda loops: sum(range(loops)), repeats=3, min_time=0.001)
+    assert result.runs == 3 and result.loops > 1
+    assert 0 < result.best <= result.median
+
+def test_baseline_round_trips_and_flags_regressions(tmp_path, capsys):
+    results = run_benchmarks(["move_player_to_position"], repeats=3, min_time=0.001)
+    assert "move_player_to_position" in capsys.readouterr().out
+    path = tmp_path / "baseline.json"
+    save_baseline(str(path), results)
+    baseline = load_baseline(str(path))
+    assert baseline == {result.name: result for result in results}
+    slower = [Measurement(result.name, result.median * 2, 0.0, result.best * 2, 3, 1) for result in results]
+    assert all(comparison.regressed for comparison in compare(slower, baseline))
+    assert not any(comparison.regressed for comparison in compare(results, baseline))
+    assert compare(results, {}) == []
+    path.write_text(json.dumps({"version": -1, "results": {}}))
+    with pytest.raises(ValueError):
+        load_baseline(str(path))
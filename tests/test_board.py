@@ -0,0 +1,42 @@
+from board import Board, BOARD_SIZE, MAX_JUMP
+from game import Game
+from misc import SPECIAL_TILE
+
+def test_jump_table_matches_walking_the_circle():
+    for size in (BOARD_SIZE, 17, 40):
+        jumps = Board.create_jumps(size)
+        for position in range(size):
+            for steps in range(MAX_JUMP + 1):
+                assert jumps[position][steps] == ((position + steps) % size, (position + steps) // size)
+
+def test_jump_tables_are_shared_by_boards_of_the_same_size():
+    assert Board(size=20).jumps is Board(size=20).jumps
+
+def test_moves_pay_money_for_passing_start():
+    game = Game(seed=0)
+    board, player = game.board, game.players[0]
+    money, pass_money = player.money, board.rules.pass_start_money
+    player.position = BOARD_SIZE - 2
+    board.move_player(player, 5)
+    assert player.position == 3
+    assert player.money == money + pass_money
+    board.move_player(player, 3 * BOARD_SIZE + 1)
+    assert player.position == 4
+    assert player.money == money + 4 * pass_money
+
+def test_travel_moves_to_the_numbered_tile_without_passing_start():
+    game = Game(seed=0)
+    board, player = game.board, game.players[0]
+    money = player.money
+    player.position = 10
+    board.move_player_to_position(player, 3)
+    assert player.position == 2
+    assert player.money == money
+    board.move_player_to_position(player, BOARD_SIZE + 1)
+    assert player.position == 2
+
+def test_graph_view_follows_the_tiles():
+    board = Game(seed=3).board
+    assert board.tiles[0] == SPECIAL_TILE.START
+    assert [node.tile for node in board.nodes] == list(board.tiles)
+    assert board.nodes[-1].next is board.nodes[0]
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from env import GameEnv, VectorEnv, observation_size
+from game import Game
+from policy import GreedyPolicy
+from rules import Rules
+from turn import DECISION
+
+def greedy_action(env: GameEnv) -> int:
+    answer = GreedyPolicy().decide(env.game.board, env.decision)
+    return int(answer) if env.decision.kind == DECISION.BUY else answer - 1
+
+@pytest.mark.parametrize("seed", range(5))
+def test_a_greedy_agent_plays_the_same_game_as_a_greedy_policy(seed):
+    env = GameEnv(max_turns=300)
+    env.reset(seed)
+    done = env.done
+    while not done:
+        done = env.step(greedy_action(env))
+    game = Game([GreedyPolicy(), GreedyPolicy()], max_turns=300, seed=seed)
+    game.mainloop()
+    if env.game.running:
+        assert env.agent.is_bankrupt()
+        return
+    assert env.game.board.state.to_bytes() == game.board.state.to_bytes()
+    expected = 1.0 if game.winner is game.players[0] else -1.0 if game.winner else 0.0
+    assert env.reward == expected
+
+def test_observations_encode_the_state_seen_by_the_agent():
+    env = GameEnv(opponents=("greedy", "random"), seat=1)
+    env.reset(3)
+    observation = np.zeros(observation_size(env.size, 3), dtype=np.float32)
+    env.observe(observation)
+    size = env.size
+    assert observation[-2:].sum() == 1.0
+    positions_start = size * (len(env.tile_table) + 3 + 1)
+    positions = observation[positions_start:positions_start + 3 * size].reshape(3, size)
+    assert positions.sum(axis=1).tolist() == [1.0, 1.0, 1.0]
+    assert positions[0].argmax() == env.agent.position
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_vector_env_matches_single_environments(workers):
+    n_envs, seed = 3, 10
+    singles = [GameEnv(max_turns=200) for _ in range(n_envs)]
+    for index, env in enumerate(singles):
+        env.reset(seed + index)
+    expected = np.zeros((n_envs, observation_size(16, 2)), dtype=np.float32)
+    with VectorEnv(n_envs, workers=workers, seed=seed, max_turns=200) as vector:
+        observations = vector.reset()
+        for index, env in enumerate(singles):
+            env.observe(expected[index])
+        assert np.array_equal(observations, expected)
+        for _ in range(30):
+            actions = np.ones(n_envs, dtype=np.int64)
+            observations, rewards, dones = vector.step(actions)
+            for index, env in enumerate(singles):
+                done = env.step(1)
+                assert dones[index] == done
+                assert rewards[index] == env.reward
+                if not done:
+                    env.observe(expected[index])
+                    assert np.array_equal(observations[index], expected[index])
+            if dones.any():
+                break
+
+def test_searching_opponents_replay_from_the_seed():
+    states = []
+    for _ in range(2):
+        env = GameEnv(opponents=("mcts",), max_turns=30)
+        env.reset(2)
+        done = env.done
+        while not done:
+            done = env.step(1)
+        states.append(env.game.board.state.to_bytes())
+    assert states[0] == states[1]
+
+def test_episodes_end_when_the_agent_runs_out_of_money():
+    env = GameEnv(opponents=("greedy", "greedy"), max_turns=1000)
+    rng = np.random.default_rng(0)
+    bankrupt = 0
+    for seed in range(30):
+        env.reset(seed)
+        done = env.done
+        while not done:
+            done = env.step(int(rng.integers(env.size)))
+        if env.game.running:
+            assert env.agent.money <= 0 and not env.agent.resigned
+            assert env.agent not in env.game.board.players
+            assert env.reward == -1.0
+            bankrupt += 1
+    assert bankrupt
+
+def test_observations_without_start_money():
+    env = GameEnv(rules=Rules(start_money=0))
+    env.reset(0)
+    observation = np.zeros(observation_size(env.size, 2), dtype=np.float32)
+    env.observe(observation)
+    assert np.isfinite(observation).all()
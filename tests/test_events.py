@@ -0,0 +1,59 @@
+import io
+from collections import Counter
+
+from events import Bought, GameEnded, Moved, TurnStarted, format_event, play, printer, tally
+from game import Game
+from policy import GreedyPolicy
+
+def new_game(seed: int = 1) -> Game:
+    return Game([GreedyPolicy(), GreedyPolicy()], max_turns=500, seed=seed)
+
+def test_played_games_stream_their_events():
+    game = new_game()
+    events = list(play(game))
+    assert isinstance(events[0], TurnStarted) and events[0].turn == 1
+    assert events[-1] == GameEnded(game.winner, game.turns_played)
+    assert sum(isinstance(event, TurnStarted) for event in events) == game.turns_played
+    assert not game.board.events
+
+def test_events_replay_the_money_and_positions_of_players():
+    game = new_game(4)
+    positions = [0] * len(game.players)
+    for event in play(game):
+        if isinstance(event, Moved):
+            assert event.start == positions[event.player.index]
+            positions[event.player.index] = event.end
+    assert positions == [player.position for player in game.players]
+
+def test_subscribers_do_not_change_the_game():
+    counts: Counter[str] = Counter()
+    listened = new_game(6)
+    listened.board.events.subscribe(tally(counts))
+    listened.mainloop()
+    quiet = new_game(6)
+    quiet.mainloop()
+    assert listened.board.state.to_bytes() == quiet.board.state.to_bytes()
+    assert counts["TurnStarted"] == listened.turns_played
+    assert counts["GameEnded"] == 1
+
+def test_printer_writes_a_line_per_event():
+    out = io.StringIO()
+    game = new_game(2)
+    game.board.events.subscribe(printer(out))
+    game.mainloop()
+    lines = out.getvalue().splitlines()
+    assert lines[0] == "Turn 1: P1"
+    assert lines[-1] == format_event(GameEnded(game.winner, game.turns_played))
+    assert format_event(Bought(game.players[0], game.board.tiles[1], 10)) == f"P1 bought {game.board.tiles[1].name} for 10"
+
+def test_returning_subscribers_stop_receiving_events():
+    received = []
+
+    def first_only():
+        received.append((yield))
+
+    game = new_game()
+    game.board.events.subscribe(first_only())
+    game.play_turn()
+    assert len(received) == 1
+    assert not game.board.events
@@ -0,0 +1,37 @@
+from game import Game
+from policy import GreedyPolicy, Policy, RandomPolicy
+
+class RecordingPolicy(GreedyPolicy):
+    def __init__(self) -> None:
+        self.decisions: list[str] = []
+
+    def decide_buy(self, board, player, tile) -> bool:
+        self.decisions.append("buy")
+        return super().decide_buy(board, player, tile)
+
+    def choose_travel(self, board, player) -> int:
+        self.decisions.append("travel")
+        return super().choose_travel(board, player)
+
+def play(seed: int, policies: list[Policy] | None = None) -> Game:
+    game = Game(policies or [GreedyPolicy(), RandomPolicy()], max_turns=1000, seed=seed)
+    game.mainloop()
+    return game
+
+def test_headless_game_plays_to_the_end_without_io(capsys, monkeypatch):
+    monkeypatch.setattr("builtins.input", lambda *args: (_ for _ in ()).throw(AssertionError("input() called")))
+    game = play(1)
+    assert not game.running
+    assert game.winner is not None or game.turns_played == 1000
+    assert capsys.readouterr().out == ""
+
+def test_same_seed_replays_the_same_game():
+    first, second = play(7), play(7)
+    assert first.turns_played == second.turns_played
+    assert (first.winner and first.winner.index) == (second.winner and second.winner.index)
+    assert first.board.state.to_bytes() == second.board.state.to_bytes()
+
+def test_decisions_are_routed_to_the_policy_of_the_player():
+    policy = RecordingPolicy()
+    play(3, [policy, GreedyPolicy()])
+    assert "buy" in policy.decisions
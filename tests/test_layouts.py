@@ -0,0 +1,68 @@
+from math import factorial
+from random import Random
+
+import numpy as np
+import pytest
+
+from game import Game
+from layouts import (
+    LayoutTable,
+    build_table,
+    count_layouts,
+    evaluate,
+    iter_chunks,
+    open_job,
+    rank,
+    run_evaluation,
+    unrank,
+)
+from state import encode_tiles
+
+def test_a_board_of_16_tiles_has_15_factorial_over_2_to_the_6_layouts():
+    assert count_layouts(16) == factorial(15) // 2 ** 6
+
+@pytest.mark.parametrize("size", [16, 21])
+def test_rank_inverts_unrank(size):
+    total = count_layouts(size)
+    rng = Random(size)
+    indices = [0, 1, total - 1, *(rng.randrange(total) for _ in range(200))]
+    for index in indices:
+        assert rank(unrank(index, size)) == index
+    assert unrank(0, size) < unrank(1, size) < unrank(total - 1, size)
+    with pytest.raises(IndexError):
+        unrank(total, size)
+
+def test_every_board_is_a_ranked_layout():
+    for seed in range(20):
+        tiles = encode_tiles(Game(seed=seed).board.tiles)
+        assert unrank(rank(tiles)) == tiles
+    with pytest.raises(ValueError):
+        rank(bytes(16))
+
+def test_evaluation_resumes_and_ranks_the_fairest_first(tmp_path):
+    path = str(tmp_path / "layouts")
+    params = {"size": 16, "games": 20, "seed": 0, "max_turns": 300}
+    open_job(path, params)
+    indices = range(0, count_layouts(16), count_layouts(16) // 40)[:40]
+    assert run_evaluation(path, indices, games=20, max_turns=300, workers=2) == 1
+    assert run_evaluation(path, indices, games=20, max_turns=300, workers=2) == 0
+    assert list(iter_chunks(path)) == [0]
+    with pytest.raises(ValueError):
+        open_job(path, {**params, "games": 21})
+    assert build_table(path) == 40
+    table = np.load(tmp_path / "layouts" / "table.npy")
+    advantages = np.abs(table["advantage"])
+    assert (np.diff(advantages) >= 0).all()
+    rows = evaluate(table["index"][:3], games=20, max_turns=300)
+    assert np.array_equal(rows["advantage"], table["advantage"][:3])
+    assert all(bytes(row["tiles"]) == unrank(int(row["index"])) for row in table)
+
+    max_advantage = float(advantages[len(advantages) // 2])
+    layouts = LayoutTable(path, max_advantage)
+    assert 0 < layouts.fair <= len(table)
+    fair = {bytes(tiles) for tiles in table["tiles"][:layouts.fair]}
+    for seed in range(10):
+        game = Game(seed=seed, layouts=layouts)
+        assert encode_tiles(game.board.tiles) in fair
+    with pytest.raises(ValueError):
+        LayoutTable(path, -1.0)
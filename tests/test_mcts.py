@@ -0,0 +1,55 @@
+from game import Game
+from mcts import MCTSPolicy, SearchNode, evaluate, get_actions
+from misc import SPECIAL_TILE
+from policy import GreedyPolicy
+from turn import DECISION, Decision
+
+def test_search_node_tries_every_action_then_plays_the_most_visited():
+    node = SearchNode([True, False])
+    assert node.select(1.4) is True
+    node.update(True, 0.2)
+    assert node.select(1.4) is False
+    node.update(False, 1.0)
+    node.update(False, 1.0)
+    assert node.best() is False
+    assert node.visits == 3
+
+def test_travel_actions_leave_out_travel_tiles_and_put_the_preferred_first():
+    game = Game(seed=0)
+    decision = Decision(DECISION.TRAVEL, game.players[0], None)
+    actions = get_actions(game.board, decision, 5)
+    assert actions[0] == 5
+    assert sorted(actions) == [index + 1 for index, tile in enumerate(game.board.tiles) if tile != SPECIAL_TILE.TRAVEL]
+
+def test_evaluate_scores_the_winner_of_a_finished_game():
+    game = Game(seed=0)
+    scores = evaluate(game)
+    assert all(0.0 <= score <= 1.0 for score in scores)
+    game.winner = game.players[1]
+    assert evaluate(game) == [0.0, 1.0]
+
+def play(seed: int) -> Game:
+    game = Game([MCTSPolicy(simulations=20, horizon=10, seed=seed), GreedyPolicy()], max_turns=40, seed=seed)
+    game.mainloop()
+    return game
+
+def test_fixed_simulations_make_games_reproducible():
+    first, second = play(3), play(3)
+    assert first.turns_played == second.turns_played
+    assert first.board.state.to_bytes() == second.board.state.to_bytes()
+
+def test_search_answers_the_pending_decision_without_changing_the_game():
+    game = Game([MCTSPolicy(simulations=30, seed=0), GreedyPolicy()], seed=1)
+    resolver = game.board.resolver
+    for _ in range(200):
+        player = game.start_turn()
+        while decision := resolver.advance():
+            before = game.snapshot()
+            answer = decision.player.policy.decide(game.board, decision)
+            assert game.snapshot() == before
+            if decision.kind != DECISION.ACKNOWLEDGE and decision.player is game.players[0]:
+                assert answer in get_actions(game.board, decision)
+            resolver.resolve(answer)
+        game.end_turn(player)
+        if not game.running:
+            break
@@ -0,0 +1,59 @@
+import json
+import time
+
+from game import Game
+from metrics import BUCKETS, Histogram, Metrics, instrument
+from policy import GreedyPolicy
+
+def test_histogram_counts_observations_into_buckets():
+    histogram = Histogram()
+    for seconds in (0.0, BUCKETS[0], BUCKETS[3] * 1.5, BUCKETS[-1] * 2):
+        histogram.observe(seconds)
+    cumulative = dict(histogram.cumulative())
+    assert cumulative[f"{BUCKETS[0]:g}"] == 2
+    assert cumulative[f"{BUCKETS[-1]:g}"] == 3
+    assert cumulative["+Inf"] == histogram.count == 4
+
+def test_nested_phases_are_timed_exclusively():
+    metrics = Metrics()
+    inner = metrics.timed("inner", lambda: time.sleep(0.02))
+    outer = metrics.timed("outer", lambda: inner())
+    total = metrics.timed("total", outer, inclusive=True)
+    total()
+    assert metrics.histograms["inner"].total >= 0.02
+    assert metrics.histograms["outer"].total < 0.01
+    assert metrics.histograms["total"].total >= 0.02
+
+def test_instrumented_games_count_turns_and_time_phases():
+    metrics = Metrics()
+    played = Game([GreedyPolicy(), GreedyPolicy()], max_turns=300, seed=2)
+    instrument(played, metrics)
+    played.mainloop()
+    plain = Game([GreedyPolicy(), GreedyPolicy()], max_turns=300, seed=2)
+    plain.mainloop()
+    assert played.board.state.to_bytes() == plain.board.state.to_bytes()
+    assert metrics.counters["turns"] == played.turns_played
+    assert metrics.counters["games"] == 1
+    assert metrics.histograms["turn"].count == played.turns_played
+    assert metrics.histograms["dice"].count >= played.turns_played
+    assert metrics.histograms["decide"].count > 0
+
+def test_instrumenting_twice_does_not_double_count():
+    metrics = Metrics()
+    game = Game(max_turns=50, seed=0)
+    instrument(instrument(game, metrics), metrics)
+    game.mainloop()
+    assert metrics.counters["turns"] == 50
+    assert metrics.histograms["turn"].count == 50
+
+def test_exports(tmp_path):
+    metrics = Metrics()
+    instrument(Game(max_turns=20, seed=0), metrics).mainloop()
+    metrics.save(str(tmp_path / "metrics.json"))
+    data = json.loads((tmp_path / "metrics.json").read_text())
+    assert data["counters"]["turns"] == 20
+    metrics.save(str(tmp_path / "metrics.prom"))
+    text = (tmp_path / "metrics.prom").read_text()
+    assert 'gigapoly_events_total{event="turns"} 20' in text
+    assert 'gigapoly_phase_seconds_count{phase="turn"} 20' in text
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["metrics.json", "metrics.prom"]
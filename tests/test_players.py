@@ -0,0 +1,39 @@
+import pytest
+
+from game import Game, TurnOrder, MIN_PLAYERS, MAX_PLAYERS
+from policy import GreedyPolicy, RandomPolicy
+
+def test_turn_order_rotates_and_skips_removed_players():
+    order = TurnOrder(4)
+    assert [order.advance() for _ in range(5)] == [0, 1, 2, 3, 0]
+    order.remove(2)
+    assert [order.advance() for _ in range(4)] == [1, 3, 0, 1]
+    order.remove(1)
+    assert order.peek() == 3
+    assert [order.advance() for _ in range(3)] == [3, 0, 3]
+    assert order.remaining == 2
+
+@pytest.mark.parametrize("count", range(MIN_PLAYERS, MAX_PLAYERS + 1))
+def test_games_of_any_number_of_players_play_to_the_end(count):
+    game = Game([RandomPolicy() for _ in range(count)], max_turns=2000, seed=count)
+    assert [player.name for player in game.players] == [f"P{index + 1}" for index in range(count)]
+    winner = game.mainloop()
+    assert not game.running
+    assert winner is None or winner in game.players
+    if winner and not winner.has_all_parts():
+        assert game.order.remaining == 1
+        assert all(player.is_bankrupt() for player in game.players if player is not winner)
+
+def test_bankrupt_players_lose_their_turns():
+    game = Game([GreedyPolicy() for _ in range(3)], seed=0)
+    game.players[1].resigned = True
+    game.play_turn()
+    game.play_turn()
+    assert game.order.remaining == 2
+    assert game.players[1] not in game.board.players
+    assert game.play_turn() is game.players[2]
+
+@pytest.mark.parametrize("count", [1, MAX_PLAYERS + 1])
+def test_rejects_unsupported_numbers_of_players(count):
+    with pytest.raises(ValueError):
+        Game([GreedyPolicy() for _ in range(count)])
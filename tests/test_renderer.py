@@ -0,0 +1,116 @@
+import io
+import re
+
+import pytest
+
+from game import Game
+from renderer import Renderer, get_layout
+
+SEQUENCE = re.compile(r"\033\[(?:(\d+);(\d+)H|H|2J|2K|J|\d+m)")
+
+class Screen:
+    """Minimal terminal applying the ANSI sequences the renderer writes."""
+    def __init__(self) -> None:
+        self.lines: dict[int, list[str]] = {}
+        self.line, self.column = 1, 1
+
+    def feed(self, data: str) -> None:
+        position = 0
+        for match in SEQUENCE.finditer(data):
+            self.put(data[position:match.start()])
+            position = match.end()
+            code = match.group(0)
+            if match.group(1):
+                self.line, self.column = int(match.group(1)), int(match.group(2))
+            elif code == "\033[H":
+                self.line, self.column = 1, 1
+            elif code == "\033[2J":
+                self.lines.clear()
+            elif code == "\033[2K":
+                self.lines.pop(self.line, None)
+            elif code == "\033[J":
+                self.lines = {line: text for line, text in self.lines.items() if line < self.line}
+        self.put(data[position:])
+
+    def put(self, text: str) -> None:
+        for char in text:
+            if char == "\n":
+                self.line, self.column = self.line + 1, 1
+                continue
+            row = self.lines.setdefault(self.line, [])
+            row.extend(" " * (self.column - len(row)))
+            row[self.column - 1] = char
+            self.column += 1
+
+    def text(self) -> list[str]:
+        return ["".join(self.lines.get(line, [])).rstrip() for line in range(1, max(self.lines, default=0) + 1)]
+
+class CountingStream(io.StringIO):
+    def __init__(self) -> None:
+        super().__init__()
+        self.writes: list[str] = []
+
+    def write(self, text: str) -> int:
+        self.writes.append(text)
+        return super().write(text)
+
+def full_screen(game: Game, header: list[str]) -> list[str]:
+    screen, stream = Screen(), CountingStream()
+    Renderer(game.board, stream).draw(header)
+    screen.feed(stream.writes[-1])
+    return screen.text()
+
+def test_every_frame_is_a_single_write():
+    game = Game(seed=0)
+    stream = CountingStream()
+    renderer = Renderer(game.board, stream)
+    renderer.draw(["header"])
+    renderer.draw(["header"])
+    assert len(stream.writes) == 2
+    assert "\033[2J" in stream.writes[0]
+    assert "\033[2J" not in stream.writes[1]
+    assert len(stream.writes[1]) < 20
+
+def test_updates_draw_the_same_screen_as_a_full_redraw():
+    game = Game(seed=0)
+    stream, screen = CountingStream(), Screen()
+    renderer = Renderer(game.board, stream)
+    for turn in range(40):
+        game.play_turn()
+        header = [f"turn {turn}", " | ".join(str(player.money) for player in game.players)]
+        renderer.draw(header)
+        screen.feed(stream.writes[-1])
+        assert screen.text() == full_screen(game, header)
+        if not game.running:
+            break
+    assert sum("\033[2J" in write for write in stream.writes) == 1
+
+def test_invalidate_forces_a_full_redraw():
+    game = Game(seed=0)
+    stream = CountingStream()
+    renderer = Renderer(game.board, stream)
+    renderer.draw([""])
+    renderer.invalidate()
+    renderer.draw([""])
+    assert "\033[2J" in stream.writes[1]
+
+@pytest.mark.parametrize("size", [16, 17, 23, 40, 101])
+def test_layout_places_every_tile_once_on_the_border(size):
+    layout = get_layout(size)
+    last = layout.side - 1
+    assert len(layout.perimeter) == len(set(layout.perimeter)) == size
+    assert layout.perimeter[0] == (0, 0)
+    assert all(row in {0, last} or col in {0, last} for row, col in layout.perimeter)
+    assert all(layout.grid[position] == index for index, position in enumerate(layout.perimeter))
+    assert 4 * (layout.side - 2) < size <= 4 * last
+
+def test_layouts_are_computed_once_per_size():
+    assert get_layout(40) is get_layout(40)
+
+@pytest.mark.parametrize("size", [16, 30, 64])
+def test_boards_of_any_size_are_drawn_whole(size):
+    game = Game(seed=0, size=size)
+    frame = re.sub(r"\033\[\d+m", "", Renderer(game.board, io.StringIO()).frame()).split("\n")
+    assert len(frame) == get_layout(size).height
+    assert len({len(line) for line in frame}) == 1
+    assert all(f"{index + 1:<8}" in "".join(frame) for index in range(size))
@@ -0,0 +1,39 @@
+from game import Game
+from policy import GreedyPolicy, RandomPolicy
+from replay import ReplayLog, read_varint, record, write_varint
+import pytest
+
+def play_recorded(path, seed: int, size: int = 16, interval: int = 16) -> list[bytes]:
+    game = Game([GreedyPolicy(), RandomPolicy()], max_turns=3000, seed=seed, size=size)
+    record(game, str(path), interval)
+    snapshots = [game.snapshot().to_bytes()]
+    while game.running:
+        game.play_turn()
+        snapshots.append(game.snapshot().to_bytes())
+    return snapshots
+
+@pytest.mark.parametrize("value", [0, 1, -1, 63, -64, 64, 255, 1000, -(1 << 40), 1 << 62])
+def test_varints_round_trip(value):
+    out = bytearray()
+    write_varint(out, value)
+    assert read_varint(bytes(out), 0) == (value, len(out))
+
+@pytest.mark.parametrize("size", [16, 1000])
+def test_replay_reconstructs_every_turn(tmp_path, size):
+    path = tmp_path / "games.gprl"
+    captured = [play_recorded(path, seed, size) for seed in range(3)]
+    with ReplayLog(str(path)) as log:
+        assert len(log) == len(captured)
+        for replay, snapshots in zip(log, captured):
+            assert replay.turns == len(snapshots) - 1
+            for turn in range(replay.turns + 1):
+                assert replay.game_at(turn).snapshot().to_bytes() == snapshots[turn]
+
+def test_truncated_tail_is_ignored(tmp_path):
+    path = tmp_path / "games.gprl"
+    play_recorded(path, 1)
+    play_recorded(path, 2)
+    with open(path, "r+b") as file:
+        file.truncate(path.stat().st_size - 5)
+    with ReplayLog(str(path)) as log:
+        assert len(log) == 1
@@ -0,0 +1,48 @@
+from collections import Counter
+
+from rng import BLOCK, DICE_BLOCK, BlockRandom, generate, generate_dice, generate_permutations
+
+def test_same_seed_gives_the_same_draws():
+    first, second = BlockRandom(42), BlockRandom(42)
+    assert [first.random() for _ in range(3000)] == [second.random() for _ in range(3000)]
+    assert [first.roll() for _ in range(600)] == [second.roll() for _ in range(600)]
+    assert BlockRandom(42).random() != BlockRandom(43).random()
+
+def test_dice_do_not_depend_on_other_draws():
+    quiet, busy = BlockRandom(7), BlockRandom(7)
+    rolls = []
+    for _ in range(2 * DICE_BLOCK):
+        busy.random()
+        busy.randint(1, 100)
+        rolls.append(busy.roll())
+    assert rolls == [quiet.roll() for _ in range(2 * DICE_BLOCK)]
+
+def test_dice_are_fair():
+    rng = BlockRandom(0)
+    counts = Counter(rng.roll() for _ in range(60000))
+    assert set(counts) == set(range(1, 7))
+    assert max(counts.values()) - min(counts.values()) < 600
+    assert len(generate_dice(0, 3)) == DICE_BLOCK
+
+def test_seek_returns_to_any_position():
+    rng = BlockRandom(3)
+    words = [rng.getrandbits(64) for _ in range(3 * BLOCK + 5)]
+    for position in (0, 1, BLOCK - 1, BLOCK, 2 * BLOCK + 7):
+        rng.seek(position)
+        assert rng.tell() == position
+        assert rng.getrandbits(64) == words[position]
+
+def test_state_round_trips():
+    rng = BlockRandom(11)
+    for _ in range(1500):
+        rng.random()
+    rng.roll()
+    state = rng.getstate()
+    expected = ([rng.random() for _ in range(10)], [rng.roll() for _ in range(10)])
+    rng.setstate(state)
+    assert ([rng.random() for _ in range(10)], [rng.roll() for _ in range(10)]) == expected
+
+def test_blocks_are_prefixes_and_permutations_are_valid():
+    assert generate(5, 1, 2, 64)[:16] == generate(5, 1, 2, 16)
+    deck = generate_permutations(5, 2, 0, 6)
+    assert all(sorted(deck[start:start + 6]) == list(range(6)) for start in range(0, len(deck), 6))
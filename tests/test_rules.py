@@ -0,0 +1,47 @@
+import pytest
+
+from game import Game
+from misc import COMPONENT_TILE, GOOD_EFFECT
+from policy import GreedyPolicy
+from rules import DEFAULT_RULES, MAX_ADVANCE, Rules
+from sweep import cache_key, grid, parse_space
+
+def test_board_reads_prices_and_card_effects_from_its_rules():
+    rules = Rules(start_money=500, gpu_price=1234, raise_money=77)
+    game = Game(rules=rules, seed=0)
+    assert game.board.prices[COMPONENT_TILE.GPU] == 1234
+    assert game.board.card_effects[GOOD_EFFECT.RAISE].money == 77
+    assert all(player.money == 500 for player in game.players)
+
+def test_rules_change_the_outcome_of_games():
+    default = Game([GreedyPolicy(), GreedyPolicy()], max_turns=300, seed=5)
+    default.mainloop()
+    rich = Game([GreedyPolicy(), GreedyPolicy()], max_turns=300, seed=5, rules=Rules(pass_start_money=5000))
+    rich.mainloop()
+    assert default.board.state.to_bytes() != rich.board.state.to_bytes()
+
+def test_rules_from_dict_takes_defaults_and_validates():
+    assert Rules.from_dict({}) == DEFAULT_RULES
+    assert Rules.from_dict({"bonus_money": 1}).bonus_money == 1
+    for values in ({"price": 1}, {"gpu_price": -1}, {"gpu_price": 1.5}, {"advance_steps": MAX_ADVANCE + 1}):
+        with pytest.raises(ValueError):
+            Rules.from_dict(values)
+
+def test_parse_space_and_grid():
+    space = parse_space(["pass_start_money=500,1000", "gpu_price=1500:2000:250"])
+    assert list(space["gpu_price"]) == [1500, 1750, 2000]
+    points = grid(space)
+    assert len(points) == 6
+    assert {(rules.pass_start_money, rules.gpu_price) for rules in points} == {
+        (money, price) for money in (500, 1000) for price in (1500, 1750, 2000)
+    }
+    assert all(rules.cpu_price == DEFAULT_RULES.cpu_price for rules in points)
+    with pytest.raises(ValueError):
+        parse_space(["price=1"])
+
+def test_cache_key_depends_on_every_parameter():
+    key = cache_key(DEFAULT_RULES, ("greedy", "random"), 100, 0, 1000, 16)
+    assert key == cache_key(Rules(), ("greedy", "random"), 100, 0, 1000, 16)
+    assert key != cache_key(Rules(gpu_price=1), ("greedy", "random"), 100, 0, 1000, 16)
+    assert key != cache_key(DEFAULT_RULES, ("random", "greedy"), 100, 0, 1000, 16)
+    assert key != cache_key(DEFAULT_RULES, ("greedy", "random"), 100, 1, 1000, 16)
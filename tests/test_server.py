@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from game import Game
+from policy import GreedyPolicy, Policy
+from server import Broadcast, GameServer, RemotePolicy
+
+class FakeTransport:
+    def __init__(self, buffered: int) -> None:
+        self.buffered = buffered
+
+    def get_write_buffer_size(self) -> int:
+        return self.buffered
+
+class FakeWriter:
+    def __init__(self, buffered: int = 0) -> None:
+        self.transport = FakeTransport(buffered)
+        self.data = b""
+        self.closed = False
+
+    def is_closing(self) -> bool:
+        return self.closed
+
+    def write(self, data: bytes) -> None:
+        self.data += data
+
+    def close(self) -> None:
+        self.closed = True
+
+def test_remote_policy_is_only_awaited():
+    assert not issubclass(RemotePolicy, Policy)
+    assert not hasattr(RemotePolicy, "decide")
+
+def test_synchronous_game_refuses_remote_players():
+    remote = RemotePolicy(None, FakeWriter())
+    game = Game([GreedyPolicy(), remote], seed=0)
+    with pytest.raises(TypeError):
+        game.play_turn()
+
+def test_broadcast_drops_clients_over_the_buffer_limit():
+    reading, stalled = FakeWriter(), FakeWriter(buffered=2048)
+    Broadcast([reading, stalled], limit=1024).write("a\nb")
+    assert reading.data == b"a\r\nb"
+    assert stalled.closed and stalled.data == b""
+
+async def play(answers: bytes, disconnect: bool = False) -> bytes:
+    server = GameServer(players=2, bots=1, max_turns=6)
+    listener = await asyncio.start_server(server.handle_connection, "127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    async with listener:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(answers)
+        if disconnect:
+            await reader.readuntil(b"You are")
+            writer.close()
+        received = await asyncio.wait_for(reader.read(), 30)
+        writer.close()
+        await asyncio.wait_for(asyncio.gather(*server.games), 30)
+    return received
+
+def test_server_plays_a_game_against_a_bot():
+    received = asyncio.run(play(b"yes\n1\n" * 200))
+    assert b"You are" in received
+    assert received.endswith(b"Game over\r\n")
+
+def test_server_finishes_the_game_of_a_disconnected_player():
+    received = asyncio.run(play(b"", disconnect=True))
+    assert b"Game over" not in received
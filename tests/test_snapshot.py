@@ -0,0 +1,38 @@
+from game import Game
+from policy import GreedyPolicy, RandomPolicy
+from snapshot import Snapshot
+
+def test_serialized_snapshots_round_trip_at_every_turn():
+    game = Game([GreedyPolicy(), RandomPolicy()], max_turns=300, seed=4)
+    while game.running:
+        snapshot = game.snapshot()
+        assert Snapshot.from_bytes(snapshot.to_bytes()) == snapshot
+        game.play_turn()
+
+def test_snapshot_round_trips_with_a_pending_decision():
+    game = Game([GreedyPolicy(), GreedyPolicy()], seed=2)
+    game.start_turn()
+    assert game.board.resolver.advance()
+    snapshot = game.snapshot()
+    assert snapshot.pending is not None
+    assert Snapshot.from_bytes(snapshot.to_bytes()) == snapshot
+
+def test_clone_continues_like_the_original():
+    game = Game([GreedyPolicy(), GreedyPolicy()], max_turns=500, seed=9)
+    for _ in range(10):
+        game.play_turn()
+    fork = game.clone()
+    game.mainloop()
+    fork.mainloop()
+    assert fork.snapshot() == game.snapshot()
+
+def test_snapshots_of_boards_over_255_tiles_round_trip():
+    game = Game([RandomPolicy(), RandomPolicy()], max_turns=3000, seed=0, size=1000)
+    game.players[0].position = 700
+    snapshot = game.snapshot()
+    assert Snapshot.from_bytes(snapshot.to_bytes()) == snapshot
+    game.mainloop()
+    snapshot = game.snapshot()
+    restored = Game([RandomPolicy(), RandomPolicy()], seed=0, size=1000)
+    restored.restore(Snapshot.from_bytes(snapshot.to_bytes()))
+    assert restored.snapshot() == snapshot
@@ -0,0 +1,39 @@
+from game import Game
+from policy import GreedyPolicy, RandomPolicy
+from solver import SolverPolicy, get_regret, get_solver, get_state
+from turn import DECISION
+
+def collect_decisions(seed: int):
+    game = Game([SolverPolicy(depth=1), RandomPolicy()], max_turns=60, seed=seed)
+    resolver = game.board.resolver
+    while game.running:
+        player = game.start_turn()
+        while decision := resolver.advance():
+            answer = decision.player.policy.decide(game.board, decision)
+            if decision.kind != DECISION.ACKNOWLEDGE:
+                yield game, decision, answer
+            resolver.resolve(answer)
+        game.end_turn(player)
+
+def test_regret_is_zero_for_solver_answers_and_never_negative():
+    checked = 0
+    for game, decision, answer in collect_decisions(2):
+        if decision.player is game.players[0]:
+            assert get_regret(game.board, decision, answer, 1) == 0
+            checked += 1
+        assert get_regret(game.board, decision, answer, 1) >= 0
+    assert checked
+
+def test_decisions_are_memoized_per_state():
+    game = Game(seed=0)
+    solver = get_solver(tuple(game.board.tiles), 1, game.board.rules)
+    state = get_state(game.board, game.players[0])
+    first = solver.decide(DECISION.TRAVEL, *state)
+    assert solver.decide(DECISION.TRAVEL, *state) == first
+    assert get_solver(tuple(game.board.tiles), 1, game.board.rules) is solver
+    assert first in solver.evaluate(DECISION.TRAVEL, *state)
+
+def test_solver_policy_plays_valid_games():
+    game = Game([SolverPolicy(depth=1), GreedyPolicy()], max_turns=200, seed=5)
+    game.mainloop()
+    assert not game.running
@@ -0,0 +1,33 @@
+from game import Game
+from policy import GreedyPolicy, RandomPolicy
+import pytest
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_games_on_boards_of_thousands_of_tiles_play_to_the_end(seed):
+    game = Game([RandomPolicy(), RandomPolicy()], max_turns=3000, seed=seed, size=1000)
+    game.mainloop()
+    assert not game.running
+    assert all(0 <= position < 1000 for position in game.board.state.positions)
+
+def test_positions_past_byte_range_survive_clone():
+    game = Game([GreedyPolicy(), GreedyPolicy()], seed=5, size=1000)
+    game.players[0].position = 999
+    game.players[1].position = 300
+    fork = game.clone()
+    assert [player.position for player in fork.players] == [999, 300]
+
+def index_of(state) -> tuple:
+    return bytes(state.parts), list(state.holdings), bytes(state.counts), list(state.unowned)
+
+@pytest.mark.parametrize("seed", range(4))
+def test_ownership_index_matches_a_rebuild_after_every_turn(seed):
+    game = Game([RandomPolicy() for _ in range(3)], max_turns=300, seed=seed)
+    state = game.board.state
+    while game.running:
+        game.play_turn()
+        incremental = index_of(state)
+        state.reindex()
+        assert index_of(state) == incremental
+        for player in game.players:
+            owned = {tile for tile, owner in zip(game.board.tiles, game.board.owners) if owner is player}
+            assert player.has_all_parts() == all(part in owned for part in player.all_parts)
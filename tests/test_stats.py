@@ -0,0 +1,61 @@
+from random import Random
+from statistics import mean, variance
+
+import pytest
+
+from stats import RunningStats, wilson_interval
+from tournament import MatchupResult, run_tournament
+
+def stats_of(values: list[float]) -> RunningStats:
+    stats = RunningStats()
+    for value in values:
+        stats.add(value)
+    return stats
+
+def test_running_stats_match_the_statistics_module():
+    values = [Random(0).gauss(100, 15) for _ in range(1000)]
+    stats = stats_of(values)
+    assert stats.count == 1000
+    assert stats.mean == pytest.approx(mean(values))
+    assert stats.variance == pytest.approx(variance(values))
+    assert (stats.low, stats.high) == (min(values), max(values))
+
+def test_merged_shards_equal_adding_every_value():
+    rng = Random(1)
+    values = [rng.uniform(0, 1000) for _ in range(999)]
+    merged = RunningStats()
+    for start in range(0, len(values), 100):
+        merged.merge(stats_of(values[start:start + 100]))
+    merged.merge(RunningStats())
+    whole = stats_of(values)
+    assert merged.count == whole.count
+    assert merged.mean == pytest.approx(whole.mean)
+    assert merged.variance == pytest.approx(whole.variance)
+    assert RunningStats.from_dict(merged.to_dict()).to_dict() == merged.to_dict()
+
+def test_wilson_interval_stays_within_bounds_and_narrows():
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+    low, high = wilson_interval(0, 50)
+    assert low == pytest.approx(0.0) and 0 < high < 0.1
+    low, high = wilson_interval(50, 50)
+    assert 0.9 < low < 1.0 and high == pytest.approx(1.0)
+    assert wilson_interval(500, 1000)[1] - wilson_interval(500, 1000)[0] < wilson_interval(50, 100)[1] - wilson_interval(50, 100)[0]
+    low, high = wilson_interval(30, 100)
+    assert low < 0.3 < high
+
+def test_matchup_results_round_trip():
+    result = run_tournament(["greedy"], 20, max_turns=200, workers=1)[("greedy", "greedy")]
+    copy = MatchupResult.from_dict(result.to_dict())
+    assert copy.to_dict() == result.to_dict()
+    assert str(copy) == str(result)
+
+def test_early_stopping_covers_the_same_seeds_for_any_number_of_workers():
+    results = [
+        run_tournament(["greedy", "random"], 2000, max_turns=200, workers=workers, width=0.25, min_games=50)
+        for workers in (1, 3)
+    ]
+    for matchup, result in results[0].items():
+        other = results[1][matchup]
+        assert result.games < 2000 and result.games % 50 == 0
+        assert result.converged(0.25)
+        assert (result.games, result.wins, result.draws) == (other.games, other.wins, other.draws)
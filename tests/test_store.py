@@ -0,0 +1,49 @@
+import pytest
+
+from store import Store, StoreWriter, layout_key, outcomes, win_rate_by_layout
+from tournament import POLICIES, play_game, run_tournament
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_stored_games_and_turns_match_the_played_games(tmp_path, compress):
+    path = str(tmp_path / "store")
+    games = []
+    with StoreWriter(path, 16, 2, POLICIES, compress=compress, chunk_rows=3) as writer:
+        for seed in range(8):
+            games.append(play_game(("greedy", "random"), seed, 300, store=writer))
+    store = Store(path)
+    assert len(store.games.chunks) == 3
+    assert len(store.games) == 8
+    game_ids, seeds, layouts, winners, turns, money = store.games.read("game", "seed", "layout", "winner", "turns", "money")
+    assert seeds.tolist() == list(range(8))
+    for index, game in enumerate(games):
+        assert bytes(layouts[index]) == game.board.state.tiles
+        assert winners[index] == (game.winner.index if game.winner else -1)
+        assert turns[index] == game.turns_played
+        assert money[index].tolist() == list(game.board.state.money)
+    turn_games, turn_numbers, turn_money = store.turns.read("game", "turn", "money")
+    for index, game_id in enumerate(game_ids):
+        rows = turn_games == game_id
+        assert turn_numbers[rows].tolist() == list(range(1, turns[index] + 1))
+        assert turn_money[rows][-1].tolist() == money[index].tolist()
+
+def test_queries(tmp_path):
+    path = str(tmp_path / "store")
+    run_tournament(["greedy"], 30, max_turns=300, workers=2, store=path)
+    store = Store(path)
+    summary = outcomes(store)
+    assert summary["games"] == 30
+    assert summary["P1 wins"] + summary["P2 wins"] + summary["draw"] == pytest.approx(1.0)
+    assert summary["avg turns"] == pytest.approx(store.games.read("turns")[0].mean())
+    by_layout = win_rate_by_layout(store)
+    assert sum(count for count, _ in by_layout.values()) == 30
+    keys, layouts = store.games.read("layout_key", "layout")
+    assert all(key == layout_key(bytes(layout)) for key, layout in zip(keys.tolist(), layouts))
+
+def test_empty_stores_read_empty_columns(tmp_path):
+    path = str(tmp_path / "store")
+    StoreWriter(path, 16, 2, POLICIES).close()
+    store = Store(path)
+    assert len(store.games) == 0
+    assert store.games.read("turns")[0].size == 0
+    with pytest.raises(KeyError):
+        store.games.load("chunk", "missing")
@@ -0,0 +1,28 @@
+import pytest
+
+from tournament import play_game, play_shard, run_tournament
+
+def test_play_game_replays_the_same_game_from_its_seed():
+    first, second = play_game(("greedy", "random"), 11, 500), play_game(("greedy", "random"), 11, 500)
+    assert first.turns_played == second.turns_played
+    assert first.board.state.to_bytes() == second.board.state.to_bytes()
+
+def test_shards_add_up_the_games_they_play():
+    result = play_shard(("greedy", "random"), 0, 20, 300)
+    assert result.games == 20
+    assert sum(result.wins) + result.draws == 20
+    assert all(completions <= wins for completions, wins in zip(result.completions, result.wins))
+
+def test_results_do_not_depend_on_the_number_of_workers():
+    single = run_tournament(["greedy", "random"], 40, max_turns=300, workers=1)
+    pooled = run_tournament(["greedy", "random"], 40, max_turns=300, workers=2)
+    assert set(single) == set(pooled) == {("greedy", "greedy"), ("greedy", "random"), ("random", "greedy"), ("random", "random")}
+    for matchup, result in single.items():
+        other = pooled[matchup]
+        assert (result.games, result.wins, result.completions, result.draws) == (other.games, other.wins, other.completions, other.draws)
+        assert result.turns.mean == pytest.approx(other.turns.mean)
+
+def test_games_with_a_searching_seat_replay_from_their_seed():
+    games = [play_game(("mcts", "greedy"), 5, 60) for _ in range(3)]
+    assert len({game.turns_played for game in games}) == 1
+    assert len({game.board.state.to_bytes() for game in games}) == 1
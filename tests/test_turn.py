@@ -0,0 +1,55 @@
+from game import Game
+from misc import COMPONENT_TILE, SPECIAL_TILE
+from policy import GreedyPolicy
+from turn import ACTION, DECISION
+
+def land_on(game: Game, tile) -> tuple:
+    player, resolver = game.players[0], game.board.resolver
+    player.position = game.board.tiles.index(tile)
+    resolver.push(ACTION.LAND, player)
+    return player, resolver
+
+def test_unowned_component_is_offered_and_bought():
+    game = Game(seed=0)
+    player, resolver = land_on(game, COMPONENT_TILE.GPU)
+    decision = resolver.advance()
+    assert decision.kind == DECISION.BUY and decision.player is player and decision.tile == COMPONENT_TILE.GPU
+    money = player.money
+    resolver.resolve(True)
+    assert resolver.advance() is None
+    assert game.board.owners[player.position] is player
+    assert player.money == money - game.board.prices[COMPONENT_TILE.GPU]
+    assert COMPONENT_TILE.GPU in player.owned_parts
+
+def test_declined_component_stays_unowned():
+    game = Game(seed=0)
+    player, resolver = land_on(game, COMPONENT_TILE.CPU)
+    assert resolver.advance().kind == DECISION.BUY
+    resolver.resolve(False)
+    assert resolver.advance() is None
+    assert game.board.owners[player.position] is None
+
+def test_travel_lands_again_on_the_chosen_tile():
+    game = Game(seed=0)
+    player, resolver = land_on(game, SPECIAL_TILE.TRAVEL)
+    assert resolver.advance().kind == DECISION.TRAVEL
+    target = game.board.tiles.index(COMPONENT_TILE.RAM)
+    resolver.resolve(target + 1)
+    decision = resolver.advance()
+    assert player.position == target
+    assert decision.kind == DECISION.BUY and decision.tile == COMPONENT_TILE.RAM
+
+def test_driving_the_machine_by_hand_equals_play_turn():
+    played = Game([GreedyPolicy(), GreedyPolicy()], seed=9)
+    driven = Game([GreedyPolicy(), GreedyPolicy()], seed=9)
+    resolver = driven.board.resolver
+    for _ in range(100):
+        played.play_turn()
+        player = driven.start_turn()
+        while decision := resolver.advance():
+            resolver.resolve(decision.player.policy.decide(driven.board, decision))
+        driven.end_turn(player)
+        assert driven.board.state.to_bytes() == played.board.state.to_bytes()
+        if not played.running:
+            break
+    assert driven.running == played.running